@@ -9,6 +9,7 @@ from django.contrib.auth import get_user_model
 
 from bookings.models import Booking
 from restaurants.models import Restaurant, Review
+from restaurants import search_cache
 
 User = get_user_model()
 
@@ -187,23 +188,16 @@ class RestaurantAnalyticsView(APIView):
                 'count': count
             })
         
-        # Reviews analytics
-        reviews = Review.objects.filter(restaurant=restaurant)
-        total_reviews = reviews.count()
-        avg_rating = reviews.aggregate(avg=Avg('rating'))['avg'] or 0
+        # Reviews analytics, from the rating aggregates kept on the restaurant
+        total_reviews = restaurant.rating_count
+        avg_rating = restaurant.rating_average or 0
         
         # Get total number of tables for the restaurant
         from restaurants.models import Table
         total_tables = Table.objects.filter(restaurant=restaurant).count()
         
         # Ratings distribution
-        ratings_distribution = {
-            '1': reviews.filter(rating=1).count(),
-            '2': reviews.filter(rating=2).count(),
-            '3': reviews.filter(rating=3).count(),
-            '4': reviews.filter(rating=4).count(),
-            '5': reviews.filter(rating=5).count(),
-        }
+        ratings_distribution = restaurant.rating_distribution
         
         data = {
             'restaurant_name': restaurant.name,
@@ -295,7 +289,8 @@ class SystemStatsView(APIView):
                 'total': total_reviews
             },
             'revenue_estimate': revenue_estimate,
-            'average_party_size': avg_party_size
+            'average_party_size': avg_party_size,
+            'search_cache': search_cache.stats()
         }
         
         return Response(data)
@@ -0,0 +1,74 @@
+"""
+Table allocation strategies for new bookings.
+
+A strategy ranks the tables that are free for a booking, using a single
+ConflictIndex snapshot of the day's confirmed bookings. The first table in
+the ranking is allocated; the rest are fallbacks if that table is lost to a
+concurrent booking. The active strategy is set with the
+BOOKING_TABLE_ALLOCATOR setting.
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class FirstAvailableAllocator:
+    """
+    Allocate the first free table that seats the party, in table ID order
+    (the original behaviour)
+    """
+
+    def rank(self, tables, conflicts, booking_time, party_size):
+        return sorted(
+            (
+                table for table in conflicts.free_tables(tables, booking_time)
+                if table.capacity >= party_size
+            ),
+            key=lambda table: table.id
+        )
+
+    def allocate(self, tables, conflicts, booking_time, party_size):
+        ranked = self.rank(tables, conflicts, booking_time, party_size)
+        return ranked[0] if ranked else None
+
+
+class BestFitAllocator(FirstAvailableAllocator):
+    """
+    Allocate the smallest free table that seats the party.
+
+    With look_ahead enabled, tables of the same size are ranked by how close
+    their existing bookings are to the requested time, so bookings pack
+    tightly onto tables that are already in use and the long free stretches
+    of other tables (in particular large ones) stay open for the rest of the
+    day.
+    """
+
+    def __init__(self, look_ahead=False):
+        self.look_ahead = look_ahead
+
+    def rank(self, tables, conflicts, booking_time, party_size):
+        free_tables = [
+            table for table in conflicts.free_tables(tables, booking_time)
+            if table.capacity >= party_size
+        ]
+
+        def sort_key(table):
+            if not self.look_ahead:
+                return (table.capacity, table.id)
+            distance = conflicts.distance_to_nearest(table.id, booking_time)
+            # Untouched tables go last within their size
+            return (table.capacity, distance is None, distance or 0, table.id)
+
+        return sorted(free_tables, key=sort_key)
+
+
+class LookAheadAllocator(BestFitAllocator):
+    """Best fit with look-ahead packing enabled"""
+
+    def __init__(self):
+        super().__init__(look_ahead=True)
+
+
+def get_allocator():
+    """Instantiate the strategy named by the BOOKING_TABLE_ALLOCATOR setting"""
+    path = getattr(settings, 'BOOKING_TABLE_ALLOCATOR', 'bookings.allocation.BestFitAllocator')
+    return import_string(path)()
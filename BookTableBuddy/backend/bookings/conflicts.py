@@ -0,0 +1,108 @@
+"""
+Booking conflict detection.
+
+A confirmed booking holds its table for BOOKING_WINDOW_MINUTES on either side
+of its start time. ConflictIndex keeps the confirmed start times of each table
+sorted, so "is this table free at this time" is a binary search and "which
+tables are free for this window" needs a single query for the whole restaurant.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+
+from .models import Booking
+
+# Minutes a confirmed booking blocks its table before and after its start time
+BOOKING_WINDOW_MINUTES = 90
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+class ConflictIndex:
+    """
+    Sorted confirmed booking start times per table for a single date
+    """
+
+    def __init__(self, bookings, window=BOOKING_WINDOW_MINUTES):
+        """
+        Args:
+            bookings: Iterable of (table_id, time) pairs
+            window: Minutes a booking blocks on either side of its start
+        """
+        self.window = window
+        by_table = defaultdict(list)
+        for table_id, booking_time in bookings:
+            by_table[table_id].append((_minutes(booking_time), booking_time))
+
+        self.starts = {}
+        self.times = {}
+        for table_id, entries in by_table.items():
+            entries.sort()
+            self.starts[table_id] = [minutes for minutes, _ in entries]
+            self.times[table_id] = [booking_time for _, booking_time in entries]
+
+    def conflict(self, table_id, booking_time):
+        """
+        Return the start time of a booking on the table that clashes with
+        `booking_time`, or None if the table is free.
+        """
+        starts = self.starts.get(table_id)
+        if not starts:
+            return None
+        minutes = _minutes(booking_time)
+        i = bisect_left(starts, minutes - self.window)
+        if i < len(starts) and starts[i] <= minutes + self.window:
+            return self.times[table_id][i]
+        return None
+
+    def is_free(self, table_id, booking_time):
+        return self.conflict(table_id, booking_time) is None
+
+    def distance_to_nearest(self, table_id, booking_time):
+        """
+        Minutes between `booking_time` and the closest booking on the table,
+        or None if the table has no bookings that day.
+        """
+        starts = self.starts.get(table_id)
+        if not starts:
+            return None
+        minutes = _minutes(booking_time)
+        i = bisect_left(starts, minutes)
+        neighbours = starts[max(i - 1, 0):i + 1]
+        return min(abs(start - minutes) for start in neighbours)
+
+    def add(self, table_id, booking_time):
+        """Record a new booking in the index"""
+        minutes = _minutes(booking_time)
+        starts = self.starts.setdefault(table_id, [])
+        times = self.times.setdefault(table_id, [])
+        i = bisect_left(starts, minutes)
+        starts.insert(i, minutes)
+        times.insert(i, booking_time)
+
+    def free_tables(self, tables, booking_time):
+        """Filter `tables` (Table objects) down to those free at `booking_time`"""
+        return [table for table in tables if self.is_free(table.id, booking_time)]
+
+
+def load_conflict_index(date, table=None, restaurant=None, exclude_id=None):
+    """
+    Build a ConflictIndex of confirmed bookings on `date` for one table or a
+    whole restaurant with a single query.
+
+    Args:
+        date: The booking date
+        table: Limit to this table
+        restaurant: Limit to the tables of this restaurant
+        exclude_id: Booking to leave out, e.g. the one being updated
+    """
+    bookings = Booking.objects.filter(date=date, status='confirmed')
+    if table is not None:
+        bookings = bookings.filter(table=table)
+    if restaurant is not None:
+        bookings = bookings.filter(table__restaurant=restaurant)
+    if exclude_id is not None:
+        bookings = bookings.exclude(id=exclude_id)
+
+    return ConflictIndex(bookings.values_list('table_id', 'time'))
@@ -0,0 +1,11 @@
+"""
+values()-based equivalent of BookingSerializer (see booktable.fast_serializers)
+"""
+from booktable.fast_serializers import FastListSerializer
+from .serializers import BookingSerializer
+
+
+class FastBookingSerializer(FastListSerializer):
+    """Same output as BookingSerializer"""
+    serializer_class = BookingSerializer
+    fields = tuple(BookingSerializer.Meta.fields)
@@ -0,0 +1,85 @@
+from collections import namedtuple
+from datetime import time
+import random
+import time as timer
+
+from django.core.management.base import BaseCommand
+
+from bookings.allocation import FirstAvailableAllocator, BestFitAllocator, LookAheadAllocator
+from bookings.conflicts import ConflictIndex
+
+SyntheticTable = namedtuple('SyntheticTable', ['id', 'capacity'])
+
+# Party size distribution of a typical dinner service
+PARTY_SIZES = [1, 2, 3, 4, 5, 6, 7, 8]
+PARTY_WEIGHTS = [4, 44, 10, 24, 5, 7, 3, 3]
+
+# Table mix of a mid-sized restaurant, repeated to reach --tables
+TABLE_MIX = [2, 2, 2, 4, 4, 4, 6, 8]
+
+
+class Command(BaseCommand):
+    help = 'Compare table allocation strategies on synthetic service days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=200, help='Number of synthetic days')
+        parser.add_argument('--tables', type=int, default=16, help='Tables per restaurant')
+        parser.add_argument('--requests', type=int, default=60, help='Booking requests per day')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        tables = [
+            SyntheticTable(i + 1, TABLE_MIX[i % len(TABLE_MIX)])
+            for i in range(options['tables'])
+        ]
+
+        # Every strategy sees exactly the same requests
+        days = []
+        for _ in range(options['days']):
+            days.append([
+                (
+                    time(rng.randint(17, 21), rng.choice([0, 15, 30, 45])),
+                    rng.choices(PARTY_SIZES, PARTY_WEIGHTS)[0]
+                )
+                for _ in range(options['requests'])
+            ])
+
+        strategies = [
+            ('first-available', FirstAvailableAllocator()),
+            ('best-fit', BestFitAllocator()),
+            ('best-fit + look-ahead', LookAheadAllocator()),
+        ]
+
+        self.stdout.write(
+            f"{len(days)} days, {len(tables)} tables, {options['requests']} requests per day\n"
+        )
+        self.stdout.write(
+            f"{'strategy':<24}{'accepted':>10}{'rejected':>10}{'seat util':>11}{'us/alloc':>10}"
+        )
+
+        for name, allocator in strategies:
+            accepted = rejected = seated = offered = 0
+            elapsed = 0.0
+
+            for requests in days:
+                conflicts = ConflictIndex([])
+                for booking_time, party_size in requests:
+                    started = timer.perf_counter()
+                    table = allocator.allocate(tables, conflicts, booking_time, party_size)
+                    elapsed += timer.perf_counter() - started
+
+                    if table is None:
+                        rejected += 1
+                        continue
+                    conflicts.add(table.id, booking_time)
+                    accepted += 1
+                    seated += party_size
+                    offered += table.capacity
+
+            total = accepted + rejected
+            utilization = seated / offered if offered else 0
+            latency = elapsed / total * 1e6 if total else 0
+            self.stdout.write(
+                f"{name:<24}{accepted:>10}{rejected:>10}{utilization:>10.1%}{latency:>10.1f}"
+            )
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bookings.reservations import prune_locks
+
+
+class Command(BaseCommand):
+    help = 'Delete the per-table-date reservation locks of past dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-days',
+            dest='keep_days',
+            type=int,
+            default=1,
+            help='Keep the locks of this many days before today (default 1)',
+        )
+
+    def handle(self, *args, **options):
+        if options['keep_days'] < 0:
+            raise CommandError('--keep-days must not be negative')
+
+        before = timezone.now().date() - timedelta(days=options['keep_days'])
+        deleted = prune_locks(before)
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} table lock(s) from before {before}"))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-17 19:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0011_slotinventory'),
+        ('bookings', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableDateLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_locks', to='restaurants.table')),
+            ],
+            options={
+                'unique_together': {('table', 'date')},
+            },
+        ),
+    ]
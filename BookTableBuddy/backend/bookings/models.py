@@ -1,11 +1,58 @@
-from django.db import models
+import logging
+
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth import get_user_model
 from restaurants.models import Table
 from django.core.exceptions import ValidationError
-from django.utils import timezone
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+# Attempts to save a new booking whose generated reference is already taken
+REFERENCE_ATTEMPTS = 3
+
+class BookingQuerySet(models.QuerySet):
+    """
+    Custom queryset for bookings
+    """
+    def with_restaurant(self):
+        """
+        Join the table and restaurant that BookingSerializer and the booking
+        permission checks read
+        """
+        return self.select_related('table__restaurant')
+    
+    def for_list(self, fields=None):
+        """
+        with_restaurant() for list payloads: only the booking columns plus
+        the table and restaurant columns the serializer and permissions use.
+        
+        With `fields` (serializer field names selected by ?fields=/?omit=),
+        only those booking columns are loaded, and the table and restaurant
+        are joined only when a field needs them.
+        """
+        if fields is None:
+            return self.with_restaurant().only(
+                *[field.name for field in self.model._meta.concrete_fields],
+                'table__table_number',
+                'table__restaurant__name',
+                'table__restaurant__manager'
+            )
+        
+        # The sort key of booking lists is always loaded for pagination
+        columns = ['id', 'date', 'time'] + [
+            field.name for field in self.model._meta.concrete_fields if field.name in fields
+        ]
+        if fields & {'restaurant_name', 'restaurant_id', 'table_number'}:
+            return self.with_restaurant().only(
+                *columns,
+                'table__table_number',
+                'table__restaurant__name',
+                'table__restaurant__manager'
+            )
+        return self.only(*columns)
+
 class Booking(models.Model):
     """
     Model for restaurant table bookings
@@ -35,8 +82,16 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BookingQuerySet.as_manager()
+    
     class Meta:
-        ordering = ['-date', '-time']
+        ordering = ['-date', '-time', 'id']
+        indexes = [
+            # Keyset pagination of booking lists, newest first
+            models.Index(fields=['-date', '-time', 'id'], name='booking_date_time_idx'),
+            models.Index(fields=['user', '-date', '-time'], name='booking_user_date_time_idx'),
+            models.Index(fields=['table', '-date', '-time'], name='booking_table_date_time_idx'),
+        ]
         # Add a unique constraint to prevent double bookings
         constraints = [
             models.UniqueConstraint(
@@ -55,26 +110,13 @@ class Booking(models.Model):
         """
         if self.status == 'confirmed':
             # Check if the table is already booked within 1.5 hours of the requested time
-            booking_datetime = timezone.make_aware(
-                timezone.datetime.combine(self.date, self.time)
-            )
-            start_check = booking_datetime - timezone.timedelta(hours=1, minutes=30)
-            end_check = booking_datetime + timezone.timedelta(hours=1, minutes=30)
-            
-            overlapping_bookings = Booking.objects.filter(
-                table=self.table,
-                date=self.date,
-                status='confirmed'
-            ).exclude(id=self.id)
-            
-            for booking in overlapping_bookings:
-                booking_time = timezone.make_aware(
-                    timezone.datetime.combine(booking.date, booking.time)
+            from .conflicts import load_conflict_index
+            conflicts = load_conflict_index(self.date, table=self.table, exclude_id=self.id)
+            conflicting_time = conflicts.conflict(self.table_id, self.time)
+            if conflicting_time is not None:
+                raise ValidationError(
+                    f"This table is already booked at {conflicting_time} on {self.date}."
                 )
-                if start_check <= booking_time <= end_check:
-                    raise ValidationError(
-                        f"This table is already booked at {booking.time} on {booking.date}."
-                    )
             
             # Check if the party size exceeds the table capacity
             if self.party_size > self.table.capacity:
@@ -86,19 +128,43 @@ class Booking(models.Model):
         """
         Generate a unique booking reference if not provided
         """
-        if not self.booking_reference:
-            import random
-            import string
-            
-            # Generate a random 8-character reference
-            chars = string.ascii_uppercase + string.digits
-            reference = ''.join(random.choice(chars) for _ in range(8))
-            
-            # Make sure it's unique
-            while Booking.objects.filter(booking_reference=reference).exists():
-                reference = ''.join(random.choice(chars) for _ in range(8))
-            
-            self.booking_reference = reference
+        from .references import generate_reference
+        
+        # Generated without a query to check it is free (see bookings.references)
+        generated = not self.booking_reference
+        if generated:
+            self.booking_reference = generate_reference()
         
         self.clean()
-        super().save(*args, **kwargs)
+        
+        for attempt in range(1, REFERENCE_ATTEMPTS + 1):
+            try:
+                # Save inside a transaction so the slot inventory is updated
+                # atomically with the booking (see restaurants.signals)
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                # Retry only when a generated reference clashed, not when
+                # e.g. the table was taken
+                if not generated or attempt == REFERENCE_ATTEMPTS or not Booking.objects.filter(
+                    booking_reference=self.booking_reference
+                ).exists():
+                    raise
+                logger.warning(f"Booking reference {self.booking_reference} already taken, generating another")
+                self.booking_reference = generate_reference()
+
+class TableDateLock(models.Model):
+    """
+    One row per table and date, locked with SELECT ... FOR UPDATE while a
+    booking for that table and date is being created so that concurrent
+    reservations only serialize on the table they compete for
+    """
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='booking_locks')
+    date = models.DateField()
+    
+    class Meta:
+        unique_together = ('table', 'date')
+    
+    def __str__(self):
+        return f"Lock for table {self.table_id} on {self.date}"
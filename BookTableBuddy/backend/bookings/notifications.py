@@ -33,7 +33,7 @@ Reservation Details:
 - Date: {formatted_date}
 - Time: {booking.time}
 - Party Size: {booking.party_size} people
-- Confirmation Code: BTB-{booking.id}
+- Confirmation Code: {booking.booking_reference}
 
 Restaurant Location:
 {booking.table.restaurant.address}
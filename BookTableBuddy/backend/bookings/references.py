@@ -0,0 +1,98 @@
+"""
+Booking references generated without querying the database.
+
+A reference packs three numbers into 12 Crockford base32 characters, e.g.
+"0TQ5M8H2K7WZ":
+- the second it was generated, counted from REFERENCE_EPOCH (32 bits)
+- the node ID of the generating process (20 bits)
+- a per-node sequence number within that second (8 bits)
+
+A process never repeats a reference: the sequence counts up within a
+second, and when it runs out the generator moves on to the next second
+rather than waiting. References of processes with different node IDs never
+clash, so they are unique by construction when every process that creates
+bookings gets its own BOOKING_REFERENCE_NODE setting.
+
+Without the setting, each process draws a random node ID, again after a
+fork. Two processes then clash only if they draw the same one of the 2^20
+IDs and generate a reference in the same second with the same sequence
+number. Booking.save() retries with a fresh reference when the unique
+constraint reports such a clash. The alphabet has no I, L, O or U, so codes
+read out over the phone are hard to get wrong.
+"""
+import os
+import secrets
+import threading
+import time
+
+from django.conf import settings
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+# 2024-01-01 00:00:00 UTC; 32 bits of seconds last until 2160
+REFERENCE_EPOCH = 1704067200
+
+NODE_BITS = 20
+SEQUENCE_BITS = 8
+LENGTH = 12  # (32 + 20 + 8) / 5
+
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+
+def encode_reference(seconds, node, sequence):
+    number = (seconds << (NODE_BITS + SEQUENCE_BITS)) | (node << SEQUENCE_BITS) | sequence
+    reference = ''
+    for _ in range(LENGTH):
+        reference = ALPHABET[number & 31] + reference
+        number >>= 5
+    return reference
+
+
+class ReferenceGenerator:
+    """
+    Thread-safe generator of the references of one process. The node and
+    sequence are reset after a fork, so pre-forked workers do not share them.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _reset(self):
+        self._pid = os.getpid()
+        configured = getattr(settings, 'BOOKING_REFERENCE_NODE', None)
+        if configured is not None:
+            self._node = int(configured)
+            if not 0 <= self._node <= MAX_NODE:
+                raise ValueError(f'BOOKING_REFERENCE_NODE must be between 0 and {MAX_NODE}')
+        else:
+            self._node = secrets.randbits(NODE_BITS)
+        self._seconds = -1
+        self._sequence = 0
+
+    def next(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+
+            # Never go back in time, even if the clock does
+            seconds = max(int(time.time()) - REFERENCE_EPOCH, self._seconds)
+            if seconds == self._seconds:
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    # Out of references for this second: use the next one
+                    seconds += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._seconds = seconds
+
+            return encode_reference(seconds, self._node, self._sequence)
+
+
+_generator = ReferenceGenerator()
+
+
+def generate_reference():
+    """A new booking reference, generated without checking the database"""
+    return _generator.next()
@@ -0,0 +1,98 @@
+"""
+Concurrency-safe reservation of tables.
+
+Availability is checked in the serializer against a snapshot of the day's
+bookings, so two requests can both see the same table as free. reserve()
+closes that gap: for each candidate table it locks only that table's
+TableDateLock row, re-checks conflicts under the lock and creates the
+booking, moving on to the next candidate when it loses a race.
+
+The row lock needs a database that supports SELECT ... FOR UPDATE, such as
+PostgreSQL or MySQL. On SQLite select_for_update() does nothing: writers are
+serialized by the database-wide write lock instead, and a request that read
+before another one wrote fails with "database is locked" when it tries to
+write. Such lock errors, and deadlocks or serialization failures on other
+databases, are retried a few times before the table is given up. Any other
+database error is raised.
+
+A TableDateLock row is created per table and booked date. prune_locks()
+deletes the rows of past dates; run the prune_table_locks command daily.
+"""
+from time import sleep
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, OperationalError, transaction
+
+from .conflicts import load_conflict_index
+from .models import Booking, TableDateLock
+
+# Attempts per table when the database reports a lock conflict, and the
+# pause before the first retry (doubled after every attempt)
+LOCK_ATTEMPTS = 3
+LOCK_RETRY_SECONDS = 0.05
+
+# SQLSTATEs of PostgreSQL deadlocks and serialization failures
+LOCK_ERROR_CODES = {'40P01', '40001'}
+
+
+def is_lock_error(error):
+    """Whether an OperationalError means the transaction lost a lock conflict"""
+    if getattr(error.__cause__, 'pgcode', None) in LOCK_ERROR_CODES:
+        return True
+    # SQLite: "database is locked" or "database table is locked"
+    return 'is locked' in str(error)
+
+
+def _book_locked(table, date, time, **fields):
+    with transaction.atomic():
+        lock, _ = TableDateLock.objects.get_or_create(table=table, date=date)
+        TableDateLock.objects.select_for_update().get(pk=lock.pk)
+
+        conflicts = load_conflict_index(date, table=table)
+        if not conflicts.is_free(table.id, time):
+            return None
+
+        return Booking.objects.create(table=table, date=date, time=time, **fields)
+
+
+def reserve_table(table, date, time, **fields):
+    """
+    Book `table` at `date`/`time` while holding the table-date lock.
+
+    Returns the new Booking, or None if the table is no longer free or the
+    database stayed locked by other writers.
+    """
+    delay = LOCK_RETRY_SECONDS
+    for attempt in range(1, LOCK_ATTEMPTS + 1):
+        try:
+            return _book_locked(table, date, time, **fields)
+        except (IntegrityError, ValidationError):
+            # Another request took the table between the check and the insert
+            return None
+        except OperationalError as e:
+            if not is_lock_error(e):
+                raise
+            # The whole transaction was rolled back, so it can simply be retried
+            print(f"Database locked while reserving table {table.id} (attempt {attempt}): {str(e)}")
+            if attempt == LOCK_ATTEMPTS:
+                return None
+            sleep(delay)
+            delay *= 2
+
+
+def reserve(tables, date, time, **fields):
+    """
+    Try the candidate tables in order and return the first booking made,
+    or None if every table was taken.
+    """
+    for table in tables:
+        booking = reserve_table(table, date, time, **fields)
+        if booking is not None:
+            return booking
+    return None
+
+
+def prune_locks(before):
+    """Delete the table-date locks of dates before `before`; returns how many"""
+    deleted, _ = TableDateLock.objects.filter(date__lt=before).delete()
+    return deleted
@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from .models import Booking
+from .conflicts import load_conflict_index
+from .allocation import get_allocator
+from .reservations import reserve
 from restaurants.models import Table, Restaurant
-from django.utils import timezone
-from datetime import timedelta
+from booktable.sparse_fields import SparseFieldsetMixin
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     restaurant_name = serializers.CharField(source='table.restaurant.name', read_only=True)
     restaurant_id = serializers.IntegerField(source='table.restaurant.id', read_only=True)
     table_number = serializers.CharField(source='table.table_number', read_only=True)
@@ -34,26 +36,16 @@ class BookingSerializer(serializers.ModelSerializer):
                 )
             
             # Validate table availability
-            booking_datetime = timezone.datetime.combine(date, time)
-            start_check = (booking_datetime - timedelta(hours=1, minutes=30)).time()
-            end_check = (booking_datetime + timedelta(hours=1, minutes=30)).time()
-            
-            # Get all confirmed bookings for this table on this date
-            from .models import Booking
-            existing_bookings = Booking.objects.filter(
+            conflicts = load_conflict_index(
+                date,
                 table=table,
-                date=date,
-                status='confirmed'
+                exclude_id=self.instance.id if self.instance else None
             )
-            
-            if self.instance:
-                existing_bookings = existing_bookings.exclude(id=self.instance.id)
-            
-            for booking in existing_bookings:
-                if start_check <= booking.time <= end_check:
-                    raise serializers.ValidationError(
-                        f"This table is already booked at {booking.time} on {date}."
-                    )
+            conflicting_time = conflicts.conflict(table.id, time)
+            if conflicting_time is not None:
+                raise serializers.ValidationError(
+                    f"This table is already booked at {conflicting_time} on {date}."
+                )
             
             # Validate that the restaurant is open at this time
             restaurant = table.restaurant
@@ -114,60 +106,45 @@ class BookingCreateSerializer(serializers.Serializer):
                 "The restaurant is not open on this day."
             )
         
-        # Find an available table
-        booking_datetime = timezone.datetime.combine(date, time)
-        start_check = (booking_datetime - timedelta(hours=1, minutes=30)).time()
-        end_check = (booking_datetime + timedelta(hours=1, minutes=30)).time()
-        
         # Get tables that can accommodate the party size
-        tables = Table.objects.filter(
+        tables = list(Table.objects.filter(
             restaurant=restaurant,
             capacity__gte=party_size
-        )
+        ))
         
-        if not tables.exists():
+        if not tables:
             raise serializers.ValidationError(
                 f"No tables available for a party of {party_size}."
             )
         
-        # Get all bookings for this restaurant at this time
-        from .models import Booking
-        existing_bookings = Booking.objects.filter(
-            table__restaurant=restaurant,
-            date=date,
-            status='confirmed'
-        )
-        
-        # Find tables that are not booked
-        available_tables = []
-        for table in tables:
-            is_available = True
-            for booking in existing_bookings.filter(table=table):
-                if start_check <= booking.time <= end_check:
-                    is_available = False
-                    break
-            
-            if is_available:
-                available_tables.append(table)
+        # Load the day's confirmed bookings for the restaurant once and let the
+        # allocation strategy pick a free table
+        conflicts = load_conflict_index(date, restaurant=restaurant)
+        ranked_tables = get_allocator().rank(tables, conflicts, time, party_size)
         
-        if not available_tables:
+        if not ranked_tables:
             raise serializers.ValidationError(
                 "No tables available at this time. Please try a different time."
             )
         
-        # Store the available table to use in create method
-        data['available_table'] = available_tables[0]
+        # Store the ranked tables to use in create method; later ones are
+        # fallbacks if a concurrent booking takes the first
+        data['ranked_tables'] = ranked_tables
         return data
     
     def create(self, validated_data):
-        table = validated_data.pop('available_table')
-        restaurant_id = validated_data.pop('restaurant_id')
+        ranked_tables = validated_data.pop('ranked_tables')
+        validated_data.pop('restaurant_id')
         
-        from .models import Booking
-        booking = Booking.objects.create(
+        booking = reserve(
+            ranked_tables,
             user=self.context['request'].user,
-            table=table,
             **validated_data
         )
         
+        if booking is None:
+            raise serializers.ValidationError(
+                "No tables available at this time. Please try a different time."
+            )
+        
         return booking
@@ -37,7 +37,7 @@ def send_booking_confirmation_sms(booking):
         Date: {formatted_date}
         Time: {booking.time}
         Party: {booking.party_size} people
-        Confirmation #: BTB-{booking.id}
+        Confirmation #: {booking.booking_reference}
         
         Reply HELP for help or STOP to unsubscribe.
         """
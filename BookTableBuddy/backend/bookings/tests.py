@@ -0,0 +1,408 @@
+"""
+Booking list endpoints must return the same JSON with and without the fast
+values()-based serializers (FAST_LIST_SERIALIZERS).
+
+Reservations retry lock conflicts only, and past table-date locks are pruned.
+
+Bookings hold their table for the conflict window on either side of their
+start, booking lists page by keyset cursors, and references stay unique
+without looking at the database. A generated reference that clashes anyway
+is replaced when the booking is saved.
+
+The date range export streams the same bookings as NDJSON or CSV.
+"""
+import csv
+import json
+import threading
+from datetime import date, time, timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from booktable.testing import RestaurantFixtureMixin
+from users.models import User
+from . import references, reservations
+from .conflicts import ConflictIndex
+from .models import REFERENCE_ATTEMPTS, Booking, TableDateLock
+
+
+class FastListSerializerTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(3)
+
+    def test_my_bookings(self):
+        self.client.force_authenticate(self.customer)
+        data = self.assertSameWithFastSerializers('/api/bookings/my-bookings/')
+        self.assertEqual(len(data['results']), 6)
+        self.assertSameWithFastSerializers('/api/bookings/my-bookings/', {'fields': 'id,restaurant_name'})
+
+    def test_restaurant_bookings(self):
+        self.client.force_authenticate(self.manager)
+        data = self.assertSameWithFastSerializers(f'/api/bookings/restaurant/{self.restaurants[0].id}/')
+        self.assertEqual(len(data['results']), 2)
+
+    def test_today_bookings(self):
+        self.client.force_authenticate(self.manager)
+        data = self.assertSameWithFastSerializers('/api/bookings/today/')
+        self.assertEqual(len(data['results']), 6)
+
+    def test_date_range_bookings(self):
+        admin = User.objects.create_user('admin', 'admin@example.com', 'pw', role=User.ADMIN)
+        self.client.force_authenticate(admin)
+        params = {'start_date': date.today().isoformat(), 'end_date': (date.today() + timedelta(days=1)).isoformat()}
+        data = self.assertSameWithFastSerializers('/api/bookings/date-range/', params)
+        self.assertEqual(len(data['results']), 6)
+        self.assertSameWithFastSerializers('/api/bookings/date-range/', dict(params, omit='special_requests'))
+
+
+class ReservationTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(1, related=2)
+        self.tables = list(self.restaurants[0].tables.order_by('id'))
+        self.date = date.today() + timedelta(days=2)
+        self.fields = {
+            'user': self.customer,
+            'party_size': 2,
+            'contact_name': 'Customer',
+            'contact_email': 'customer@example.com',
+            'contact_phone': '555-0101'
+        }
+
+    def test_reserve_skips_taken_table(self):
+        first = reservations.reserve(self.tables, self.date, time(19), **self.fields)
+        second = reservations.reserve(self.tables, self.date, time(19, 30), **self.fields)
+        self.assertEqual([first.table, second.table], self.tables)
+        self.assertIsNone(reservations.reserve(self.tables, self.date, time(20), **self.fields))
+
+    def test_lock_errors_retried(self):
+        real = reservations._book_locked
+        attempts = []
+        
+        def book_after_lock_error(*args, **kwargs):
+            attempts.append(args)
+            if len(attempts) == 1:
+                raise OperationalError('database is locked')
+            return real(*args, **kwargs)
+        
+        with mock.patch.object(reservations, 'LOCK_RETRY_SECONDS', 0), \
+                mock.patch.object(reservations, '_book_locked', side_effect=book_after_lock_error):
+            booking = reservations.reserve_table(self.tables[0], self.date, time(19), **self.fields)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(booking.table, self.tables[0])
+
+    def test_lock_errors_give_up(self):
+        locked = OperationalError('database is locked')
+        with mock.patch.object(reservations, 'LOCK_RETRY_SECONDS', 0), \
+                mock.patch.object(reservations, '_book_locked', side_effect=locked) as book:
+            self.assertIsNone(reservations.reserve_table(self.tables[0], self.date, time(19), **self.fields))
+        self.assertEqual(book.call_count, reservations.LOCK_ATTEMPTS)
+
+    def test_other_database_errors_raised(self):
+        with mock.patch.object(reservations, '_book_locked', side_effect=OperationalError('disk I/O error')) as book:
+            with self.assertRaises(OperationalError):
+                reservations.reserve_table(self.tables[0], self.date, time(19), **self.fields)
+        self.assertEqual(book.call_count, 1)
+
+    def test_prune_locks(self):
+        today = date.today()
+        for offset in (-3, -1, 0, 2):
+            TableDateLock.objects.create(table=self.tables[0], date=today + timedelta(days=offset))
+        call_command('prune_table_locks', stdout=StringIO())
+        self.assertEqual(
+            sorted(TableDateLock.objects.values_list('date', flat=True)),
+            [today - timedelta(days=1), today, today + timedelta(days=2)]
+        )
+
+
+class ConflictIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = ConflictIndex([(1, time(19)), (1, time(12)), (2, time(20))])
+
+    def test_window(self):
+        self.assertEqual(self.index.conflict(1, time(17, 30)), time(19))
+        self.assertEqual(self.index.conflict(1, time(20, 30)), time(19))
+        self.assertIsNone(self.index.conflict(1, time(17, 29)))
+        self.assertIsNone(self.index.conflict(1, time(20, 31)))
+        self.assertIsNone(self.index.conflict(3, time(19)))
+
+    def test_nearest(self):
+        self.assertEqual(self.index.distance_to_nearest(1, time(15)), 180)
+        self.assertEqual(self.index.distance_to_nearest(1, time(21)), 120)
+        self.assertIsNone(self.index.distance_to_nearest(3, time(15)))
+
+    def test_add(self):
+        self.index.add(1, time(15, 30))
+        self.assertEqual(self.index.conflict(1, time(16)), time(15, 30))
+        self.assertEqual(self.index.times[1], [time(12), time(15, 30), time(19)])
+
+    def test_free_tables(self):
+        tables = [SimpleNamespace(id=table_id) for table_id in (1, 2, 3)]
+        self.assertEqual([table.id for table in self.index.free_tables(tables, time(19, 45))], [3])
+        self.assertEqual([table.id for table in self.index.free_tables(tables, time(16))], [1, 2, 3])
+
+
+class BookingConflictTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Tables for 2 and 4
+        self.add_restaurants(1, related=2)
+        self.restaurant = self.restaurants[0]
+        self.client.force_authenticate(self.customer)
+        self.date = date.today() + timedelta(days=2)
+
+    def book(self, booking_time, party_size=2):
+        return self.client.post('/api/bookings/create/', {
+            'restaurant_id': self.restaurant.id,
+            'date': self.date.isoformat(),
+            'time': booking_time,
+            'party_size': party_size,
+            'contact_name': 'Customer',
+            'contact_email': 'customer@example.com',
+            'contact_phone': '555-0101'
+        })
+
+    def test_tables_fill_up(self):
+        first = self.book('19:00')
+        second = self.book('19:30')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertNotEqual(first.data['table'], second.data['table'])
+        self.assertEqual(self.book('20:00').status_code, 400)
+        # Clear of both bookings' windows
+        self.assertEqual(self.book('21:01').status_code, 201)
+
+    def test_party_size(self):
+        self.assertEqual(self.book('19:00', party_size=4).status_code, 201)
+        self.assertEqual(self.book('19:00', party_size=3).status_code, 400)
+        self.assertEqual(self.book('19:00', party_size=2).status_code, 201)
+
+    def test_cancelled_booking_frees_table(self):
+        bookings = [self.book('19:00'), self.book('19:00')]
+        Booking.objects.filter(pk=bookings[0].data['id']).update(status='cancelled')
+        self.assertEqual(self.book('19:30').status_code, 201)
+
+    def test_clean(self):
+        table = self.restaurant.tables.order_by('id').first()
+        fields = {
+            'user': self.customer, 'table': table, 'date': self.date, 'party_size': 2,
+            'contact_name': 'Customer', 'contact_email': 'customer@example.com', 'contact_phone': '555-0101'
+        }
+        booking = Booking.objects.create(time=time(19), **fields)
+        with self.assertRaises(ValidationError):
+            Booking(time=time(20), **fields).clean()
+        # A booking does not clash with itself
+        booking.time = time(19, 30)
+        booking.clean()
+
+
+class KeysetPaginationTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(1, related=2)
+        tables = list(self.restaurants[0].tables.all())
+        start = date.today() + timedelta(days=1)
+        for day in range(3):
+            for hour in (12, 19):
+                for table in tables:
+                    self.create_booking(table, start + timedelta(days=day), time(hour))
+        self.client.force_authenticate(self.customer)
+        self.url = '/api/bookings/my-bookings/'
+        # Including the fixture's bookings for today
+        self.total = Booking.objects.filter(user=self.customer).count()
+
+    def create_booking(self, table, booking_date, booking_time):
+        return Booking.objects.create(
+            user=self.customer, table=table, date=booking_date, time=booking_time, party_size=2,
+            contact_name='Customer', contact_email='customer@example.com', contact_phone='555-0101'
+        )
+
+    def walk(self, response):
+        ids = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [item['id'] for item in response.data['results']]
+            if response.data['next'] is None:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_pages(self):
+        response = self.client.get(self.url, {'page_size': 5})
+        self.assertEqual(len(response.data['results']), 5)
+        ids = self.walk(response)
+        # Newest first, ties broken by ID
+        by_key = sorted(
+            Booking.objects.filter(user=self.customer).values_list('date', 'time', 'id'),
+            key=lambda row: (-row[0].toordinal(), -(row[1].hour * 60 + row[1].minute), row[2])
+        )
+        self.assertEqual(ids, [booking_id for _, _, booking_id in by_key])
+
+    def test_rows_added_while_paging(self):
+        first = self.client.get(self.url, {'page_size': 5})
+        # Sorts before the first page, so the rest of the walk is unaffected
+        table = self.restaurants[0].tables.first()
+        self.create_booking(table, date.today() + timedelta(days=10), time(12))
+        ids = [item['id'] for item in first.data['results']] + self.walk(self.client.get(first.data['next']))
+        self.assertEqual(len(ids), self.total)
+        self.assertEqual(len(set(ids)), self.total)
+
+    def test_page_size_limits(self):
+        response = self.client.get(self.url, {'page_size': 0})
+        self.assertEqual(len(response.data['results']), 1)
+        response = self.client.get(self.url, {'page_size': 'all'})
+        self.assertEqual(len(response.data['results']), self.total)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'nonsense'}).status_code, 404)
+
+
+class ReferenceTests(SimpleTestCase):
+
+    def test_format(self):
+        reference = references.generate_reference()
+        self.assertEqual(len(reference), references.LENGTH)
+        self.assertTrue(set(reference) <= set(references.ALPHABET))
+        self.assertEqual(references.encode_reference(0, 0, 0), '0' * references.LENGTH)
+        self.assertEqual(references.encode_reference(0, 0, 31), '0' * (references.LENGTH - 1) + 'Z')
+
+    def test_unique_across_threads(self):
+        generator = references.ReferenceGenerator()
+        generated = []
+
+        def generate():
+            generated.extend(generator.next() for _ in range(500))
+
+        threads = [threading.Thread(target=generate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(generated)), 2000)
+
+    def test_sequence_overflow(self):
+        # More references in one second than the sequence can number
+        generator = references.ReferenceGenerator()
+        with mock.patch.object(references.time, 'time', return_value=references.REFERENCE_EPOCH + 100):
+            generated = [generator.next() for _ in range(references.MAX_SEQUENCE + 2)]
+        self.assertEqual(len(set(generated)), len(generated))
+        self.assertEqual(generated, sorted(generated))
+
+    def test_clock_going_back(self):
+        generator = references.ReferenceGenerator()
+        with mock.patch.object(references.time, 'time', return_value=references.REFERENCE_EPOCH + 100):
+            later = generator.next()
+        with mock.patch.object(references.time, 'time', return_value=references.REFERENCE_EPOCH + 50):
+            earlier = generator.next()
+        self.assertGreater(earlier, later)
+
+    def test_configured_node(self):
+        with override_settings(BOOKING_REFERENCE_NODE=references.MAX_NODE), \
+                mock.patch.object(references.time, 'time', return_value=references.REFERENCE_EPOCH + 100):
+            reference = references.ReferenceGenerator().next()
+        self.assertEqual(reference, references.encode_reference(100, references.MAX_NODE, 0))
+        with override_settings(BOOKING_REFERENCE_NODE=references.MAX_NODE + 1):
+            with self.assertRaises(ValueError):
+                references.ReferenceGenerator().next()
+
+    def test_fork_draws_new_node(self):
+        # Pre-forked workers inherit the generator of their parent
+        generator = references.ReferenceGenerator()
+        with mock.patch.object(references.time, 'time', return_value=references.REFERENCE_EPOCH + 100), \
+                mock.patch.object(references.secrets, 'randbits', side_effect=[1, 2]), \
+                mock.patch.object(references.os, 'getpid', return_value=100) as getpid:
+            generated = [generator.next(), generator.next()]
+            getpid.return_value = 101
+            generated.append(generator.next())
+        self.assertEqual(generated, [
+            references.encode_reference(100, 1, 0),
+            references.encode_reference(100, 1, 1),
+            references.encode_reference(100, 2, 0),
+        ])
+
+
+class BookingReferenceSaveTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(1, related=2)
+        self.tables = list(self.restaurants[0].tables.order_by('id'))
+        self.taken = Booking.objects.order_by('id').first().booking_reference
+
+    def create_booking(self, **fields):
+        return Booking.objects.create(
+            user=self.customer, table=self.tables[0], date=date.today() + timedelta(days=1), time=time(19),
+            party_size=2, contact_name='Customer', contact_email='customer@example.com', contact_phone='555-0101',
+            **fields
+        )
+
+    def test_collision_retried(self):
+        with mock.patch.object(references, 'generate_reference', side_effect=[self.taken, 'FRESHREF0000']), \
+                self.assertLogs('bookings.models', 'WARNING'):
+            booking = self.create_booking()
+        self.assertEqual(booking.booking_reference, 'FRESHREF0000')
+
+    def test_collision_gives_up(self):
+        with mock.patch.object(references, 'generate_reference', return_value=self.taken) as generate, \
+                self.assertLogs('bookings.models', 'WARNING'):
+            with self.assertRaises(IntegrityError):
+                self.create_booking()
+        self.assertEqual(generate.call_count, REFERENCE_ATTEMPTS)
+        self.assertFalse(Booking.objects.filter(date=date.today() + timedelta(days=1)).exists())
+
+    def test_given_reference_not_replaced(self):
+        with mock.patch.object(references, 'generate_reference') as generate:
+            with self.assertRaises(IntegrityError):
+                self.create_booking(booking_reference=self.taken)
+        generate.assert_not_called()
+
+
+class BookingExportTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(2, related=1)
+        Booking.objects.filter(pk=Booking.objects.order_by('id').first().pk).update(
+            contact_name='=HYPERLINK("http://example.com","Click")', special_requests='-2+3'
+        )
+        self.client.force_authenticate(User.objects.create_user('admin', 'admin@example.com', 'pw', role=User.ADMIN))
+        self.url = '/api/bookings/date-range/export/'
+        self.params = {'start_date': date.today().isoformat(), 'end_date': date.today().isoformat()}
+
+    def download(self, **params):
+        response = self.client.get(self.url, dict(self.params, **params))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        lines = self.download().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(sorted(row['id'] for row in rows), sorted(Booking.objects.values_list('id', flat=True)))
+        # NDJSON keeps the values as they are
+        self.assertIn('=HYPERLINK("http://example.com","Click")', [row['contact_name'] for row in rows])
+
+    def test_csv(self):
+        rows = list(csv.DictReader(StringIO(self.download(format='csv', fields='id,contact_name,special_requests,party_size'))))
+        self.assertEqual(len(rows), 2)
+        # Columns in the serializer's field order
+        self.assertEqual(list(rows[0]), ['id', 'party_size', 'special_requests', 'contact_name'])
+        first = min(rows, key=lambda row: int(row['id']))
+        self.assertEqual(first['contact_name'], '\'=HYPERLINK("http://example.com","Click")')
+        self.assertEqual(first['special_requests'], "'-2+3")
+        self.assertEqual(first['party_size'], '2')
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url, dict(self.params, format='xlsx'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('xlsx', response.data['error'])
@@ -8,7 +8,8 @@ from .views import (
     TodayBookingsView,
     CompleteBookingView,
     NoShowBookingView,
-    DateRangeBookingsView
+    DateRangeBookingsView,
+    DateRangeBookingsExportView
 )
 
 urlpatterns = [
@@ -21,4 +22,5 @@ urlpatterns = [
     path('no-show/<int:pk>/', NoShowBookingView.as_view(), name='no-show-booking'),
     path('today/', TodayBookingsView.as_view(), name='today-bookings'),
     path('date-range/', DateRangeBookingsView.as_view(), name='date-range-bookings'),
+    path('date-range/export/', DateRangeBookingsExportView.as_view(), name='date-range-bookings-export'),
 ]
@@ -9,6 +9,10 @@ from django.db.models import Q
 from .models import Booking
 from .serializers import BookingSerializer, BookingCreateSerializer
 from restaurants.models import Restaurant, Table
+from booktable.pagination import BookingPagination
+from booktable.fast_serializers import FastListMixin
+from booktable.exports import StreamingExportMixin
+from .fast_serializers import FastBookingSerializer
 
 User = get_user_model()
 
@@ -19,7 +23,7 @@ class IsRestaurantManagerForBooking(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return request.user.is_authenticated and (
             request.user.role == User.RESTAURANT_MANAGER and 
-            obj.table.restaurant.manager == request.user
+            obj.table.restaurant.manager_id == request.user.id
         )
 
 class IsBookingOwner(permissions.BasePermission):
@@ -27,7 +31,7 @@ class IsBookingOwner(permissions.BasePermission):
     Custom permission for users to access only their own bookings
     """
     def has_object_permission(self, request, view, obj):
-        return request.user.is_authenticated and obj.user == request.user
+        return request.user.is_authenticated and obj.user_id == request.user.id
 
 # Import our notification modules
 from .notifications import send_booking_confirmation
@@ -64,15 +68,19 @@ class BookingCreateView(generics.CreateAPIView):
             headers=headers
         )
 
-class UserBookingsListView(generics.ListAPIView):
+class UserBookingsListView(FastListMixin, generics.ListAPIView):
     """
     API endpoint to list bookings for the current user
     """
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookingPagination
+    fast_serializer_class = FastBookingSerializer
     
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user)
+        # Only load what ?fields=/?omit= selected
+        fields = self.get_serializer_class().requested_fields(self.request)
+        return Booking.objects.for_list(fields).filter(user=self.request.user)
 
 class IsBookingOwnerOrRestaurantManager(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -101,13 +109,13 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
         # Filter based on user role
         if user.role == User.ADMIN:
             # Admins can see all bookings
-            return Booking.objects.all()
+            return Booking.objects.with_restaurant()
         elif user.role == User.RESTAURANT_MANAGER:
             # Restaurant managers see bookings for their restaurants
-            return Booking.objects.filter(table__restaurant__manager=user)
+            return Booking.objects.with_restaurant().filter(table__restaurant__manager=user)
         else:
             # Regular customers see only their own bookings
-            return Booking.objects.filter(user=user)
+            return Booking.objects.with_restaurant().filter(user=user)
     
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -127,29 +135,33 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         return Response(serializer.data)
 
-class RestaurantBookingsView(generics.ListAPIView):
+class RestaurantBookingsView(FastListMixin, generics.ListAPIView):
     """
     API endpoint to list bookings for a restaurant
     """
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookingPagination
+    fast_serializer_class = FastBookingSerializer
     
     def get_queryset(self):
+        # Only load what ?fields=/?omit= selected
+        fields = self.get_serializer_class().requested_fields(self.request)
         user = self.request.user
         restaurant_id = self.kwargs.get('restaurant_id')
         
         if user.role == User.ADMIN:
             # Admins can see all bookings for any restaurant
-            return Booking.objects.filter(table__restaurant_id=restaurant_id)
+            return Booking.objects.for_list(fields).filter(table__restaurant_id=restaurant_id)
         elif user.role == User.RESTAURANT_MANAGER:
             # Restaurant managers can only see bookings for their own restaurants
-            return Booking.objects.filter(
+            return Booking.objects.for_list(fields).filter(
                 table__restaurant_id=restaurant_id,
                 table__restaurant__manager=user
             )
         else:
             # Regular users can only see their own bookings for this restaurant
-            return Booking.objects.filter(
+            return Booking.objects.for_list(fields).filter(
                 table__restaurant_id=restaurant_id,
                 user=user
             )
@@ -161,7 +173,7 @@ class CancelBookingView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsBookingOwner]
     
     def patch(self, request, pk):
-        booking = get_object_or_404(Booking, pk=pk, user=request.user)
+        booking = get_object_or_404(Booking.objects.with_restaurant(), pk=pk, user=request.user)
         
         if booking.status == 'cancelled':
             return Response(
@@ -175,21 +187,25 @@ class CancelBookingView(APIView):
         serializer = BookingSerializer(booking)
         return Response(serializer.data)
 
-class TodayBookingsView(generics.ListAPIView):
+class TodayBookingsView(FastListMixin, generics.ListAPIView):
     """
     API endpoint to list bookings for today for restaurant managers
     """
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookingPagination
+    fast_serializer_class = FastBookingSerializer
     
     def get_queryset(self):
+        # Only load what ?fields=/?omit= selected
+        fields = self.get_serializer_class().requested_fields(self.request)
         user = self.request.user
         today = timezone.now().date()
         restaurant_id = self.request.query_params.get('restaurant_id')
         
         if user.role == User.ADMIN:
             # Admins can see all bookings for today, with optional restaurant filter
-            queryset = Booking.objects.filter(date=today)
+            queryset = Booking.objects.for_list(fields).filter(date=today)
             if restaurant_id:
                 queryset = queryset.filter(table__restaurant_id=restaurant_id)
             return queryset
@@ -204,7 +220,7 @@ class TodayBookingsView(generics.ListAPIView):
             ).values_list('id', flat=True)
             
             # Then filter bookings for those restaurants
-            base_query = Booking.objects.filter(
+            base_query = Booking.objects.for_list(fields).filter(
                 date=today,
                 table__restaurant__manager=user,
                 table__restaurant_id__in=approved_restaurant_ids
@@ -224,7 +240,7 @@ class TodayBookingsView(generics.ListAPIView):
             ).values_list('id', flat=True)
             
             # Then filter bookings for approved restaurants only
-            queryset = Booking.objects.filter(
+            queryset = Booking.objects.for_list(fields).filter(
                 date=today,
                 user=user,
                 table__restaurant_id__in=approved_restaurant_ids
@@ -241,11 +257,11 @@ class CompleteBookingView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def patch(self, request, pk):
-        booking = get_object_or_404(Booking, id=pk)
+        booking = get_object_or_404(Booking.objects.with_restaurant(), id=pk)
         
         # Check if the user is the restaurant manager for this booking
         user = request.user
-        if user.role != User.RESTAURANT_MANAGER or booking.table.restaurant.manager != user:
+        if user.role != User.RESTAURANT_MANAGER or booking.table.restaurant.manager_id != user.id:
             return Response(
                 {"error": "You are not authorized to mark this booking as completed."},
                 status=status.HTTP_403_FORBIDDEN
@@ -276,11 +292,11 @@ class NoShowBookingView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def patch(self, request, pk):
-        booking = get_object_or_404(Booking, id=pk)
+        booking = get_object_or_404(Booking.objects.with_restaurant(), id=pk)
         
         # Check if the user is the restaurant manager for this booking
         user = request.user
-        if user.role != User.RESTAURANT_MANAGER or booking.table.restaurant.manager != user:
+        if user.role != User.RESTAURANT_MANAGER or booking.table.restaurant.manager_id != user.id:
             return Response(
                 {"error": "You are not authorized to mark this booking as no-show."},
                 status=status.HTTP_403_FORBIDDEN
@@ -304,14 +320,18 @@ class NoShowBookingView(APIView):
         )
 
 
-class DateRangeBookingsView(generics.ListAPIView):
+class DateRangeBookingsView(FastListMixin, generics.ListAPIView):
     """
     API endpoint to list bookings for a date range (for restaurant managers and admins)
     """
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookingPagination
+    fast_serializer_class = FastBookingSerializer
     
     def get_queryset(self):
+        # Only load what ?fields=/?omit= selected
+        fields = self.get_serializer_class().requested_fields(self.request)
         user = self.request.user
         
         # Get query parameters
@@ -340,7 +360,7 @@ class DateRangeBookingsView(generics.ListAPIView):
         # Handle different user roles
         if user.role == User.ADMIN:
             # Admins can see all bookings, with optional restaurant filter
-            queryset = Booking.objects.filter(date__gte=start_date, date__lte=end_date)
+            queryset = Booking.objects.for_list(fields).filter(date__gte=start_date, date__lte=end_date)
             if restaurant_id:
                 queryset = queryset.filter(table__restaurant_id=restaurant_id)
             return queryset
@@ -354,7 +374,7 @@ class DateRangeBookingsView(generics.ListAPIView):
             ).values_list('id', flat=True)
             
             # Filter bookings by date range and manager's restaurants
-            base_query = Booking.objects.filter(
+            base_query = Booking.objects.for_list(fields).filter(
                 date__gte=start_date,
                 date__lte=end_date,
                 table__restaurant__manager=user,
@@ -368,7 +388,7 @@ class DateRangeBookingsView(generics.ListAPIView):
         
         else:
             # Regular customers can only see their own bookings
-            queryset = Booking.objects.filter(
+            queryset = Booking.objects.for_list(fields).filter(
                 date__gte=start_date,
                 date__lte=end_date,
                 user=user,
@@ -377,3 +397,15 @@ class DateRangeBookingsView(generics.ListAPIView):
             if restaurant_id:
                 queryset = queryset.filter(table__restaurant_id=restaurant_id)
             return queryset
+
+
+class DateRangeBookingsExportView(StreamingExportMixin, DateRangeBookingsView):
+    """
+    API endpoint to download the bookings of a date range as a stream, with
+    the same filters and role scoping as DateRangeBookingsView.
+    
+    Query parameters: start_date, end_date, restaurant_id, fields/omit, and
+    format ("ndjson", the default, or "csv")
+    """
+    export_serializer_class = FastBookingSerializer
+    export_filename = 'bookings'
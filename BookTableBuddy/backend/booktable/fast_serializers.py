@@ -0,0 +1,123 @@
+"""
+Fast read path for list endpoints.
+
+A FastListSerializer fetches rows with .values() and turns them into dicts
+through a field map compiled once from the matching DRF serializer, skipping
+the per-object field machinery of ModelSerializer. The output is the same
+JSON as the DRF serializer. Views opt in with FastListMixin, and the path is
+enabled with the FAST_LIST_SERIALIZERS setting.
+"""
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+def _identity(value):
+    return value
+
+
+class FastListSerializer:
+    """
+    Serialize .values() rows with a precompiled field map.
+
+    Subclasses set `serializer_class` and list in `fields` the serializer
+    fields that map directly to a model column or a related column; other
+    fields are added by overriding serialize().
+    """
+    serializer_class = None
+    fields = ()
+
+    _field_maps = {}
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        # Fields selected by ?fields=/?omit=, see booktable.sparse_fields
+        requested_fields = getattr(self.serializer_class, 'requested_fields', None)
+        self.selected_fields = requested_fields(self.context.get('request')) if requested_fields else None
+        self.selected_field_map = [item for item in self.field_map() if self.includes(item[0])]
+
+    @classmethod
+    def field_map(cls):
+        """[(output name, values() key, converter)], compiled once per class"""
+        if cls not in FastListSerializer._field_maps:
+            serializer_fields = cls.serializer_class().fields
+            field_map = []
+            for name in cls.fields:
+                field = serializer_fields[name]
+                key = field.source.replace('.', '__')
+                if isinstance(field, serializers.RelatedField):
+                    # values() already returns the primary key
+                    convert = _identity
+                else:
+                    convert = field.to_representation
+                field_map.append((name, key, convert))
+            FastListSerializer._field_maps[cls] = field_map
+        return FastListSerializer._field_maps[cls]
+
+    def includes(self, name):
+        return self.selected_fields is None or name in self.selected_fields
+
+    def value_keys(self):
+        """Keys to pass to values()"""
+        return [key for _, key, _ in self.selected_field_map]
+
+    def values(self, queryset, extra_keys=()):
+        """
+        The rows this serializer needs, as a values() queryset. `extra_keys`
+        are loaded as well, e.g. the sort key used by pagination.
+        """
+        keys = list(dict.fromkeys(self.value_keys() + list(extra_keys)))
+        return queryset.prefetch_related(None).values(*keys)
+
+    def to_representation(self, row):
+        return {
+            name: None if row[key] is None else convert(row[key])
+            for name, key, convert in self.selected_field_map
+        }
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class FastListMixin:
+    """
+    Serve list responses through `fast_serializer_class` when the
+    FAST_LIST_SERIALIZERS setting is on
+    """
+    fast_serializer_class = None
+
+    def use_fast_serializer(self):
+        return self.fast_serializer_class is not None and getattr(settings, 'FAST_LIST_SERIALIZERS', False)
+
+    def get_fast_serializer(self):
+        return self.fast_serializer_class(context=self.get_serializer_context())
+
+    def list_data(self, queryset):
+        """
+        Serialized data for a queryset, limited to the first page like
+        list() when the view paginates
+        """
+        if not self.use_fast_serializer():
+            page = self.paginate_queryset(queryset)
+            return self.get_serializer(queryset if page is None else page, many=True).data
+        serializer = self.get_fast_serializer()
+        rows = serializer.values(queryset)
+        page = self.paginate_queryset(rows)
+        return serializer.serialize(rows if page is None else page)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_serializer():
+            return super().list(request, *args, **kwargs)
+
+        # Build the queryset first: views like the searches compute context
+        # data for the serializer (e.g. time slots) while doing so
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_fast_serializer()
+        # Keyset pagination reads its sort key from every row
+        ordering_keys = [name for name, _ in self.paginator.fields()] if hasattr(self.paginator, 'fields') else []
+        queryset = serializer.values(queryset, ordering_keys)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
@@ -0,0 +1,208 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are fetched with a WHERE clause on the sort key of the last row of the
+previous page instead of an OFFSET, so deep pages cost the same as the first
+one, and no COUNT(*) is run. The cursor encodes the full sort key, including
+a unique tie-breaker column, so it stays stable while rows are added.
+
+Responses look like {"next": <url or null>, "results": [...]}; follow `next`
+until it is null to walk the whole list.
+
+Searches rank their results up front into a list of IDs and page through
+that list with SearchResultPagination instead.
+"""
+import base64
+import json
+from datetime import date, time, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination.
+
+    `ordering` must end with a unique column so every row has a distinct
+    position. Prefix a field with "-" to sort it descending.
+    """
+    ordering = ('id',)
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.after(self.decode_cursor(encoded, queryset.model)))
+
+        # One extra row tells whether there is a next page
+        rows = list(queryset[:self.page_size + 1])
+        self.next_position = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            self.next_position = self.position(rows[-1])
+        return rows
+
+    def get_ordering(self, request):
+        return self.ordering
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def fields(self):
+        """(field name, descending) pairs of the ordering"""
+        return [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+
+    def position(self, row):
+        # Rows are model instances, or dicts for values() querysets
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self.fields()]
+        return [getattr(row, name) for name, _ in self.fields()]
+
+    def after(self, position):
+        """
+        Q object selecting rows that sort after `position`:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields(), position):
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, position):
+        values = [
+            value.isoformat() if isinstance(value, (date, time, datetime)) else value
+            for value in position
+        ]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, encoded, model):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError('Wrong cursor length')
+            return [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields(), values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+
+class SearchResultPagination(KeysetPagination):
+    """
+    Pages through a search result ranked up front into a list of IDs, the
+    view's `result_ids` (see restaurants.views.SearchResultCacheMixin). Only
+    the rows of the requested page are loaded, in result order.
+
+    The cursor holds the ID of the last row of the page and the index the
+    next page starts at. The next page starts after that row while it is
+    still in the result, so rows are neither repeated nor skipped when the
+    result changes in between; otherwise it starts at the stored index.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        result_ids = view.result_ids
+
+        start = 0
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            last_id, next_index = self.decode_cursor(encoded, queryset.model)
+            position = view.result_positions.get(last_id)
+            start = next_index if position is None else position + 1
+
+        page_ids = result_ids[start:start + self.page_size]
+        self.next_position = None
+        if start + self.page_size < len(result_ids):
+            self.next_position = [page_ids[-1], start + self.page_size]
+
+        # Rows are model instances, or dicts for values() querysets
+        rows = {
+            row['id'] if isinstance(row, dict) else row.id: row
+            for row in queryset.filter(id__in=page_ids)
+        }
+        return [rows[row_id] for row_id in page_ids if row_id in rows]
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, encoded, model):
+        try:
+            last_id, next_index = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            return int(last_id), max(int(next_index), 0)
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+
+class BookingPagination(KeysetPagination):
+    """Newest bookings first"""
+    ordering = ('-date', '-time', 'id')
+
+
+class RestaurantPagination(KeysetPagination):
+    ordering = ('id',)
+
+
+class UserPagination(KeysetPagination):
+    ordering = ('id',)
+
+
+class ReviewPagination(KeysetPagination):
+    """
+    Newest reviews first, or highest rated first with ?sort=rating. Unknown
+    sort values fall back to newest.
+    """
+    sort_query_param = 'sort'
+    orderings = {
+        'newest': ('-created_at', '-id'),
+        'rating': ('-rating', '-created_at', '-id'),
+    }
+    ordering = orderings['newest']
+    page_size = 10
+    max_page_size = 50
+
+    def get_ordering(self, request):
+        return self.orderings.get(request.query_params.get(self.sort_query_param), self.ordering)
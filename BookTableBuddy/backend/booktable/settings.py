@@ -149,6 +149,41 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Table allocation strategy for new bookings. Use
+# 'bookings.allocation.LookAheadAllocator' to also pack bookings onto tables
+# already in use, keeping large tables free for later in the day.
+BOOKING_TABLE_ALLOCATOR = os.getenv('BOOKING_TABLE_ALLOCATOR', 'bookings.allocation.BestFitAllocator')
+
+# Seconds to cache facet counts of restaurant searches (0 disables caching)
+FACET_CACHE_SECONDS = int(os.getenv('FACET_CACHE_SECONDS', '30'))
+
+# Cache shared by every worker process, configured with REDIS_URL (e.g.
+# redis://localhost:6379/0). Without it Django's per-process local memory
+# cache is used, and the search result cache below stays off.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Seconds to keep cached restaurant search results (0 disables caching).
+# Entries are also invalidated as soon as bookings, tables, hours or
+# restaurants they depend on change, which needs the shared cache above.
+SEARCH_CACHE_SECONDS = int(os.getenv('SEARCH_CACHE_SECONDS', '300'))
+
+# Serve restaurant and booking lists through the values()-based fast
+# serializers (see booktable.fast_serializers)
+FAST_LIST_SERIALIZERS = os.getenv('FAST_LIST_SERIALIZERS', 'false').lower() == 'true'
+
+# Node ID (0-1048575) of this process in booking references. Give every
+# process that creates bookings its own node to make references unique by
+# construction (see bookings.references); when unset, each process draws a
+# random node.
+BOOKING_REFERENCE_NODE = os.getenv('BOOKING_REFERENCE_NODE') or None
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 
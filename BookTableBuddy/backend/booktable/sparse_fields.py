@@ -0,0 +1,62 @@
+"""
+Sparse fieldsets for read endpoints.
+
+Clients pass ?fields=id,name to receive only those fields, or ?omit=description
+to drop fields from the full payload; both can be combined. Serializers using
+SparseFieldsetMixin remove the other fields before rendering, and views pass
+the same selection to their queryset builders so the annotations, joins and
+prefetches behind dropped fields are skipped too. Unknown names are ignored.
+"""
+from rest_framework import permissions
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_field_names(value):
+    """Set of names from a comma-separated query parameter"""
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+def select_fields(params, available):
+    """
+    The names in `available` kept by the fields and omit query parameters,
+    or None when neither parameter is given (every field is kept)
+    """
+    wanted = parse_field_names(params.get(FIELDS_PARAM))
+    omitted = parse_field_names(params.get(OMIT_PARAM))
+    if not wanted and not omitted:
+        return None
+    return {
+        name for name in available
+        if (not wanted or name in wanted) and name not in omitted
+    }
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that drops the fields a read request did not select.
+    Writes always use every field.
+
+    `extra_fields` names keys that to_representation() adds on top of
+    Meta.fields, so they can be selected as well.
+    """
+    extra_fields = ()
+
+    @classmethod
+    def requested_fields(cls, request):
+        """Fields selected by `request`, or None for all of them"""
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+        return select_fields(request.query_params, list(cls.Meta.fields) + list(cls.extra_fields))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selected_fields = self.requested_fields(self.context.get('request'))
+        if self.selected_fields is not None:
+            for name in list(self.fields):
+                if name not in self.selected_fields:
+                    self.fields.pop(name)
+
+    def includes(self, name):
+        return self.selected_fields is None or name in self.selected_fields
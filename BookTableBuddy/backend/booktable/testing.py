@@ -0,0 +1,119 @@
+"""
+Fixtures shared by the test suites of the apps.
+"""
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from restaurants.models import Cuisine, Restaurant, RestaurantHours, RestaurantPhoto, Review, Table
+from users.models import User
+
+# A week ahead, clear of the bookings the fixtures make for today
+SEARCH_DATE = date.today() + timedelta(days=7)
+
+
+class RestaurantFixtureMixin:
+    """Creates approved restaurants with tables, hours, photos, reviews and bookings"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = User.objects.create_user('manager', 'manager@example.com', 'pw', role=User.RESTAURANT_MANAGER)
+        self.customer = User.objects.create_user('customer', 'customer@example.com', 'pw', role=User.CUSTOMER)
+        self.cuisines = [Cuisine.objects.create(name='Italian'), Cuisine.objects.create(name='Indian')]
+        self.restaurants = []
+
+    def add_restaurants(self, count, related=2):
+        for _ in range(count):
+            self.restaurants.append(self.create_restaurant(related))
+
+    def create_restaurant(self, related=2):
+        number = len(self.restaurants)
+        restaurant = Restaurant.objects.create(
+            name=f'Trattoria {number}',
+            description='Fresh pasta and pizza',
+            address=f'{number} Main St',
+            city='San Jose',
+            state='CA',
+            zip_code='95112',
+            phone='555-0100',
+            email='trattoria@example.com',
+            manager=self.manager,
+            approval_status='approved',
+            latitude=37.33 + number * 0.001,
+            longitude=-121.88,
+            cost_rating=1 + number % 4
+        )
+        restaurant.cuisine.set(self.cuisines)
+        for day in range(7):
+            RestaurantHours.objects.create(restaurant=restaurant, day=day, opening_time=time(11), closing_time=time(22))
+        self.add_related(restaurant, related)
+        return restaurant
+
+    def add_related(self, restaurant, count):
+        """Add `count` tables, photos, reviews and bookings to a restaurant"""
+        offset = restaurant.tables.count()
+        tables = [
+            Table.objects.create(restaurant=restaurant, table_number=str(offset + i + 1), capacity=2 + 2 * (i % 3))
+            for i in range(count)
+        ]
+        RestaurantPhoto.objects.bulk_create([
+            RestaurantPhoto(restaurant=restaurant, image=f'restaurant_photos/{restaurant.id}/{offset + i}.jpg', is_primary=False)
+            for i in range(count)
+        ])
+        for i in range(count):
+            reviewer = User.objects.create(username=f'reviewer-{restaurant.id}-{offset + i}')
+            Review.objects.create(restaurant=restaurant, user=reviewer, rating=1 + i % 5, comment='Lovely')
+        for table in tables:
+            Booking.objects.create(
+                user=self.customer,
+                table=table,
+                date=date.today(),
+                time=time(12),
+                party_size=2,
+                contact_name='Customer',
+                contact_email='customer@example.com',
+                contact_phone='555-0101'
+            )
+
+    def shared_cache(self):
+        """Settings override with the cache backend shared between processes that the search cache needs"""
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+        return override_settings(CACHES={'default': backend})
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertSameWithFastSerializers(self, url, params=None):
+        """Assert that `url` returns the same JSON with and without fast serializers"""
+        with override_settings(FAST_LIST_SERIALIZERS=False):
+            expected = self.client.get(url, params)
+        with override_settings(FAST_LIST_SERIALIZERS=True):
+            response = self.client.get(url, params)
+        self.assertEqual(expected.status_code, 200)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected.json())
+        return expected.json()
+
+    def assertConstantQueries(self, url, params=None, grow=None):
+        """
+        Assert that `url` issues as many queries after `grow` adds data as it
+        did before, once caches are warm. Returns the second response.
+        """
+        self.client.get(url, params)
+        expected = self.count_queries(url, params)
+        grow()
+        with self.assertNumQueries(expected):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
@@ -1,14 +1,18 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Restaurant, Cuisine, RestaurantHours, Table, Review, RestaurantPhoto
+from .models import Restaurant, Cuisine, RestaurantHours, Table, Review, RestaurantPhoto, SlotInventory
 from .forms import RestaurantPhotoForm
 
 # Register restaurant models
 @admin.register(Restaurant)
 class RestaurantAdmin(admin.ModelAdmin):
-    list_display = ('name', 'city', 'approval_status', 'manager')
+    list_display = ('name', 'city', 'approval_status', 'manager', 'table_count', 'max_table_capacity')
     list_filter = ('approval_status', 'cuisine', 'city')
     search_fields = ('name', 'city', 'state')
+    readonly_fields = (
+        'table_count', 'max_table_capacity', 'capacity_histogram',
+        'rating_count', 'rating_average', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5'
+    )
 
 @admin.register(Cuisine)
 class CuisineAdmin(admin.ModelAdmin):
@@ -23,6 +27,11 @@ class RestaurantHoursAdmin(admin.ModelAdmin):
 class TableAdmin(admin.ModelAdmin):
     list_display = ('restaurant', 'table_number', 'capacity')
 
+@admin.register(SlotInventory)
+class SlotInventoryAdmin(admin.ModelAdmin):
+    list_display = ('restaurant', 'date', 'slot', 'capacity', 'free_tables')
+    list_filter = ('date',)
+
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('restaurant', 'user', 'rating', 'created_at')
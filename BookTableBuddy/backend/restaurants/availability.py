@@ -0,0 +1,336 @@
+"""
+Slot availability engine.
+
+Loads a restaurant's tables and one day's confirmed bookings once and builds
+a compact table x slot occupancy bitmap, from which the slot inventory of
+the whole service day is materialized in a fixed number of queries no
+matter how long the restaurant is open.
+
+Searches across many restaurants use the batched SlotMatrix, which loads
+hours, tables and bookings for every candidate in one query each and computes
+slot availability for all of them at once with NumPy.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import time as dt_time, timedelta
+
+import numpy as np
+
+from .models import RestaurantHours, Table
+from bookings.models import Booking
+from bookings.conflicts import BOOKING_WINDOW_MINUTES
+
+# Length of a bookable time slot
+SLOT_MINUTES = 30
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(value):
+    """Convert a time object to minutes since midnight"""
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes):
+    """Convert minutes since midnight (possibly past 24:00) back to a time object"""
+    minutes %= MINUTES_PER_DAY
+    return dt_time(minutes // 60, minutes % 60)
+
+
+def service_bounds(hours):
+    """
+    Return (opening, closing) in minutes since midnight of the service day.
+
+    Service that runs past midnight gets a closing time beyond 24:00.
+    """
+    opening = to_minutes(hours.opening_time)
+    closing = to_minutes(hours.closing_time)
+    if closing < opening:
+        closing += MINUTES_PER_DAY
+    return opening, closing
+
+
+def service_slots(hours, last_seating=BOOKING_WINDOW_MINUTES):
+    """
+    Generate the slot start times (in minutes) for a day's opening hours.
+
+    The last slot starts `last_seating` minutes before closing.
+    """
+    opening, closing = service_bounds(hours)
+    return list(range(opening, closing - last_seating + 1, SLOT_MINUTES))
+
+
+class OccupancyGrid:
+    """
+    Table x slot occupancy bitmap for one restaurant on one service day.
+
+    Every table gets an integer bitmask in which bit i is set when slot i is
+    blocked by a confirmed booking on that table.
+    """
+
+    def __init__(self, slots, tables, bookings, window=BOOKING_WINDOW_MINUTES):
+        """
+        Args:
+            slots: Sorted slot start times in minutes since midnight
+            tables: Iterable of (table_id, capacity) pairs
+            bookings: Iterable of (table_id, start_minute) pairs
+            window: Minutes a booking blocks on either side of its start
+        """
+        self.slots = list(slots)
+        self.tables = sorted(tables, key=lambda table: (table[1], table[0]))
+        self.window = window
+        self.masks = {table_id: 0 for table_id, _ in self.tables}
+
+        for table_id, minute in bookings:
+            if table_id in self.masks:
+                self.masks[table_id] |= self._blocked_mask(minute)
+
+    def _blocked_mask(self, minute):
+        """Bitmask of the slots a booking starting at `minute` blocks"""
+        lo = bisect_left(self.slots, minute - self.window)
+        hi = bisect_right(self.slots, minute + self.window)
+        if lo >= hi:
+            return 0
+        return ((1 << (hi - lo)) - 1) << lo
+
+
+def load_occupancy_grid(restaurant, date, party_size=1, last_seating=BOOKING_WINDOW_MINUTES):
+    """
+    Build the occupancy grid for a restaurant on a date in three queries:
+    the day's hours, the tables that seat the party and the confirmed bookings.
+
+    Returns None when the restaurant is not open on that day.
+    """
+    hours = RestaurantHours.objects.filter(
+        restaurant=restaurant,
+        day=date.weekday()
+    ).first()
+    if hours is None:
+        return None
+
+    slots = service_slots(hours, last_seating)
+
+    tables = Table.objects.filter(
+        restaurant=restaurant,
+        capacity__gte=party_size
+    ).values_list('id', 'capacity')
+
+    # Service past midnight also needs the early bookings of the next day
+    dates = [date]
+    if slots and slots[-1] + BOOKING_WINDOW_MINUTES >= MINUTES_PER_DAY:
+        dates.append(date + timedelta(days=1))
+
+    bookings = Booking.objects.filter(
+        table__restaurant=restaurant,
+        date__in=dates,
+        status='confirmed'
+    ).values_list('table_id', 'date', 'time')
+
+    return OccupancyGrid(
+        slots,
+        list(tables),
+        [
+            (table_id, to_minutes(booking_time) + (booking_date - date).days * MINUTES_PER_DAY)
+            for table_id, booking_date, booking_time in bookings
+        ]
+    )
+
+
+class SlotMatrix:
+    """
+    Slot availability for many restaurants over one or more consecutive days,
+    computed with NumPy array operations.
+
+    All arrays are indexed [restaurant, day, slot]:
+        slot_minutes: start of each slot in minutes since midnight of that day
+        valid: whether the slot exists (the restaurant is open and can seat)
+        counts: number of free tables that seat the party in the slot
+    """
+
+    def __init__(self, restaurant_ids, dates, slot_minutes, valid, counts):
+        self.restaurant_ids = restaurant_ids
+        self.dates = dates
+        self.slot_minutes = slot_minutes
+        self.valid = valid
+        self.counts = counts
+        self.index = {restaurant_id: i for i, restaurant_id in enumerate(restaurant_ids)}
+
+    def available(self):
+        """Boolean array of slots that exist and have at least one free table"""
+        return self.valid & (self.counts > 0)
+
+    def slot_index_at(self, minutes, day=0, wrap=True):
+        """
+        For every restaurant, the index of the slot containing `minutes` on
+        `day`, or -1 when no slot covers it.
+        
+        With `wrap`, times before the first slot are looked up in the part of
+        the day's service that runs past midnight.
+        """
+        first = self.slot_minutes[:, day, 0]
+        offset = minutes - first
+        if wrap:
+            # Early-morning times belong to service that started the evening before
+            offset = np.where(offset < 0, offset + MINUTES_PER_DAY, offset)
+        else:
+            offset = np.where(offset < 0, self.slot_minutes.shape[2] * SLOT_MINUTES, offset)
+        index = offset // SLOT_MINUTES
+        in_range = index < self.slot_minutes.shape[2]
+        index = np.where(in_range, index, 0)
+        rows = np.arange(len(self.restaurant_ids))
+        exists = in_range & self.valid[rows, day, index]
+        return np.where(exists, index, -1)
+
+    def available_at(self, minutes, day=0, wrap=True):
+        """Boolean array: is the slot containing `minutes` available, per restaurant"""
+        index = self.slot_index_at(minutes, day, wrap)
+        rows = np.arange(len(self.restaurant_ids))
+        safe = np.where(index >= 0, index, 0)
+        return (index >= 0) & self.available()[rows, day, safe]
+
+    def available_on_date_at(self, minutes, day):
+        """
+        Boolean array: is the wall-clock time `minutes` on the date of `day`
+        available, per restaurant. The time is either in that day's own
+        service or in the overnight tail of the previous day's service, so
+        `day` must be at least 1.
+        """
+        own = self.available_at(minutes, day, wrap=False)
+        tail = self.available_at(minutes + MINUTES_PER_DAY, day - 1, wrap=False)
+        return own | tail
+
+    def nearest_available(self, minutes, day=0):
+        """
+        For every restaurant, the closest available slot strictly before
+        `minutes` on `day` and the closest one strictly after it, looking
+        ahead through the remaining days for the latter.
+
+        Returns two lists with a (day, slot_index) pair or None per restaurant.
+        """
+        num_restaurants, num_days, num_slots = self.counts.shape
+        absolute = (
+            self.slot_minutes + (np.arange(num_days) * MINUTES_PER_DAY)[None, :, None]
+        ).reshape(num_restaurants, -1)
+        available = self.available().reshape(num_restaurants, -1)
+        slot_day = np.repeat(np.arange(num_days), num_slots)[None, :]
+        target = day * MINUTES_PER_DAY + minutes
+
+        before = available & (absolute < target) & (slot_day == day)
+        after = available & (absolute > target)
+        before_at = np.where(before, absolute, -1).argmax(axis=1)
+        after_at = np.where(after, absolute, np.iinfo(np.int64).max).argmin(axis=1)
+
+        def positions(found, at):
+            return [
+                divmod(int(position), num_slots) if has else None
+                for has, position in zip(found, at)
+            ]
+
+        return positions(before.any(axis=1), before_at), positions(after.any(axis=1), after_at)
+
+    def slots_for(self, restaurant_id, day=0):
+        """List of (minutes, free_tables) for the available slots of one restaurant"""
+        i = self.index.get(restaurant_id)
+        if i is None:
+            return []
+        # Only this restaurant's row: available() covers the whole matrix
+        available = self.valid[i, day] & (self.counts[i, day] > 0)
+        return list(zip(
+            self.slot_minutes[i, day][available].tolist(),
+            self.counts[i, day][available].tolist()
+        ))
+
+
+def load_slot_matrix(restaurants, dates, party_size=1, last_seating=SLOT_MINUTES):
+    """
+    Compute a SlotMatrix for a queryset of restaurants over a list of
+    consecutive dates with one query each for hours, tables and bookings.
+
+    A table is taken in every slot that starts within BOOKING_WINDOW_MINUTES
+    of a confirmed booking on it, the window Booking.clean() enforces.
+    Cancelled, completed and no-show bookings do not take tables.
+
+    Restaurants with no opening hours at all are left out of the result.
+    """
+    dates = list(dates)
+    num_days = len(dates)
+
+    # Query 1: opening hours for every candidate restaurant and weekday
+    hours = {}
+    for restaurant_id, day, opening_time, closing_time in RestaurantHours.objects.filter(
+        restaurant__in=restaurants
+    ).values_list('restaurant_id', 'day', 'opening_time', 'closing_time'):
+        hours[(restaurant_id, day)] = (opening_time, closing_time)
+
+    restaurant_ids = sorted({restaurant_id for restaurant_id, _ in hours})
+    num_restaurants = len(restaurant_ids)
+    restaurant_index = {restaurant_id: i for i, restaurant_id in enumerate(restaurant_ids)}
+
+    # Opening and closing minutes per restaurant and day, closed days stay at -1
+    opening = np.full((num_restaurants, num_days), -1, dtype=np.int64)
+    closing = np.full((num_restaurants, num_days), -1, dtype=np.int64)
+    for i, restaurant_id in enumerate(restaurant_ids):
+        for d, date in enumerate(dates):
+            day_hours = hours.get((restaurant_id, date.weekday()))
+            if day_hours is None:
+                continue
+            opening[i, d] = to_minutes(day_hours[0])
+            closing[i, d] = to_minutes(day_hours[1])
+    closing = np.where(closing < opening, closing + MINUTES_PER_DAY, closing)
+    is_open = opening >= 0
+
+    span = np.where(is_open, closing - last_seating - opening, -1)
+    num_slots = max(int(span.max(initial=-1)) // SLOT_MINUTES + 1, 1)
+    slot_minutes = opening[:, :, None] + SLOT_MINUTES * np.arange(num_slots)[None, None, :]
+    valid = is_open[:, :, None] & (slot_minutes + last_seating <= closing[:, :, None])
+
+    # Query 2: tables that seat the party
+    table_rows = list(Table.objects.filter(
+        restaurant__in=restaurants,
+        capacity__gte=party_size
+    ).values_list('id', 'restaurant_id'))
+    table_rows = [row for row in table_rows if row[1] in restaurant_index]
+    table_index = {table_id: t for t, (table_id, _) in enumerate(table_rows)}
+    table_restaurant = np.array(
+        [restaurant_index[restaurant_id] for _, restaurant_id in table_rows],
+        dtype=np.int64
+    )
+
+    # Query 3: confirmed bookings on those tables, plus the day after the range
+    # for service that runs past midnight
+    booking_rows = [
+        (table_index[table_id], (booking_date - dates[0]).days, to_minutes(booking_time))
+        for table_id, booking_date, booking_time in Booking.objects.filter(
+            table__restaurant__in=restaurants,
+            table__capacity__gte=party_size,
+            date__gte=dates[0],
+            date__lte=dates[-1] + timedelta(days=1),
+            status='confirmed'
+        ).values_list('table_id', 'date', 'time')
+        if table_id in table_index
+    ]
+
+    blocked = np.zeros((len(table_rows), num_days, num_slots), dtype=bool)
+    if booking_rows:
+        booking_table, booking_day, booking_minute = (
+            np.array(column, dtype=np.int64) for column in zip(*booking_rows)
+        )
+        booking_restaurant = table_restaurant[booking_table]
+
+        # A booking blocks slots on its own day and the overnight tail of the
+        # previous day's service
+        for day_shift, minute_shift in ((0, 0), (1, MINUTES_PER_DAY)):
+            day = booking_day - day_shift
+            in_range = (day >= 0) & (day < num_days)
+            if not in_range.any():
+                continue
+            rows = booking_restaurant[in_range]
+            days = day[in_range]
+            minutes = booking_minute[in_range] + minute_shift
+            hits = np.abs(slot_minutes[rows, days] - minutes[:, None]) <= BOOKING_WINDOW_MINUTES
+            np.logical_or.at(blocked, (booking_table[in_range], days), hits)
+
+    free = valid[table_restaurant] & ~blocked
+    counts = np.zeros((num_restaurants, num_days, num_slots), dtype=np.int64)
+    np.add.at(counts, table_restaurant, free.astype(np.int64))
+
+    return SlotMatrix(restaurant_ids, dates, slot_minutes, valid, counts)
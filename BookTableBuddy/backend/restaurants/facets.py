@@ -0,0 +1,93 @@
+"""
+Faceted counts for restaurant search.
+
+Counts the restaurants of an already-filtered search per cuisine, price
+level and city, so filter panels can show how many results each option
+would give. All requested facets are computed in a single UNION ALL of
+GROUP BY queries over the filtered restaurant IDs, and can be cached for a
+short time with the FACET_CACHE_SECONDS setting.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, Value
+from django.db.models.functions import Cast
+
+from .models import Restaurant
+from .search_cache import normalize_params
+
+# Facet name -> restaurant field it groups by
+FACET_FIELDS = {
+    'cuisine': 'cuisine__name',
+    'price': 'cost_rating',
+    'city': 'city',
+}
+
+
+def parse_facets(value):
+    """
+    Parse the facets= query parameter into a list of facet names.
+
+    Raises ValueError for unknown facets.
+    """
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in FACET_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown facet(s): {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def facet_counts(queryset, names):
+    """
+    Count the restaurants of `queryset` per value of each facet in `names`.
+
+    Returns {facet: [{'value': ..., 'count': ...}]}, largest count first.
+    """
+    facets = {name: [] for name in names}
+    if not names:
+        return facets
+
+    # Group over the matching IDs so ordering, DISTINCT and joins of the
+    # search queryset do not leak into the aggregates
+    matching = Restaurant.objects.filter(id__in=queryset.order_by().values('id'))
+
+    parts = [
+        matching.exclude(**{f'{FACET_FIELDS[name]}__isnull': True}).order_by().values(
+            value=Cast(FACET_FIELDS[name], CharField())
+        ).annotate(
+            facet=Value(name, output_field=CharField()),
+            count=Count('id', distinct=True)
+        ).values_list('facet', 'value', 'count')
+        for name in names
+    ]
+    rows = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+
+    for name, value, count in rows:
+        facets[name].append({
+            'value': int(value) if name == 'price' else value,
+            'count': count
+        })
+    for values in facets.values():
+        values.sort(key=lambda item: (-item['count'], str(item['value'])))
+
+    return facets
+
+
+def cached_facet_counts(queryset, names, params):
+    """
+    facet_counts() cached for FACET_CACHE_SECONDS under a key derived from
+    the search parameters. Caching is off when the setting is 0.
+    """
+    timeout = getattr(settings, 'FACET_CACHE_SECONDS', 0)
+    if not timeout:
+        return facet_counts(queryset, names)
+
+    digest = hashlib.sha1(repr((normalize_params(params), names)).encode()).hexdigest()
+    key = f'restaurant-facets:{digest}'
+
+    facets = cache.get(key)
+    if facets is None:
+        facets = facet_counts(queryset, names)
+        cache.set(key, facets, timeout)
+    return facets
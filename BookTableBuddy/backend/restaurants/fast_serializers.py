@@ -0,0 +1,106 @@
+"""
+values()-based equivalent of RestaurantListSerializer (see
+booktable.fast_serializers)
+"""
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from booktable.fast_serializers import FastListSerializer
+from .models import Restaurant, RestaurantPhoto
+from .serializers import RestaurantListSerializer
+
+COST_RATING_DISPLAY = dict(Restaurant.COST_RATING_CHOICES)
+
+
+class FastRestaurantListSerializer(FastListSerializer):
+    """
+    Same output as RestaurantListSerializer. Expects a queryset annotated by
+    Restaurant.objects.with_list_data() (or with_aggregates()).
+    """
+    serializer_class = RestaurantListSerializer
+    fields = ('id', 'name', 'description', 'address', 'city', 'state', 'zip_code', 'cost_rating', 'approval_status')
+
+    def value_keys(self):
+        # The id is always needed to attach cuisines, photos and slots
+        keys = ['id'] + super().value_keys()
+        if self.includes('cost_rating_display'):
+            keys.append('cost_rating')
+        if self.includes('average_rating'):
+            keys.append('rating_average')
+        if self.includes('bookings_today'):
+            keys.append('bookings_today_count')
+        return list(dict.fromkeys(keys))
+
+    def serialize(self, rows):
+        rows = list(rows)
+        restaurant_ids = [row['id'] for row in rows]
+
+        # One query for the cuisines of every restaurant
+        cuisines = {}
+        cuisine_rows = []
+        if self.includes('cuisine'):
+            cuisine_rows = Restaurant.cuisine.through.objects.filter(
+                restaurant_id__in=restaurant_ids
+            ).order_by('id').values_list('restaurant_id', 'cuisine_id', 'cuisine__name')
+        for restaurant_id, cuisine_id, cuisine_name in cuisine_rows:
+            cuisines.setdefault(restaurant_id, []).append({'id': cuisine_id, 'name': cuisine_name})
+
+        # One query for the primary photo (or first photo) of every restaurant
+        storage = RestaurantPhoto._meta.get_field('image').storage
+        photos = {}
+        photo_rows = []
+        if self.includes('primary_photo'):
+            photo_rows = RestaurantPhoto.objects.filter(restaurant_id__in=restaurant_ids).annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=F('restaurant_id'),
+                    order_by=[F('is_primary').desc(), F('pk').asc()]
+                )
+            ).filter(rank=1).values('restaurant_id', 'id', 'image', 'caption', 'is_primary')
+        for photo in photo_rows:
+            url = storage.url(photo['image']) if photo['image'] else None
+            photos[photo['restaurant_id']] = {
+                'id': photo['id'],
+                'image': url,
+                'image_path': url,
+                'caption': photo['caption'],
+                'is_primary': photo['is_primary']
+            }
+
+        time_slots = self.context.get('available_time_slots', {})
+        nearest_slots = self.context.get('nearest_slots')
+        distances = self.context.get('distances')
+
+        data = []
+        for row in rows:
+            restaurant_id = row['id']
+            item = self.to_representation(row)
+            # Keep the key order of RestaurantListSerializer
+            record = {
+                'id': item.get('id'),
+                'name': item.get('name'),
+                'description': item.get('description'),
+                'address': item.get('address'),
+                'city': item.get('city'),
+                'state': item.get('state'),
+                'zip_code': item.get('zip_code'),
+                'cuisine': cuisines.get(restaurant_id, []),
+                'cost_rating': item.get('cost_rating'),
+                'cost_rating_display': COST_RATING_DISPLAY.get(row.get('cost_rating'), row.get('cost_rating')),
+                'average_rating': row.get('rating_average') or 0,
+                'primary_photo': photos.get(restaurant_id),
+                'bookings_today': row.get('bookings_today_count'),
+                'approval_status': item.get('approval_status'),
+                'available_time_slots': time_slots.get(restaurant_id, []),
+            }
+            if nearest_slots is not None:
+                record['nearest_available_slots'] = nearest_slots.get(restaurant_id)
+            if distances is not None:
+                record['distance_km'] = distances.get(restaurant_id)
+
+            # Drop the fields ?fields=/?omit= did not select
+            if self.selected_fields is not None:
+                record = {name: value for name, value in record.items() if name in self.selected_fields}
+            data.append(record)
+
+        return data
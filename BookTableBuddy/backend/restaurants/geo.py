@@ -0,0 +1,156 @@
+"""
+Geospatial helpers for radius search.
+
+Restaurants store a geohash of their coordinates in an indexed column.
+A radius search first narrows the candidates with index range scans over the
+few geohash cells covering the search area plus a latitude/longitude bounding
+box, then computes the exact haversine distance for what is left.
+"""
+from math import radians, sin, cos, asin, sqrt
+
+from django.db.models import Q
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+# Sorts after every geohash character, used as an exclusive prefix bound
+GEOHASH_PREFIX_END = '{'
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+MAX_RADIUS_KM = 500
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = bits * 2 + 1
+                lng_range[0] = mid
+            else:
+                bits = bits * 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = bits * 2 + 1
+                lat_range[0] = mid
+            else:
+                bits = bits * 2
+                lat_range[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(geohash)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell at a precision"""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two coordinates in kilometres"""
+    lat1, lng1, lat2, lng2 = map(radians, (lat1, lng1, lat2, lng2))
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle"""
+    delta_lat = radius_km / KM_PER_DEGREE_LAT
+    delta_lng = radius_km / (KM_PER_DEGREE_LAT * max(cos(radians(latitude)), 0.01))
+    return (
+        max(latitude - delta_lat, -90.0),
+        min(latitude + delta_lat, 90.0),
+        longitude - delta_lng,
+        longitude + delta_lng,
+    )
+
+
+def covering_cells(min_lat, max_lat, min_lng, max_lng):
+    """
+    Geohash prefixes of the (at most four) cells covering a bounding box,
+    using the finest precision whose cells are at least as large as the box
+    """
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(candidate)
+        if height >= max_lat - min_lat and width >= max_lng - min_lng:
+            precision = candidate
+            break
+
+    def wrap(lng):
+        return (lng + 180.0) % 360.0 - 180.0
+
+    return sorted({
+        encode_geohash(lat, wrap(lng), precision)
+        for lat in (min_lat, max_lat)
+        for lng in (min_lng, max_lng)
+    })
+
+
+def parse_near(near, radius_km, default_radius_km=10):
+    """
+    Parse the near=lat,lng and radius_km= query parameters.
+
+    Raises ValueError for malformed or out-of-range values.
+    """
+    latitude, longitude = (float(part) for part in near.split(','))
+    radius_km = float(radius_km) if radius_km else float(default_radius_km)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('Coordinates out of range')
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValueError(f'radius_km must be between 0 and {MAX_RADIUS_KM}')
+    return latitude, longitude, radius_km
+
+
+def filter_within_radius(queryset, latitude, longitude, radius_km):
+    """
+    Restrict a Restaurant queryset to those within `radius_km` of a point.
+
+    Returns the filtered queryset and a dict of restaurant ID -> distance in
+    km; ordering by distance is left to the caller.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+
+    # Index range scans over the covering geohash cells
+    cells = Q()
+    for prefix in covering_cells(min_lat, max_lat, min_lng, max_lng):
+        cells |= Q(geohash__gte=prefix, geohash__lt=prefix + GEOHASH_PREFIX_END)
+    candidates = queryset.filter(cells, latitude__range=(min_lat, max_lat))
+
+    # Longitude box only when it does not cross the antimeridian
+    if -180 <= min_lng and max_lng <= 180:
+        candidates = candidates.filter(longitude__range=(min_lng, max_lng))
+
+    distances = {}
+    for restaurant_id, restaurant_lat, restaurant_lng in candidates.values_list(
+        'id', 'latitude', 'longitude'
+    ).distinct():
+        distance = haversine_km(latitude, longitude, float(restaurant_lat), float(restaurant_lng))
+        if distance <= radius_km:
+            distances[restaurant_id] = round(distance, 3)
+
+    if not distances:
+        return queryset.none(), distances
+
+    return queryset.filter(id__in=list(distances)), distances
@@ -0,0 +1,166 @@
+"""
+Incrementally maintained slot inventory.
+
+SlotInventory rows hold the number of free tables of each capacity for every
+slot of a restaurant's service day. A day is materialized from the occupancy
+grid the first time it is read. After that, booking changes adjust only the
+affected rows with F() updates, while table or hours edits drop the
+materialized days so they are rebuilt on the next read.
+
+Rebuilding a day and applying a booking to it both lock the restaurant row
+first (see lock_restaurant), so a booking that commits during a rebuild is
+either read by the rebuild or applied to the rebuilt rows.
+
+Booking changes reach the inventory through the Booking save and delete
+signals only. Writes that skip them, such as QuerySet.update(status=...),
+bulk_create() or raw SQL, leave the inventory wrong until the
+rebuild_slot_inventory command rebuilds the affected days.
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, Sum
+
+from .availability import MINUTES_PER_DAY, load_occupancy_grid, to_minutes
+from .models import Restaurant, SlotInventory, Table
+from bookings.conflicts import BOOKING_WINDOW_MINUTES
+from bookings.models import Booking
+
+
+def lock_restaurant(restaurant_id):
+    """
+    Lock the restaurant row until the end of the transaction.
+    
+    Only done on databases with SELECT ... FOR UPDATE. SQLite lets one
+    transaction write at a time, and a read before the first write would
+    make the later upgrade to a write lock fail instead of wait.
+    """
+    if connection.features.has_select_for_update:
+        list(Restaurant.objects.select_for_update().filter(pk=restaurant_id).values_list('pk', flat=True))
+
+
+def materialize_day(restaurant_id, date):
+    """
+    Rebuild the inventory rows of one restaurant and date from its bookings.
+
+    Returns False when the restaurant is not open on that day.
+    """
+    with transaction.atomic():
+        # Take the restaurant lock (or, on SQLite, the database write lock
+        # with the delete) before the bookings are read, so a booking cannot
+        # commit in between and be missing from the rebuilt day
+        lock_restaurant(restaurant_id)
+        SlotInventory.objects.filter(restaurant_id=restaurant_id, date=date).delete()
+        grid = load_occupancy_grid(restaurant_id, date)
+        if grid is None:
+            return False
+
+        free = {}
+        for index, minute in enumerate(grid.slots):
+            bit = 1 << index
+            for table_id, capacity in grid.tables:
+                key = (minute, capacity)
+                free[key] = free.get(key, 0) + (0 if grid.masks[table_id] & bit else 1)
+
+        # The lock makes concurrent rebuilds take turns; should two still
+        # overlap, the second keeps the first one's rows instead of failing
+        SlotInventory.objects.bulk_create([
+            SlotInventory(
+                restaurant_id=restaurant_id,
+                date=date,
+                slot=minute,
+                capacity=capacity,
+                free_tables=free_tables
+            )
+            for (minute, capacity), free_tables in free.items()
+        ], ignore_conflicts=True)
+
+    return True
+
+
+def _slot_counts(restaurant_id, date, party_size):
+    return list(
+        SlotInventory.objects.filter(
+            restaurant_id=restaurant_id,
+            date=date,
+            capacity__gte=party_size
+        ).values('slot').annotate(
+            free=Sum('free_tables')
+        ).order_by('slot').values_list('slot', 'free')
+    )
+
+
+def slot_counts(restaurant_id, date, party_size=1):
+    """
+    Free tables seating `party_size` per slot as a list of
+    (slot_minutes, free_tables), materializing the day on first read.
+
+    Returns None when the restaurant is not open on that day.
+    """
+    counts = _slot_counts(restaurant_id, date, party_size)
+    if counts:
+        return counts
+
+    # Either the day has not been materialized yet or no table seats the party
+    if not SlotInventory.objects.filter(restaurant_id=restaurant_id, date=date).exists():
+        if not materialize_day(restaurant_id, date):
+            return None
+        counts = _slot_counts(restaurant_id, date, party_size)
+
+    return counts
+
+
+def apply_booking(table_id, date, booking_time, delta, exclude_id=None):
+    """
+    Adjust the inventory for a confirmed booking on a table being added
+    (delta=-1) or released (delta=+1).
+
+    Only slots that are not also blocked by another confirmed booking on the
+    same table change. Days that have not been materialized are left alone.
+    Called from the Booking signals, inside the transaction of the write.
+    """
+    table = Table.objects.filter(pk=table_id).values('restaurant_id', 'capacity').first()
+    if table is None:
+        return
+
+    # Wait for a rebuild of the restaurant's days to commit (see materialize_day)
+    lock_restaurant(table['restaurant_id'])
+
+    window = BOOKING_WINDOW_MINUTES
+    minute = to_minutes(booking_time)
+
+    # Other confirmed bookings on the table, in minutes relative to `date`
+    others = Booking.objects.filter(
+        table_id=table_id,
+        date__gte=date - timedelta(days=1),
+        date__lte=date + timedelta(days=1),
+        status='confirmed'
+    )
+    if exclude_id is not None:
+        others = others.exclude(id=exclude_id)
+    other_minutes = [
+        (other_date - date).days * MINUTES_PER_DAY + to_minutes(other_time)
+        for other_date, other_time in others.values_list('date', 'time')
+    ]
+
+    # The booking counts towards its own service day and the overnight tail
+    # of the previous day's service
+    for service_date, offset in ((date, 0), (date - timedelta(days=1), MINUTES_PER_DAY)):
+        start = minute + offset
+        rows = SlotInventory.objects.filter(
+            restaurant_id=table['restaurant_id'],
+            date=service_date,
+            capacity=table['capacity'],
+            slot__gte=start - window,
+            slot__lte=start + window
+        )
+        for other in other_minutes:
+            other += offset
+            if abs(other - start) <= 2 * window:
+                rows = rows.exclude(slot__gte=other - window, slot__lte=other + window)
+        rows.update(free_tables=F('free_tables') + delta)
+
+
+def invalidate_restaurant(restaurant_id):
+    """Drop every materialized day of a restaurant after a table or hours change"""
+    SlotInventory.objects.filter(restaurant_id=restaurant_id).delete()
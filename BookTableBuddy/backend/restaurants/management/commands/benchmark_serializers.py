@@ -0,0 +1,121 @@
+from datetime import date, time, timedelta
+import json
+import time as timer
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+from bookings.fast_serializers import FastBookingSerializer
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+from restaurants.fast_serializers import FastRestaurantListSerializer
+from restaurants.models import Restaurant, Table, Cuisine
+from restaurants.serializers import RestaurantListSerializer
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare DRF and values()-based list serializers on synthetic restaurants '
+        'and bookings. The rows are created in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Restaurants and bookings to serialize')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per serializer, the best is reported')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['rows'], options['repeat'])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, rows, repeat):
+        self.stdout.write(f"Creating {rows} restaurants and {rows} bookings...")
+        manager = User.objects.create_user(
+            'benchmark-manager', 'benchmark@example.com', 'benchmark', role=User.RESTAURANT_MANAGER
+        )
+        cuisine = Cuisine.objects.create(name='Benchmark')
+
+        Restaurant.objects.bulk_create([
+            Restaurant(
+                name=f'Benchmark {i}', description='Synthetic restaurant', address='1 Main St',
+                city='San Jose', state='CA', zip_code='95112', phone='555-0100',
+                email='benchmark@example.com', manager=manager, approval_status='approved'
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+        restaurants = Restaurant.objects.filter(manager=manager)
+        restaurant_ids = list(restaurants.values_list('id', flat=True))
+        Restaurant.cuisine.through.objects.bulk_create([
+            Restaurant.cuisine.through(restaurant_id=restaurant_id, cuisine=cuisine)
+            for restaurant_id in restaurant_ids
+        ], batch_size=1000)
+
+        tables = Table.objects.bulk_create([
+            Table(restaurant_id=restaurant_id, table_number='1', capacity=4)
+            for restaurant_id in restaurant_ids[:100]
+        ])
+        # Every table gets one booking per hour from 11:00 on consecutive days
+        start = date.today()
+        per_day = len(tables) * 10
+        Booking.objects.bulk_create([
+            Booking(
+                user=manager, table=tables[i % len(tables)], date=start + timedelta(days=i // per_day),
+                time=time(11 + (i // len(tables)) % 10), party_size=2, status='confirmed', contact_name='Benchmark',
+                contact_email='benchmark@example.com', contact_phone='555-0100',
+                booking_reference=f'BENCH{i:08d}'
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+        bookings = Booking.objects.filter(user=manager)
+
+        cases = [
+            (
+                'restaurants',
+                lambda: RestaurantListSerializer(restaurants.with_list_data(), many=True).data,
+                lambda: FastRestaurantListSerializer().serialize(
+                    FastRestaurantListSerializer().values(restaurants.with_list_data())
+                ),
+            ),
+            (
+                'bookings',
+                lambda: BookingSerializer(bookings.for_list(), many=True).data,
+                lambda: FastBookingSerializer().serialize(FastBookingSerializer().values(bookings)),
+            ),
+        ]
+
+        self.stdout.write(f"{'list':<14}{'serializer':<14}{'seconds':>10}{'rows/s':>12}{'speedup':>10}")
+        for name, drf, fast in cases:
+            drf_seconds, drf_data = self.measure(drf, repeat)
+            fast_seconds, fast_data = self.measure(fast, repeat)
+
+            # Both paths must render exactly the same JSON
+            if self.render(drf_data) != self.render(fast_data):
+                self.stderr.write(self.style.ERROR(f'{name}: fast serializer output differs'))
+
+            self.stdout.write(f"{name:<14}{'drf':<14}{drf_seconds:>10.3f}{rows / drf_seconds:>12.0f}")
+            self.stdout.write(
+                f"{name:<14}{'values()':<14}{fast_seconds:>10.3f}{rows / fast_seconds:>12.0f}"
+                f"{drf_seconds / fast_seconds:>9.1f}x"
+            )
+
+    def measure(self, serialize, repeat):
+        best = None
+        data = None
+        for _ in range(repeat):
+            started = timer.perf_counter()
+            data = serialize()
+            elapsed = timer.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, data
+
+    def render(self, data):
+        return json.dumps(data, cls=JSONEncoder, sort_keys=True)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from restaurants.models import Restaurant
+from restaurants.search import index_restaurant
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search tokens of restaurants'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--restaurant',
+            dest='restaurant',
+            type=int,
+            help='Only rebuild this restaurant ID',
+        )
+
+    def handle(self, *args, **options):
+        restaurants = Restaurant.objects.all()
+        if options['restaurant']:
+            restaurants = restaurants.filter(id=options['restaurant'])
+
+        count = 0
+        for restaurant in restaurants.iterator():
+            index_restaurant(restaurant)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search index for {count} restaurant(s)"))
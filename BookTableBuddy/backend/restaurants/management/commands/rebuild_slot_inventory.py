@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from restaurants.inventory import materialize_day
+from restaurants.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized slot inventory from bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--restaurant',
+            dest='restaurant',
+            type=int,
+            help='Only rebuild this restaurant ID',
+        )
+        parser.add_argument(
+            '--start',
+            dest='start',
+            help='First date to rebuild (YYYY-MM-DD), defaults to today',
+        )
+        parser.add_argument(
+            '--days',
+            dest='days',
+            type=int,
+            default=30,
+            help='Number of days to rebuild (default 30)',
+        )
+
+    def handle(self, *args, **options):
+        if options['start']:
+            try:
+                start = datetime.strptime(options['start'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--start must be a date in YYYY-MM-DD format')
+        else:
+            start = timezone.now().date()
+
+        restaurants = Restaurant.objects.filter(approval_status='approved')
+        if options['restaurant']:
+            restaurants = restaurants.filter(id=options['restaurant'])
+
+        restaurant_ids = list(restaurants.values_list('id', flat=True))
+        for restaurant_id in restaurant_ids:
+            for offset in range(options['days']):
+                materialize_day(restaurant_id, start + timedelta(days=offset))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt slot inventory for {len(restaurant_ids)} restaurant(s) over {options['days']} day(s) from {start}"
+        ))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from restaurants.models import Restaurant, Review, rating_columns
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the rating aggregates of restaurants from their reviews and fix '
+        'the ones that drifted, e.g. after bulk review changes that bypass signals'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--restaurant',
+            dest='restaurant',
+            type=int,
+            help='Only reconcile this restaurant ID',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted restaurants without fixing them',
+        )
+
+    def handle(self, *args, **options):
+        restaurants = Restaurant.objects.all()
+        reviews = Review.objects.all()
+        if options['restaurant']:
+            restaurants = restaurants.filter(id=options['restaurant'])
+            reviews = reviews.filter(restaurant_id=options['restaurant'])
+
+        # Star histogram of every restaurant in one grouped query
+        histograms = {}
+        for restaurant_id, rating, count in reviews.order_by().values_list(
+            'restaurant_id', 'rating'
+        ).annotate(count=Count('id')):
+            histograms.setdefault(restaurant_id, {})[rating] = count
+
+        column_names = list(rating_columns({}))
+        checked = 0
+        drifted = 0
+        for stored in restaurants.values('id', 'name', *column_names).iterator():
+            checked += 1
+            expected = rating_columns(histograms.get(stored['id'], {}))
+            if all(stored[name] == value for name, value in expected.items()):
+                continue
+
+            drifted += 1
+            self.stdout.write(
+                f"{stored['name']} (#{stored['id']}): stored {stored['rating_count']} review(s) "
+                f"averaging {stored['rating_average']:.2f}, actual {expected['rating_count']} "
+                f"averaging {expected['rating_average']:.2f}"
+            )
+            if not options['dry_run']:
+                Restaurant.objects.filter(pk=stored['id']).update(**expected)
+
+        action = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} restaurant(s). {action} {drifted} with drifted rating aggregates"
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from restaurants import search_cache
+from restaurants.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = 'Recompute the table capacity profile of restaurants, e.g. after a bulk table import'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--restaurant',
+            dest='restaurant',
+            type=int,
+            help='Only refresh this restaurant ID',
+        )
+
+    def handle(self, *args, **options):
+        restaurants = Restaurant.objects.all()
+        if options['restaurant']:
+            restaurants = restaurants.filter(id=options['restaurant'])
+
+        count = 0
+        changed = False
+        for restaurant in restaurants.iterator():
+            previous_max = restaurant.max_table_capacity
+            restaurant.refresh_capacity_profile()
+            changed = changed or restaurant.max_table_capacity != previous_max
+            count += 1
+
+        # Cached searches pruned restaurants by their largest table
+        if changed:
+            search_cache.invalidate_all()
+
+        self.stdout.write(self.style.SUCCESS(f"Refreshed capacity profile for {count} restaurant(s)"))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-17 19:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0010_restaurant_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot', models.PositiveIntegerField()),
+                ('capacity', models.IntegerField()),
+                ('free_tables', models.IntegerField()),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_inventory', to='restaurants.restaurant')),
+            ],
+            options={
+                'ordering': ['date', 'slot', 'capacity'],
+                'unique_together': {('restaurant', 'date', 'slot', 'capacity')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-17 19:15
+
+from django.db import migrations, models
+
+
+def populate_geohash(apps, schema_editor):
+    from restaurants.geo import encode_geohash
+
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    for restaurant in Restaurant.objects.exclude(latitude=None).exclude(longitude=None):
+        restaurant.geohash = encode_geohash(float(restaurant.latitude), float(restaurant.longitude))
+        restaurant.save(update_fields=['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0011_slotinventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
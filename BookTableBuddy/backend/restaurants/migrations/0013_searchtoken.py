@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-17 19:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_search_tokens(apps, schema_editor):
+    from restaurants.search import restaurant_tokens
+
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    SearchToken = apps.get_model('restaurants', 'SearchToken')
+    for restaurant in Restaurant.objects.prefetch_related('cuisine'):
+        tokens = restaurant_tokens(
+            restaurant.name,
+            restaurant.description,
+            restaurant.city,
+            restaurant.state,
+            [cuisine.name for cuisine in restaurant.cuisine.all()]
+        )
+        SearchToken.objects.bulk_create([
+            SearchToken(restaurant=restaurant, token=token, weight=weight)
+            for token, weight in tokens.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0012_restaurant_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=50)),
+                ('weight', models.FloatField()),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='restaurants.restaurant')),
+            ],
+            options={
+                'unique_together': {('token', 'restaurant')},
+            },
+        ),
+        migrations.RunPython(populate_search_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0013_searchtoken'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restauranthours',
+            index=models.Index(fields=['day', 'opening_time', 'closing_time'], name='hours_day_open_close_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-17 19:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_capacity_profile(apps, schema_editor):
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    Table = apps.get_model('restaurants', 'Table')
+
+    histograms = {}
+    for restaurant_id, capacity, count in Table.objects.order_by().values_list(
+        'restaurant_id', 'capacity'
+    ).annotate(count=Count('id')):
+        histograms.setdefault(restaurant_id, {})[str(capacity)] = count
+
+    for restaurant_id, histogram in histograms.items():
+        Restaurant.objects.filter(pk=restaurant_id).update(
+            capacity_histogram=histogram,
+            table_count=sum(histogram.values()),
+            max_table_capacity=max(int(capacity) for capacity in histogram)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0014_restauranthours_open_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='capacity_histogram',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='max_table_capacity',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='table_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_capacity_profile, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-17 21:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0015_restaurant_capacity_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cuisine',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
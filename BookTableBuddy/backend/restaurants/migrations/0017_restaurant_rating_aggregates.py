@@ -0,0 +1,75 @@
+# Generated by Django 5.2 on 2026-10-17 21:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_rating_aggregates(apps, schema_editor):
+    Restaurant = apps.get_model('restaurants', 'Restaurant')
+    Review = apps.get_model('restaurants', 'Review')
+
+    histograms = {}
+    for restaurant_id, rating, count in Review.objects.order_by().values_list(
+        'restaurant_id', 'rating'
+    ).annotate(count=Count('id')):
+        histograms.setdefault(restaurant_id, {})[rating] = count
+
+    for restaurant_id, histogram in histograms.items():
+        rating_count = sum(histogram.values())
+        rating_sum = sum(rating * count for rating, count in histogram.items())
+        Restaurant.objects.filter(pk=restaurant_id).update(
+            rating_count=rating_count,
+            rating_sum=rating_sum,
+            rating_average=rating_sum / rating_count,
+            **{f'rating_{rating}': histogram.get(rating, 0) for rating in range(1, 6)}
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0016_cuisine_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_average',
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_rating_aggregates, migrations.RunPython.noop),
+    ]
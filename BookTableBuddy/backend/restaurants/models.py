@@ -1,4 +1,9 @@
 from django.db import models
+from django.db.models import (
+    Count, Exists, F, FloatField, IntegerField, Max, OuterRef, Prefetch, Q, Subquery, Value
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -8,10 +13,207 @@ class Cuisine(models.Model):
     Model for restaurant cuisine types
     """
     name = models.CharField(max_length=100)
+    # Validator for conditional GETs of the cuisine list
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name
 
+RATING_STARS = range(1, 6)
+
+# Reviews embedded in restaurant details; the rest are paged through
+# /api/restaurants/<id>/reviews/
+LATEST_REVIEWS = 5
+
+def rating_columns(histogram):
+    """Rating aggregate columns of a restaurant from {star: number of reviews}"""
+    count = sum(histogram.get(star, 0) for star in RATING_STARS)
+    total = sum(star * histogram.get(star, 0) for star in RATING_STARS)
+    columns = {
+        'rating_count': count,
+        'rating_sum': total,
+        'rating_average': total / count if count else 0
+    }
+    columns.update({f'rating_{star}': histogram.get(star, 0) for star in RATING_STARS})
+    return columns
+
+class RestaurantQuerySet(models.QuerySet):
+    """
+    Custom queryset for restaurants
+    """
+    def open_at(self, date, time):
+        """
+        Restaurants open at `time` on `date`, checked in the database with a
+        single EXISTS subquery on RestaurantHours.
+        
+        Service whose closing time is earlier than its opening time runs past
+        midnight, so it also covers the early hours of the following day.
+        """
+        day = date.weekday()
+        overnight = Q(closing_time__lt=F('opening_time'))
+        
+        # Opened today and not closed yet (or closing after midnight)
+        same_day = Q(day=day, opening_time__lte=time) & (Q(closing_time__gte=time) | overnight)
+        # Still serving from yesterday's overnight service
+        from_previous_day = Q(day=(day - 1) % 7, closing_time__gte=time) & overnight
+        
+        return self.filter(Exists(
+            RestaurantHours.objects.filter(restaurant=OuterRef('pk')).filter(same_day | from_previous_day)
+        ))
+    
+    def update_ratings(self, added=None, removed=None):
+        """
+        Apply a review write to the rating aggregates in a single UPDATE with
+        F() expressions, so concurrent reviews cannot lose each other's
+        changes. `added` is the rating of a new or edited review, `removed`
+        the rating it replaced or the rating of a deleted review.
+        """
+        if added == removed:
+            return 0
+        
+        count_delta = (added is not None) - (removed is not None)
+        sum_delta = (added or 0) - (removed or 0)
+        changes = {
+            'rating_count': F('rating_count') + count_delta,
+            'rating_sum': F('rating_sum') + sum_delta,
+            # SET expressions read the old column values, so the average is
+            # taken from the new sum and count explicitly
+            'rating_average': Coalesce(
+                Cast(F('rating_sum') + sum_delta, FloatField()) / NullIf(F('rating_count') + count_delta, 0),
+                Value(0.0)
+            ),
+        }
+        if added is not None:
+            changes[f'rating_{added}'] = F(f'rating_{added}') + 1
+        if removed is not None:
+            changes[f'rating_{removed}'] = F(f'rating_{removed}') - 1
+        return self.update(**changes)
+    
+    def with_aggregates(self, fields=None):
+        """
+        Annotate bookings_today_count as a correlated subquery, which unlike
+        a join does not multiply the rows of other annotations. The average
+        rating is read from the rating_average column.
+        
+        With `fields` (serializer field names selected by ?fields=/?omit=),
+        the annotation is only added when bookings_today is in it.
+        """
+        from bookings.models import Booking
+        
+        annotations = {}
+        if fields is None or 'bookings_today' in fields:
+            today = timezone.now().date()
+            bookings_today = Booking.objects.filter(
+                table__restaurant=OuterRef('pk'),
+                date=today
+            ).order_by().values('table__restaurant').annotate(value=Count('id')).values('value')
+            annotations['bookings_today_count'] = Coalesce(
+                Subquery(bookings_today, output_field=IntegerField()), 0
+            )
+        
+        return self.annotate(**annotations)
+    
+    def only_fields(self, fields):
+        """
+        Load only the columns the selected serializer fields read; all of
+        them when `fields` is None
+        """
+        if fields is None:
+            return self
+        columns = [field.name for field in self.model._meta.concrete_fields if field.name in fields]
+        if 'cost_rating_display' in fields:
+            columns.append('cost_rating')
+        if 'average_rating' in fields:
+            columns.append('rating_average')
+        if 'review_count' in fields:
+            columns.append('rating_count')
+        if 'rating_distribution' in fields:
+            columns += [f'rating_{star}' for star in RATING_STARS]
+        if 'manager_name' in fields:
+            columns.append('manager')
+        return self.only('id', *columns)
+    
+    def with_list_data(self, fields=None):
+        """
+        Annotate and prefetch everything RestaurantListSerializer reads, so a
+        list costs a constant number of queries: the aggregates, the cuisines
+        and the primary photo (or the first photo if none is primary) in
+        primary_photos.
+        
+        With `fields`, only what those fields need is loaded.
+        """
+        prefetches = []
+        if fields is None or 'cuisine' in fields:
+            prefetches.append('cuisine')
+        if fields is None or 'primary_photo' in fields:
+            prefetches.append(Prefetch(
+                'photos',
+                queryset=RestaurantPhoto.objects.order_by('-is_primary', 'pk')[:1],
+                to_attr='primary_photos'
+            ))
+        return self.with_aggregates(fields).only_fields(fields).prefetch_related(*prefetches)
+    
+    def with_detail_data(self, fields=None):
+        """
+        Annotate and prefetch everything RestaurantDetailSerializer reads, so
+        the number of queries does not depend on the number of reviews,
+        tables or photos. Only the latest LATEST_REVIEWS reviews are loaded,
+        into latest_reviews.
+        
+        With `fields`, only what those fields need is loaded.
+        """
+        queryset = self.with_aggregates(fields).only_fields(fields)
+        if fields is None or 'manager_name' in fields:
+            queryset = queryset.select_related('manager')
+        
+        prefetches = {
+            'cuisine': 'cuisine',
+            'hours': 'hours',
+            'tables': 'tables',
+            'photos': 'photos',
+            'reviews': Prefetch(
+                'reviews',
+                queryset=Review.objects.select_related('user').order_by('-created_at', '-id')[:LATEST_REVIEWS],
+                to_attr='latest_reviews'
+            ),
+        }
+        return queryset.prefetch_related(*[
+            prefetch for name, prefetch in prefetches.items()
+            if fields is None or name in fields
+        ])
+    
+    def catalog_state(self):
+        """
+        Validators of the catalog endpoints serving these restaurants, as
+        (state, last_modified), from two aggregate queries: the count and
+        latest updated_at of the restaurants, and the count and latest
+        change of today's bookings, which feed bookings_today.
+        
+        Nested data (hours, tables, photos, reviews, cuisines) touches
+        Restaurant.updated_at when it changes, see restaurants.signals.
+        """
+        from bookings.models import Booking
+        
+        now = timezone.now()
+        restaurants = self.order_by().aggregate(count=Count('id'), updated=Max('updated_at'))
+        bookings_today = Booking.objects.filter(
+            table__restaurant__in=self.order_by().values('id'),
+            date=now.date()
+        ).aggregate(count=Count('id'), updated=Max('updated_at'))
+        
+        state = [
+            now.date().isoformat(),
+            restaurants['count'], restaurants['updated'],
+            bookings_today['count'], bookings_today['updated']
+        ]
+        # bookings_today resets at midnight without any write
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        last_modified = max(
+            value for value in (restaurants['updated'], bookings_today['updated'], start_of_day)
+            if value is not None
+        )
+        return state, last_modified
+
 class Restaurant(models.Model):
     """
     Model for restaurant information
@@ -45,6 +247,8 @@ class Restaurant(models.Model):
     # Location for maps
     latitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
+    # Geohash of the coordinates, indexed for radius search (see restaurants.geo)
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True, editable=False)
     
     # Restaurant manager
     manager = models.ForeignKey(
@@ -61,11 +265,108 @@ class Restaurant(models.Model):
         default='pending'
     )
     
+    # Capacity profile of the tables, kept in sync by refresh_capacity_profile()
+    # so searches can drop restaurants that cannot seat a party at all
+    max_table_capacity = models.PositiveIntegerField(default=0, db_index=True, editable=False)
+    table_count = models.PositiveIntegerField(default=0, editable=False)
+    # Number of tables per capacity, e.g. {"2": 4, "6": 1}
+    capacity_histogram = models.JSONField(default=dict, blank=True, editable=False)
+    
+    # Review rating aggregates, changed with F() expressions on every review
+    # write (see RestaurantQuerySet.update_ratings()) so the average and the
+    # distribution are column reads
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+    # rating_sum / rating_count (0 without reviews), indexed to sort by rating
+    rating_average = models.FloatField(default=0, db_index=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Columns only written with update() by refresh_capacity_profile(),
+    # refresh_ratings() and RestaurantQuerySet.update_ratings()
+    DENORMALIZED_FIELDS = (
+        'max_table_capacity', 'table_count', 'capacity_histogram',
+        'rating_count', 'rating_sum', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5',
+        'rating_average',
+    )
+    
+    objects = RestaurantQuerySet.as_manager()
+    
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        """
+        Keep the geohash in sync with the coordinates.
+        
+        Updates leave DENORMALIZED_FIELDS out unless update_fields names
+        them: an instance loaded before a review or table write would
+        otherwise overwrite the new aggregates with its old values.
+        """
+        from .geo import encode_geohash
+        
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(float(self.latitude), float(self.longitude))
+        else:
+            self.geohash = ''
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            skipped = set(self.DENORMALIZED_FIELDS) | self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skipped and field.attname not in skipped
+            ]
+        elif update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        
+        super().save(*args, **kwargs)
+    
+    def refresh_capacity_profile(self):
+        """
+        Recompute the capacity profile from the tables with one aggregate
+        query. Saved with update() so no save signals fire.
+        """
+        histogram = {
+            str(capacity): count
+            for capacity, count in self.tables.order_by('capacity').values_list('capacity').annotate(
+                count=Count('id')
+            )
+        }
+        self.capacity_histogram = histogram
+        self.table_count = sum(histogram.values())
+        self.max_table_capacity = max((int(capacity) for capacity in histogram), default=0)
+        
+        Restaurant.objects.filter(pk=self.pk).update(
+            capacity_histogram=self.capacity_histogram,
+            table_count=self.table_count,
+            max_table_capacity=self.max_table_capacity
+        )
+    
+    @property
+    def rating_distribution(self):
+        """Number of reviews per star, e.g. {"1": 0, ..., "5": 12}"""
+        return {str(star): getattr(self, f'rating_{star}') for star in RATING_STARS}
+    
+    def refresh_ratings(self):
+        """
+        Recompute the rating aggregates from the reviews with one aggregate
+        query, e.g. after bulk review changes that bypass signals. Saved
+        with update() so no save signals fire. Returns the columns.
+        """
+        histogram = dict(self.reviews.order_by().values_list('rating').annotate(count=Count('id')))
+        columns = rating_columns(histogram)
+        for name, value in columns.items():
+            setattr(self, name, value)
+        
+        Restaurant.objects.filter(pk=self.pk).update(**columns)
+        return columns
 
 def restaurant_photo_path(instance, filename):
     """Function to return custom path for restaurant photos"""
@@ -145,6 +446,10 @@ class RestaurantHours(models.Model):
     class Meta:
         unique_together = ('restaurant', 'day')
         ordering = ['day']
+        indexes = [
+            # Open-at-time filtering in restaurant searches
+            models.Index(fields=['day', 'opening_time', 'closing_time'], name='hours_day_open_close_idx'),
+        ]
     
     def __str__(self):
         return f"{self.restaurant.name} - {self.get_day_display()}"
@@ -175,6 +480,48 @@ class Review(models.Model):
     
     class Meta:
         unique_together = ('restaurant', 'user')
+        indexes = [
+            # Review feed of a restaurant, newest or highest rated first
+            models.Index(fields=['restaurant', '-created_at', '-id'], name='review_restaurant_created_idx'),
+            models.Index(fields=['restaurant', '-rating', '-created_at', '-id'], name='review_restaurant_rating_idx'),
+        ]
     
     def __str__(self):
         return f"Review for {self.restaurant.name} by {self.user.username}"
+
+class SlotInventory(models.Model):
+    """
+    Materialized number of free tables per restaurant, date, time slot and
+    table capacity, kept up to date as bookings, tables and hours change
+    """
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='slot_inventory')
+    date = models.DateField()
+    # Slot start in minutes after midnight of the service date (past 1440 for
+    # service that runs after midnight)
+    slot = models.PositiveIntegerField()
+    # Capacity bucket: tables of exactly this capacity
+    capacity = models.IntegerField()
+    free_tables = models.IntegerField()
+    
+    class Meta:
+        unique_together = ('restaurant', 'date', 'slot', 'capacity')
+        ordering = ['date', 'slot', 'capacity']
+    
+    def __str__(self):
+        return f"{self.restaurant.name} - {self.date} slot {self.slot} (capacity {self.capacity}): {self.free_tables} free"
+
+class SearchToken(models.Model):
+    """
+    Full-text search index entry: a normalized word found in a restaurant's
+    name, description, location or cuisines, with its field-weighted score
+    """
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=50)
+    weight = models.FloatField()
+    
+    class Meta:
+        # The (token, restaurant) index serves term lookups
+        unique_together = ('token', 'restaurant')
+    
+    def __str__(self):
+        return f"{self.token} -> {self.restaurant_id} ({self.weight})"
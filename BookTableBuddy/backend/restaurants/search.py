@@ -0,0 +1,160 @@
+"""
+Full-text restaurant search.
+
+SearchToken rows form an inverted index from normalized words to the
+restaurants whose name, description, city, state or cuisines contain them,
+weighted by field. The index is kept current by signal handlers (see
+restaurants.signals). Queries look up each term through the token index,
+require every term to match and rank the matches by a TF-IDF style score.
+Only the MAX_TEXT_RESULTS best matches are returned.
+"""
+import math
+import re
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Restaurant, SearchToken
+
+# Relative importance of a word depending on the field it appears in
+FIELD_WEIGHTS = {
+    'name': 5.0,
+    'cuisine': 3.0,
+    'city': 2.0,
+    'state': 2.0,
+    'description': 1.0,
+}
+
+MAX_TOKEN_LENGTH = 50
+MAX_QUERY_TERMS = 8
+
+# Most matches a text search returns, best first
+MAX_TEXT_RESULTS = 500
+
+# The number of restaurants scales the weight of rare terms; it is counted
+# again at most this often rather than on every query
+CORPUS_SIZE_KEY = 'search:corpus-size'
+CORPUS_SIZE_SECONDS = 300
+
+STOP_WORDS = {'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'}
+
+# Sorts after every token character, used as an exclusive prefix bound
+PREFIX_END = '\uffff'
+
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Lowercased words of a text, without stop words"""
+    return [
+        word[:MAX_TOKEN_LENGTH]
+        for word in WORD_PATTERN.findall((text or '').lower())
+        if word not in STOP_WORDS
+    ]
+
+
+def restaurant_tokens(name, description, city, state, cuisines):
+    """
+    Map each token of a restaurant's searchable fields to its weight.
+
+    Repeated words add up, damped logarithmically so long descriptions do not
+    dominate the ranking.
+    """
+    counts = defaultdict(float)
+    fields = [
+        ('name', name),
+        ('description', description),
+        ('city', city),
+        ('state', state),
+    ] + [('cuisine', cuisine) for cuisine in cuisines]
+
+    for field, text in fields:
+        for token in tokenize(text):
+            counts[token] += FIELD_WEIGHTS[field]
+
+    return {token: 1 + math.log(score) for token, score in counts.items()}
+
+
+def index_restaurant(restaurant):
+    """Rebuild the search tokens of one restaurant"""
+    tokens = restaurant_tokens(
+        restaurant.name,
+        restaurant.description,
+        restaurant.city,
+        restaurant.state,
+        restaurant.cuisine.values_list('name', flat=True)
+    )
+    with transaction.atomic():
+        SearchToken.objects.filter(restaurant=restaurant).delete()
+        SearchToken.objects.bulk_create([
+            SearchToken(restaurant=restaurant, token=token, weight=weight)
+            for token, weight in tokens.items()
+        ])
+
+
+def corpus_size():
+    """Number of restaurants, cached for CORPUS_SIZE_SECONDS"""
+    return cache.get_or_set(CORPUS_SIZE_KEY, Restaurant.objects.count, CORPUS_SIZE_SECONDS) or 1
+
+
+def rank_restaurants(query):
+    """
+    Return [(restaurant_id, score)] for restaurants matching every term of
+    the query, best first. The last term also matches as a prefix so
+    partially typed words find results.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+
+    conditions = Q(token__in=terms[:-1]) if len(terms) > 1 else Q()
+    last = terms[-1]
+    conditions |= Q(token__gte=last, token__lt=last + PREFIX_END)
+
+    postings = defaultdict(list)
+    for restaurant_id, token, weight in SearchToken.objects.filter(conditions).values_list(
+        'restaurant_id', 'token', 'weight'
+    ):
+        postings[token].append((restaurant_id, weight))
+
+    total = corpus_size()
+    scores = defaultdict(float)
+    matched = defaultdict(set)
+    for token, entries in postings.items():
+        idf = math.log(1 + total / len(entries))
+        # A token is one of the exact terms, extends the last one, or both
+        satisfied = {term for term in terms[:-1] if term == token}
+        if token.startswith(last):
+            satisfied.add(last)
+        for restaurant_id, weight in entries:
+            scores[restaurant_id] += weight * idf
+            matched[restaurant_id] |= satisfied
+
+    ranked = [
+        (restaurant_id, score) for restaurant_id, score in scores.items()
+        if len(matched[restaurant_id]) == len(terms)
+    ]
+    ranked.sort(key=lambda item: (-item[1], item[0]))
+    return ranked
+
+
+def filter_by_text(queryset, query, limit=MAX_TEXT_RESULTS):
+    """
+    Restrict a Restaurant queryset to its `limit` best full-text matches of
+    `query`.
+
+    Returns the filtered queryset and a dict of restaurant ID -> relevance
+    score; ordering by the score is left to the caller.
+    """
+    ranked = rank_restaurants(query)
+    if not ranked:
+        return queryset.none(), {}
+
+    # Keep the best matches among the restaurants the other filters allow
+    scores = dict(ranked)
+    allowed = set(queryset.filter(id__in=scores).values_list('id', flat=True))
+    best = [restaurant_id for restaurant_id, _ in ranked if restaurant_id in allowed][:limit]
+
+    return queryset.filter(id__in=best), {restaurant_id: scores[restaurant_id] for restaurant_id in best}
@@ -0,0 +1,165 @@
+"""
+Cache of restaurant search results.
+
+Entries are keyed on the normalized query parameters of a search and hold
+the ordered IDs of the matching restaurants plus the slot data computed for
+them, so a repeated search skips the filtering and availability work.
+
+Each entry records a version token for every candidate restaurant it looked
+at and a global generation token. Booking, table and review changes
+replace the token of their restaurant, which invalidates exactly the
+entries that considered it. Changes that can make a restaurant a candidate for new
+searches (approval, profile, cuisine or opening hours edits, or a change of
+the largest table size) replace the generation token.
+Tokens are random rather than counters, so an evicted token can never come
+back with a value an old entry expects.
+
+Invalidation only works when every worker process reads and writes the same
+cache, so the cache is only used with a shared backend (see REDIS_URL in the
+settings). With the default per-process local memory cache it stays off.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+KEY_PREFIX = 'search-cache'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+HITS_KEY = f'{KEY_PREFIX}:hits'
+MISSES_KEY = f'{KEY_PREFIX}:misses'
+
+# Query parameters that do not change which restaurants match
+IGNORED_PARAMS = {'facets'}
+
+# Cache backends private to one process
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def _restaurant_key(restaurant_id):
+    return f'{KEY_PREFIX}:restaurant:{restaurant_id}'
+
+
+def _timeout():
+    return getattr(settings, 'SEARCH_CACHE_SECONDS', 0)
+
+
+def is_shared():
+    """Whether the default cache is shared between worker processes"""
+    return not isinstance(caches['default'], PROCESS_LOCAL_BACKENDS)
+
+
+def is_enabled():
+    return bool(_timeout()) and is_shared()
+
+
+def _count(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, None)
+
+
+def _tokens(keys):
+    """Current tokens of the given version keys, creating missing ones"""
+    tokens = cache.get_many(keys)
+    missing = [key for key in keys if key not in tokens]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, None)
+        tokens.update(cache.get_many(missing))
+    return tokens
+
+
+def normalize_params(params):
+    """
+    Sorted (name, value) pairs of the search query parameters, lowercased and
+    without empty values or parameters that do not change the matches
+    """
+    return sorted(
+        (key, value.strip().lower())
+        for key, values in params.lists() if key not in IGNORED_PARAMS
+        for value in values if value.strip()
+    )
+
+
+def search_key(namespace, params):
+    """Cache key of a search from its view and normalized query parameters"""
+    digest = hashlib.sha1(repr(normalize_params(params)).encode()).hexdigest()
+    return f'{KEY_PREFIX}:{namespace}:{digest}'
+
+
+def generation():
+    """
+    Snapshot of the generation token. Take it before reading any data the
+    entry will be built from.
+    """
+    return _tokens([GENERATION_KEY])
+
+
+def snapshot(restaurant_ids):
+    """
+    Snapshot of the version tokens of candidate restaurants. Take it before
+    reading their availability.
+    """
+    return _tokens([_restaurant_key(restaurant_id) for restaurant_id in restaurant_ids])
+
+
+def lookup(key):
+    """
+    Return the cached entry for a search key if every token it depends on is
+    unchanged, otherwise None. Counts a hit or a miss.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        versions = entry['versions']
+        if cache.get_many(list(versions)) == versions:
+            _count(HITS_KEY)
+            return entry
+        cache.delete(key)
+
+    _count(MISSES_KEY)
+    return None
+
+
+def store(key, versions, restaurant_ids, **data):
+    """
+    Cache the result of a search.
+
+    Args:
+        key: Key from search_key()
+        versions: Merged generation() and snapshot() tokens taken before the
+            search read its data
+        restaurant_ids: Matching restaurant IDs in result order
+        data: Slot data and other per-restaurant context to restore on a hit
+    """
+    entry = dict(data, versions=versions, restaurant_ids=list(restaurant_ids))
+    cache.set(key, entry, _timeout())
+
+
+def invalidate_restaurant(restaurant_id):
+    """Invalidate every cached search that considered this restaurant"""
+    cache.set(_restaurant_key(restaurant_id), uuid.uuid4().hex, None)
+
+
+def invalidate_all():
+    """Invalidate every cached search"""
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def stats():
+    """Hit and miss counters"""
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'enabled': is_enabled(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0
+    }
@@ -1,14 +1,14 @@
 from rest_framework import serializers
-from django.db.models import Avg
-from .models import Restaurant, Cuisine, RestaurantHours, Table, Review, RestaurantPhoto
+from .models import Restaurant, Cuisine, RestaurantHours, Table, Review, RestaurantPhoto, LATEST_REVIEWS
 from bookings.models import Booking
+from booktable.sparse_fields import SparseFieldsetMixin
 from django.utils import timezone
 from datetime import timedelta
 
 class CuisineSerializer(serializers.ModelSerializer):
     class Meta:
         model = Cuisine
-        fields = '__all__'
+        fields = ['id', 'name']
 
 class RestaurantHoursSerializer(serializers.ModelSerializer):
     day_name = serializers.CharField(source='get_day_display', read_only=True)
@@ -84,7 +84,7 @@ class RestaurantPhotoSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Invalid image file. Please upload a valid image.")
         return value
 
-class RestaurantListSerializer(serializers.ModelSerializer):
+class RestaurantListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     cuisine = CuisineSerializer(many=True, read_only=True)
     primary_photo = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
@@ -100,11 +100,18 @@ class RestaurantListSerializer(serializers.ModelSerializer):
             'primary_photo', 'bookings_today', 'approval_status', 'available_time_slots'
         ]
     
+    # Added by to_representation() for searches that compute them
+    extra_fields = ('nearest_available_slots', 'distance_km')
+    
     def get_primary_photo(self, obj):
         try:
-            photo = obj.photos.filter(is_primary=True).first()
-            if not photo:
-                photo = obj.photos.first()  # Fallback to first photo if no primary photo
+            if hasattr(obj, 'primary_photos'):
+                # Prefetched by Restaurant.objects.with_list_data()
+                photo = obj.primary_photos[0] if obj.primary_photos else None
+            else:
+                photo = obj.photos.filter(is_primary=True).first()
+                if not photo:
+                    photo = obj.photos.first()  # Fallback to first photo if no primary photo
                 
             if not photo:
                 return None
@@ -122,9 +129,12 @@ class RestaurantListSerializer(serializers.ModelSerializer):
         return None
     
     def get_average_rating(self, obj):
-        return obj.reviews.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
+        # Kept up to date on every review write, see Restaurant.rating_average
+        return obj.rating_average or 0
     
     def get_bookings_today(self, obj):
+        if hasattr(obj, 'bookings_today_count'):
+            return obj.bookings_today_count
         today = timezone.now().date()
         return Booking.objects.filter(
             table__restaurant=obj,
@@ -141,15 +151,33 @@ class RestaurantListSerializer(serializers.ModelSerializer):
         
         # Return time slots for this restaurant, or empty list if none
         return context.get(obj.id, [])
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        
+        # Nearest available slots are only included when the search asked for them
+        nearest_slots = self.context.get('nearest_slots')
+        if nearest_slots is not None and self.includes('nearest_available_slots'):
+            data['nearest_available_slots'] = nearest_slots.get(instance.id)
+        
+        # Distance from the search point for radius searches
+        distances = self.context.get('distances')
+        if distances is not None and self.includes('distance_km'):
+            data['distance_km'] = distances.get(instance.id)
+        
+        return data
 
-class RestaurantDetailSerializer(serializers.ModelSerializer):
+class RestaurantDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     cuisine = CuisineSerializer(many=True)
     hours = RestaurantHoursSerializer(many=True)
     tables = TableSerializer(many=True)
-    reviews = ReviewSerializer(many=True, read_only=True)
+    # Only the latest few, the full feed is paged through the reviews endpoint
+    reviews = serializers.SerializerMethodField()
     photos = RestaurantPhotoSerializer(many=True, required=False)
     manager_name = serializers.CharField(source='manager.username', read_only=True)
     average_rating = serializers.SerializerMethodField()
+    review_count = serializers.IntegerField(source='rating_count', read_only=True)
+    rating_distribution = serializers.DictField(child=serializers.IntegerField(), read_only=True)
     bookings_today = serializers.SerializerMethodField()
     cost_rating_display = serializers.CharField(source='get_cost_rating_display', read_only=True)
     
@@ -159,15 +187,26 @@ class RestaurantDetailSerializer(serializers.ModelSerializer):
             'id', 'name', 'description', 'address', 'city', 'state', 'zip_code',
             'phone', 'email', 'website', 'cuisine', 'cost_rating', 'cost_rating_display',
             'latitude', 'longitude', 'manager', 'manager_name', 'approval_status',
-            'hours', 'tables', 'reviews', 'photos', 'average_rating', 'bookings_today',
-            'created_at', 'updated_at'
+            'hours', 'tables', 'reviews', 'photos', 'average_rating', 'review_count',
+            'rating_distribution', 'bookings_today', 'created_at', 'updated_at'
         ]
         read_only_fields = ['manager', 'created_at', 'updated_at']
     
+    def get_reviews(self, obj):
+        if hasattr(obj, 'latest_reviews'):
+            # Prefetched by Restaurant.objects.with_detail_data()
+            reviews = obj.latest_reviews
+        else:
+            reviews = obj.reviews.select_related('user').order_by('-created_at', '-id')[:LATEST_REVIEWS]
+        return ReviewSerializer(reviews, many=True, context=self.context).data
+    
     def get_average_rating(self, obj):
-        return obj.reviews.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
+        # Kept up to date on every review write, see Restaurant.rating_average
+        return obj.rating_average or 0
     
     def get_bookings_today(self, obj):
+        if hasattr(obj, 'bookings_today_count'):
+            return obj.bookings_today_count
         today = timezone.now().date()
         return Booking.objects.filter(
             table__restaurant=obj,
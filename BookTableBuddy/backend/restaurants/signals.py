@@ -0,0 +1,220 @@
+"""
+Signal handlers that keep denormalized restaurant data in sync
+"""
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Restaurant, Cuisine, Table, RestaurantHours, RestaurantPhoto, Review
+from .inventory import apply_booking, invalidate_restaurant
+from .search import index_restaurant
+from . import search_cache
+from bookings.models import Booking
+
+
+@receiver(pre_save, sender=Booking)
+def remember_confirmed_booking(sender, instance, raw=False, **kwargs):
+    """Remember the stored slot of a confirmed booking before it changes"""
+    instance._confirmed_slot = None
+    if instance.pk and not raw:
+        instance._confirmed_slot = Booking.objects.filter(
+            pk=instance.pk,
+            status='confirmed'
+        ).values_list('table_id', 'date', 'time').first()
+
+
+@receiver(post_save, sender=Booking)
+def update_inventory_on_booking_save(sender, instance, raw=False, **kwargs):
+    """Release the old slot and take the new one when a booking is created or changed"""
+    if raw:
+        return
+
+    previous = getattr(instance, '_confirmed_slot', None)
+    current = None
+    if instance.status == 'confirmed':
+        current = (instance.table_id, instance.date, instance.time)
+
+    if previous == current:
+        return
+    if previous:
+        apply_booking(*previous, delta=1, exclude_id=instance.pk)
+        invalidate_search_for_table(previous[0])
+    if current:
+        apply_booking(*current, delta=-1, exclude_id=instance.pk)
+        invalidate_search_for_table(current[0])
+
+
+@receiver(post_delete, sender=Booking)
+def update_inventory_on_booking_delete(sender, instance, **kwargs):
+    if instance.status == 'confirmed':
+        apply_booking(instance.table_id, instance.date, instance.time, delta=1, exclude_id=instance.pk)
+        invalidate_search_for_table(instance.table_id)
+
+
+def invalidate_search_for_table(table_id):
+    restaurant_id = Table.objects.filter(pk=table_id).values_list('restaurant_id', flat=True).first()
+    if restaurant_id is not None:
+        search_cache.invalidate_restaurant(restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=Table)
+@receiver([post_save, post_delete], sender=RestaurantHours)
+def invalidate_inventory(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_restaurant(instance.restaurant_id)
+    if sender is RestaurantHours:
+        # Searches drop restaurants closed at the requested time before
+        # tracking their candidates, so new hours can add the restaurant to
+        # searches that never considered it
+        search_cache.invalidate_all()
+    else:
+        search_cache.invalidate_restaurant(instance.restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=Table)
+def refresh_capacity_profile(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    restaurant = Restaurant.objects.filter(pk=instance.restaurant_id).first()
+    if restaurant is None:
+        return
+    previous_max = restaurant.max_table_capacity
+    restaurant.refresh_capacity_profile()
+    if restaurant.max_table_capacity != previous_max:
+        # Searches drop restaurants without a table big enough for the party
+        # before tracking their candidates, and the profile is saved with
+        # update(), so no Restaurant signal invalidates them either
+        search_cache.invalidate_all()
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+@receiver([post_save, post_delete], sender=Cuisine)
+@receiver(m2m_changed, sender=Restaurant.cuisine.through)
+def invalidate_search_results(sender, raw=False, action=None, **kwargs):
+    """
+    Approval, profile and cuisine changes can add a restaurant to searches
+    it was never a candidate for, so they invalidate every cached search
+    """
+    if raw or (action is not None and not action.startswith('post_')):
+        return
+    search_cache.invalidate_all()
+
+
+@receiver(post_save, sender=Restaurant)
+def index_restaurant_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_restaurant(instance)
+
+
+@receiver(m2m_changed, sender=Restaurant.cuisine.through)
+def index_restaurant_on_cuisine_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Re-index restaurants whose cuisines were added, removed or cleared"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            index_restaurant(instance)
+        return
+
+    # Changed from the cuisine side: remember who is affected before a clear
+    if action == 'pre_clear':
+        instance._cleared_restaurant_ids = list(instance.restaurants.values_list('id', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_restaurant_ids', [])
+    elif action not in ('post_add', 'post_remove'):
+        return
+    for restaurant in Restaurant.objects.filter(pk__in=pk_set):
+        index_restaurant(restaurant)
+
+
+@receiver(post_save, sender=Cuisine)
+def index_restaurants_on_cuisine_rename(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    for restaurant in instance.restaurants.all():
+        index_restaurant(restaurant)
+
+
+def touch_restaurants(restaurant_ids):
+    """
+    Bump updated_at of restaurants whose nested data changed, so the ETag
+    and Last-Modified of the catalog endpoints change with it. A queryset
+    update does not send Restaurant signals, so this does not re-index the
+    restaurants or invalidate cached searches.
+    """
+    Restaurant.objects.filter(pk__in=restaurant_ids).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=Table)
+@receiver([post_save, post_delete], sender=RestaurantHours)
+@receiver([post_save, post_delete], sender=RestaurantPhoto)
+@receiver([post_save, post_delete], sender=Review)
+def touch_restaurant_on_nested_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_restaurants([instance.restaurant_id])
+
+
+@receiver(m2m_changed, sender=Restaurant.cuisine.through)
+def touch_restaurants_on_cuisine_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        touch_restaurants([instance.pk])
+    elif action == 'post_clear':
+        # Remembered by index_restaurant_on_cuisine_change on pre_clear
+        touch_restaurants(getattr(instance, '_cleared_restaurant_ids', []))
+    else:
+        touch_restaurants(pk_set)
+
+
+@receiver(post_save, sender=Cuisine)
+def touch_restaurants_on_cuisine_rename(sender, instance, created, raw=False, **kwargs):
+    if not (raw or created):
+        touch_restaurants(instance.restaurants.values('id'))
+
+
+@receiver(pre_delete, sender=Cuisine)
+def touch_restaurants_on_cuisine_delete(sender, instance, **kwargs):
+    # The cuisine's links are removed without m2m_changed signals
+    touch_restaurants(instance.restaurants.values('id'))
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, raw=False, **kwargs):
+    """Remember the stored restaurant and rating of a review before it changes"""
+    instance._stored_rating = None
+    if instance.pk and not raw:
+        instance._stored_rating = Review.objects.filter(pk=instance.pk).values_list(
+            'restaurant_id', 'rating'
+        ).first()
+
+
+@receiver(post_save, sender=Review)
+def update_ratings_on_review_save(sender, instance, raw=False, **kwargs):
+    """
+    Update the rating columns of the restaurant. They are saved with
+    update(), so no Restaurant signal invalidates the cached searches that
+    show the rating or sort by it.
+    """
+    if raw:
+        return
+
+    previous = getattr(instance, '_stored_rating', None)
+    if previous and previous[0] != instance.restaurant_id:
+        # Moved to another restaurant
+        Restaurant.objects.filter(pk=previous[0]).update_ratings(removed=previous[1])
+        search_cache.invalidate_restaurant(previous[0])
+        previous = None
+    if previous and previous[1] == instance.rating:
+        return
+    Restaurant.objects.filter(pk=instance.restaurant_id).update_ratings(
+        added=instance.rating,
+        removed=previous[1] if previous else None
+    )
+    search_cache.invalidate_restaurant(instance.restaurant_id)
+
+
+@receiver(post_delete, sender=Review)
+def update_ratings_on_review_delete(sender, instance, **kwargs):
+    Restaurant.objects.filter(pk=instance.restaurant_id).update_ratings(removed=instance.rating)
+    search_cache.invalidate_restaurant(instance.restaurant_id)
@@ -0,0 +1,610 @@
+"""
+Tests for restaurant reads.
+
+List, detail and search endpoints must issue the same number of queries
+however many restaurants, tables, photos and reviews there are, so the
+counts measured with a few restaurants are asserted again with more.
+
+List endpoints must return the same JSON with and without the fast
+values()-based serializers (FAST_LIST_SERIALIZERS).
+
+Saving a restaurant instance loaded before a review or table write must not
+reset the rating and capacity columns those writes maintain.
+
+The search engines are checked against small hand-made data sets: slot
+availability and the slot inventory, geohash radius search, full-text
+ranking, facet counts, search result paging and cache invalidation, and
+conditional GET with ETags.
+"""
+from datetime import time, timedelta
+
+from django.test import SimpleTestCase, TestCase
+
+from booktable.testing import SEARCH_DATE, RestaurantFixtureMixin
+from bookings.models import Booking
+from users.models import User
+from . import search_cache
+from .facets import facet_counts, parse_facets
+from .geo import bounding_box, covering_cells, encode_geohash, haversine_km, parse_near
+from .inventory import materialize_day, slot_counts
+from .models import Cuisine, Restaurant, RestaurantHours, Review, SlotInventory, Table
+from .search import rank_restaurants, tokenize
+
+
+class RestaurantQueryCountTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(3)
+
+    def test_list(self):
+        response = self.assertConstantQueries('/api/restaurants/', grow=lambda: self.add_restaurants(12))
+        self.assertEqual(len(response.data['results']), 15)
+
+    def test_detail(self):
+        restaurant = self.restaurants[0]
+        response = self.assertConstantQueries(
+            f'/api/restaurants/{restaurant.id}/',
+            grow=lambda: self.add_related(restaurant, 10)
+        )
+        self.assertEqual(len(response.data['tables']), 12)
+        self.assertEqual(response.data['review_count'], 12)
+
+    def test_search(self):
+        params = {'date': SEARCH_DATE.isoformat(), 'time': '19:00', 'party_size': 2}
+        response = self.assertConstantQueries(
+            '/api/restaurants/search/', params, grow=lambda: self.add_restaurants(12)
+        )
+        self.assertEqual(len(response.data['results']), 15)
+
+    def test_text_search(self):
+        response = self.assertConstantQueries(
+            '/api/restaurants/search/', {'q': 'pasta'}, grow=lambda: self.add_restaurants(12)
+        )
+        self.assertEqual(len(response.data['results']), 15)
+
+    def test_flexible_search(self):
+        params = {'date': SEARCH_DATE.isoformat(), 'time': '19:00', 'party_size': 2, 'near': '37.33,-121.88'}
+        response = self.assertConstantQueries(
+            '/api/restaurants/flexible-search/', params, grow=lambda: self.add_restaurants(12)
+        )
+        self.assertEqual(len(response.data['results']), 15)
+        self.assertTrue(all(item['available_time_slots'] for item in response.data['results']))
+
+    def test_flexible_search_alternatives(self):
+        params = {'date': SEARCH_DATE.isoformat(), 'time': '19:00', 'party_size': 2, 'alternatives': 'true'}
+        response = self.assertConstantQueries(
+            '/api/restaurants/flexible-search/', params, grow=lambda: self.add_restaurants(12)
+        )
+        self.assertEqual(len(response.data['results']), 15)
+
+
+class FastListSerializerTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(4)
+        self.pending = self.create_restaurant()
+        Restaurant.objects.filter(pk=self.pending.pk).update(approval_status='pending')
+        self.search = {'date': SEARCH_DATE.isoformat(), 'time': '19:00', 'party_size': 2}
+
+    def test_search(self):
+        data = self.assertSameWithFastSerializers('/api/restaurants/search/', self.search)
+        self.assertEqual(len(data['results']), 4)
+        self.assertSameWithFastSerializers('/api/restaurants/search/', {'q': 'trattoria', 'near': '37.33,-121.88'})
+
+    def test_flexible_search(self):
+        data = self.assertSameWithFastSerializers('/api/restaurants/flexible-search/', self.search)
+        self.assertEqual(len(data['results']), 4)
+        self.assertTrue(all(item['available_time_slots'] for item in data['results']))
+
+    def test_flexible_search_cached(self):
+        with self.shared_cache():
+            # A miss with the DRF serializer, then a hit with the fast one
+            data = self.assertSameWithFastSerializers('/api/restaurants/flexible-search/', self.search)
+            self.assertEqual(search_cache.stats()['hits'], 1)
+        self.assertTrue(all(item['available_time_slots'] for item in data['results']))
+
+    def test_flexible_search_pages(self):
+        data = self.assertSameWithFastSerializers('/api/restaurants/flexible-search/', dict(self.search, page_size=3))
+        self.assertEqual(len(data['results']), 3)
+        data = self.assertSameWithFastSerializers(data['next'])
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNone(data['next'])
+
+    def test_flexible_search_variants(self):
+        for extra in (
+            {'alternatives': 'true'},
+            {'near': '37.33,-121.88', 'q': 'pasta'},
+            {'sort': 'rating'},
+            {'fields': 'id,name,available_time_slots'},
+            {'omit': 'available_time_slots'},
+        ):
+            with self.subTest(**extra):
+                self.assertSameWithFastSerializers('/api/restaurants/flexible-search/', dict(self.search, **extra))
+
+    def test_flexible_search_facets(self):
+        data = self.assertSameWithFastSerializers(
+            '/api/restaurants/flexible-search/', dict(self.search, facets='cuisine,city')
+        )
+        self.assertEqual(len(data['results']), 4)
+
+    def test_manager_restaurants(self):
+        self.client.force_authenticate(self.manager)
+        data = self.assertSameWithFastSerializers('/api/restaurants/my-restaurants/')
+        self.assertEqual(len(data), 5)
+
+    def test_pending_restaurants(self):
+        admin = User.objects.create_user('admin', 'admin@example.com', 'pw', role=User.ADMIN)
+        self.client.force_authenticate(admin)
+        data = self.assertSameWithFastSerializers('/api/restaurants/pending-approval/')
+        self.assertEqual([item['id'] for item in data], [self.pending.id])
+
+
+class RestaurantSaveTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = self.create_restaurant(related=0)
+
+    def add_review_and_table(self):
+        Review.objects.create(restaurant=self.restaurant, user=self.customer, rating=5, comment='Lovely')
+        Table.objects.create(restaurant=self.restaurant, table_number='1', capacity=8)
+
+    def assertAggregatesKept(self):
+        restaurant = Restaurant.objects.get(pk=self.restaurant.pk)
+        self.assertEqual((restaurant.rating_count, restaurant.rating_5, restaurant.rating_average), (1, 1, 5))
+        self.assertEqual((restaurant.max_table_capacity, restaurant.table_count), (8, 1))
+        self.assertEqual(restaurant.capacity_histogram, {'8': 1})
+        return restaurant
+
+    def test_stale_save(self):
+        stale = Restaurant.objects.get(pk=self.restaurant.pk)
+        self.add_review_and_table()
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertEqual(self.assertAggregatesKept().name, 'Renamed')
+
+    def test_stale_created_instance(self):
+        self.add_review_and_table()
+        self.restaurant.approval_status = 'rejected'
+        self.restaurant.save()
+        self.assertEqual(self.assertAggregatesKept().approval_status, 'rejected')
+
+    def test_explicit_update_fields(self):
+        self.add_review_and_table()
+        restaurant = Restaurant.objects.get(pk=self.restaurant.pk)
+        restaurant.table_count = 0
+        restaurant.save(update_fields=['table_count'])
+        self.assertEqual(Restaurant.objects.get(pk=self.restaurant.pk).table_count, 0)
+
+
+class SearchPaginationTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(7, related=1)
+
+    def walk(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), params['page_size'])
+            ids += [item['id'] for item in response.data['results']]
+            if response.data['next'] is None:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_pages_keep_distance_order(self):
+        params = {'near': '37.34,-121.88', 'page_size': 3}
+        ids = self.walk('/api/restaurants/search/', params)
+        # The search point is north of every restaurant, and each restaurant
+        # lies 0.001 degrees north of the one created before it
+        expected = sorted((restaurant.id for restaurant in self.restaurants), reverse=True)
+        self.assertEqual(ids, expected)
+
+    def test_cursor_survives_changed_result(self):
+        params = {'q': 'trattoria', 'page_size': 3}
+        first = self.client.get('/api/restaurants/search/', params).data
+        # The first restaurant of the result disappears before the next page
+        Restaurant.objects.filter(pk=first['results'][0]['id']).update(approval_status='rejected')
+        second = self.client.get(first['next']).data
+        # Equal scores rank by ID
+        ids = sorted(restaurant.id for restaurant in self.restaurants)
+        self.assertEqual([item['id'] for item in first['results']], ids[:3])
+        self.assertEqual([item['id'] for item in second['results']], ids[3:6])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/restaurants/search/', {'cursor': 'nonsense'})
+        self.assertEqual(response.status_code, 404)
+
+
+class RatingSearchCacheTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(2, related=0)
+        for restaurant in self.restaurants:
+            Table.objects.create(restaurant=restaurant, table_number='1', capacity=4)
+        self.reviews = [
+            Review.objects.create(restaurant=restaurant, user=User.objects.create(username=f'reviewer-{rating}'), rating=rating)
+            for restaurant, rating in zip(self.restaurants, (2, 4))
+        ]
+        self.search = {'date': SEARCH_DATE.isoformat(), 'time': '19:00', 'party_size': 2, 'sort': 'rating'}
+
+    def ranking(self):
+        response = self.client.get('/api/restaurants/flexible-search/', self.search)
+        return [(item['id'], item['average_rating']) for item in response.data['results']]
+
+    def test_review_change_invalidates(self):
+        first, second = self.restaurants
+        with self.shared_cache():
+            self.assertEqual(self.ranking(), [(second.id, 4), (first.id, 2)])
+            self.reviews[0].rating = 5
+            self.reviews[0].save()
+            self.assertEqual(self.ranking(), [(first.id, 5), (second.id, 4)])
+            self.assertEqual(search_cache.stats()['hits'], 0)
+
+    def test_review_delete_invalidates(self):
+        first, second = self.restaurants
+        with self.shared_cache():
+            self.ranking()
+            self.reviews[1].delete()
+            self.assertEqual(self.ranking()[0], (first.id, 2))
+            # Unchanged ratings are served from the cache again
+            self.ranking()
+            self.assertEqual(search_cache.stats()['hits'], 1)
+
+
+class SlotInventoryTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = self.create_restaurant(related=3)
+        self.date = SEARCH_DATE
+
+    def inventory(self):
+        return list(SlotInventory.objects.filter(restaurant=self.restaurant, date=self.date).values_list(
+            'slot', 'capacity', 'free_tables'
+        ))
+
+    def book(self, table, hour):
+        return Booking.objects.create(
+            user=self.customer, table=table, date=self.date, time=time(hour), party_size=2,
+            contact_name='Customer', contact_email='customer@example.com', contact_phone='555-0101'
+        )
+
+    def test_bookings_match_rebuild(self):
+        slot_counts(self.restaurant.id, self.date)
+        tables = list(self.restaurant.tables.all())
+        first = self.book(tables[0], 19)
+        self.book(tables[1], 12)
+        first.status = 'cancelled'
+        first.save()
+        self.book(tables[0], 20)
+        maintained = self.inventory()
+        materialize_day(self.restaurant.id, self.date)
+        self.assertEqual(maintained, self.inventory())
+
+    def test_rebuild_replaces_day(self):
+        materialize_day(self.restaurant.id, self.date)
+        rows = self.inventory()
+        materialize_day(self.restaurant.id, self.date)
+        self.assertEqual(self.inventory(), rows)
+
+
+class FlexibleSearchWindowTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = self.create_restaurant(related=0)
+        self.table = Table.objects.create(restaurant=self.restaurant, table_number='1', capacity=4)
+        self.params = {'date': SEARCH_DATE.isoformat(), 'time': '19:00', 'party_size': 2}
+
+    def book(self, hour, minute=0, status='confirmed'):
+        Booking.objects.create(
+            user=self.customer, table=self.table, date=SEARCH_DATE, time=time(hour, minute), party_size=2,
+            status=status, contact_name='Customer', contact_email='customer@example.com', contact_phone='555-0101'
+        )
+
+    def slot_times(self):
+        response = self.client.get('/api/restaurants/flexible-search/', dict(self.params, time='12:00'))
+        return [slot['time'] for slot in response.data['results'][0]['available_time_slots']]
+
+    def test_booking_blocks_ninety_minutes(self):
+        self.book(17, 30)
+        times = self.slot_times()
+        self.assertIn('15:30', times)
+        for blocked in ('16:00', '17:30', '19:00'):
+            self.assertNotIn(blocked, times)
+        self.assertIn('19:30', times)
+
+    def test_cancelled_booking_does_not_block(self):
+        self.book(19, status='cancelled')
+        self.assertIn('19:00', self.slot_times())
+
+
+class AvailabilityTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = self.create_restaurant(related=0)
+        self.tables = [
+            Table.objects.create(restaurant=self.restaurant, table_number=str(number), capacity=capacity)
+            for number, capacity in ((1, 2), (2, 6))
+        ]
+
+    def book(self, table, hour, party_size=2):
+        Booking.objects.create(
+            user=self.customer, table=table, date=SEARCH_DATE, time=time(hour), party_size=party_size,
+            contact_name='Customer', contact_email='customer@example.com', contact_phone='555-0101'
+        )
+
+    def available_times(self, party_size):
+        response = self.client.get(
+            f'/api/restaurants/available-times/{self.restaurant.id}/',
+            {'date': SEARCH_DATE.isoformat(), 'party_size': party_size}
+        )
+        return response, {slot['time']: slot['available_tables'] for slot in response.data} if response.status_code == 200 else None
+
+    def test_free_tables_per_slot(self):
+        self.book(self.tables[1], 19, party_size=5)
+        _, slots = self.available_times(2)
+        self.assertEqual(slots['11:00:00'], 2)
+        self.assertEqual(slots['19:00:00'], 1)
+        _, slots = self.available_times(5)
+        self.assertEqual(slots['17:00:00'], 1)
+        self.assertNotIn('17:30:00', slots)
+        self.assertNotIn('20:30:00', slots)
+
+    def test_party_too_large(self):
+        response, _ = self.available_times(8)
+        self.assertEqual(response.status_code, 400)
+
+    def test_closed_day(self):
+        self.restaurant.hours.filter(day=SEARCH_DATE.weekday()).delete()
+        response, _ = self.available_times(2)
+        self.assertEqual(response.status_code, 400)
+
+    def test_calendar(self):
+        self.book(self.tables[1], 19, party_size=5)
+        self.restaurant.hours.filter(day=(SEARCH_DATE + timedelta(days=2)).weekday()).delete()
+        response = self.client.get(
+            f'/api/restaurants/availability-calendar/{self.restaurant.id}/',
+            {'start': SEARCH_DATE.isoformat(), 'days': 3, 'party_size': 5}
+        )
+        self.assertEqual(response.status_code, 200)
+        booked, free, closed = response.data['days']
+        # Half-hour slots from 11:00 to the last seating at 20:30
+        self.assertEqual(booked['first_slot'], '11:00')
+        self.assertEqual(booked['availability'], '1' * 13 + '0' * 7)
+        self.assertEqual(free['available_slots'], 20)
+        self.assertFalse(closed['open'])
+
+    def test_calendar_day_limit(self):
+        response = self.client.get(
+            f'/api/restaurants/availability-calendar/{self.restaurant.id}/', {'days': 91, 'party_size': 2}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class GeoTests(SimpleTestCase):
+
+    def test_encode_geohash(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744), 'u4pruydqq')
+        self.assertEqual(encode_geohash(57.64911, 10.40744, precision=5), 'u4pru')
+
+    def test_haversine(self):
+        # San Jose to San Francisco
+        self.assertAlmostEqual(haversine_km(37.3382, -121.8863, 37.7749, -122.4194), 67.7, delta=0.5)
+        self.assertEqual(haversine_km(37.0, -122.0, 37.0, -122.0), 0)
+
+    def test_covering_cells(self):
+        latitude, longitude = 37.33, -121.88
+        cells = covering_cells(*bounding_box(latitude, longitude, 5))
+        self.assertLessEqual(len(cells), 4)
+        self.assertTrue(any(encode_geohash(latitude, longitude).startswith(cell) for cell in cells))
+
+    def test_parse_near(self):
+        self.assertEqual(parse_near('37.33,-121.88', None), (37.33, -121.88, 10.0))
+        self.assertEqual(parse_near('37.33,-121.88', '2.5'), (37.33, -121.88, 2.5))
+        for near, radius in (('91,0', None), ('37.33', None), ('37.33,-121.88', '0'), ('37.33,-121.88', '501')):
+            with self.assertRaises(ValueError):
+                parse_near(near, radius)
+
+
+class RadiusSearchTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # About 111 m apart, north of each other
+        self.add_restaurants(3, related=0)
+
+    def test_radius(self):
+        response = self.client.get('/api/restaurants/search/', {'near': '37.331,-121.88', 'radius_km': 0.15})
+        results = response.data['results']
+        self.assertEqual([item['id'] for item in results], [self.restaurants[1].id, self.restaurants[0].id, self.restaurants[2].id])
+        self.assertEqual(results[0]['distance_km'], 0)
+        self.assertAlmostEqual(results[1]['distance_km'], 0.111, places=2)
+
+    def test_moved_restaurant(self):
+        # Saving new coordinates updates the geohash the search filters on
+        restaurant = self.restaurants[0]
+        restaurant.latitude, restaurant.longitude = 40.71, -74.0
+        restaurant.save()
+        response = self.client.get('/api/restaurants/search/', {'near': '40.71,-74.0', 'radius_km': 1})
+        self.assertEqual([item['id'] for item in response.data['results']], [restaurant.id])
+
+    def test_invalid_point(self):
+        response = self.client.get('/api/restaurants/search/', {'near': 'nowhere'})
+        self.assertEqual(response.data['results'], [])
+
+
+class TextSearchTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(3, related=0)
+        self.sushi, self.curry, self.plain = self.restaurants
+        self.sushi.name = 'Sushi Palace'
+        self.sushi.save()
+        self.curry.description = 'Curry house with sushi on Fridays'
+        self.curry.save()
+
+    def search(self, query):
+        return [restaurant_id for restaurant_id, _ in rank_restaurants(query)]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('The Curry House of San José'), ['curry', 'house', 'san', 'josé'])
+
+    def test_name_outranks_description(self):
+        self.assertEqual(self.search('sushi'), [self.sushi.id, self.curry.id])
+
+    def test_every_term_matches(self):
+        self.assertEqual(self.search('sushi curry'), [self.curry.id])
+        self.assertEqual(self.search('sushi burgers'), [])
+
+    def test_last_term_prefix(self):
+        self.assertEqual(self.search('curry hou'), [self.curry.id])
+        self.assertEqual(self.search('pal'), [self.sushi.id])
+
+    def test_index_follows_changes(self):
+        self.plain.cuisine.set([Cuisine.objects.create(name='Ethiopian')])
+        self.assertEqual(self.search('ethiopian'), [self.plain.id])
+        self.sushi.name = 'Noodle Bar'
+        self.sushi.save()
+        self.assertEqual(self.search('sushi'), [self.curry.id])
+
+    def test_search_endpoint(self):
+        response = self.client.get('/api/restaurants/search/', {'q': 'sushi', 'cuisine': 'italian'})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.sushi.id, self.curry.id])
+
+
+class FacetTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Price levels 1, 2, 3 and 4, then 1 again
+        self.add_restaurants(5)
+        self.restaurants[0].cuisine.set(self.cuisines[:1])
+        Restaurant.objects.filter(pk=self.restaurants[4].pk).update(city='Oakland')
+
+    def test_facet_counts(self):
+        facets = facet_counts(Restaurant.objects.all(), ['cuisine', 'price', 'city'])
+        self.assertEqual(facets['cuisine'], [{'value': 'Italian', 'count': 5}, {'value': 'Indian', 'count': 4}])
+        self.assertEqual(facets['price'][0], {'value': 1, 'count': 2})
+        self.assertEqual(facets['city'], [{'value': 'San Jose', 'count': 4}, {'value': 'Oakland', 'count': 1}])
+
+    def test_facets_of_search(self):
+        response = self.client.get(
+            '/api/restaurants/flexible-search/', {'location': 'san jose', 'facets': 'price,city', 'page_size': 2}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        # Counted over every match, not just the page
+        self.assertEqual(response.data['facets']['city'], [{'value': 'San Jose', 'count': 4}])
+        self.assertEqual(sum(item['count'] for item in response.data['facets']['price']), 4)
+
+    def test_unknown_facet(self):
+        with self.assertRaises(ValueError):
+            parse_facets('cuisine,colour')
+        response = self.client.get('/api/restaurants/flexible-search/', {'facets': 'colour'})
+        self.assertEqual(response.status_code, 400)
+
+
+class SearchCacheInvalidationTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(2, related=0)
+        self.tables = [
+            Table.objects.create(restaurant=restaurant, table_number='1', capacity=4) for restaurant in self.restaurants
+        ]
+        self.search = {'date': SEARCH_DATE.isoformat(), 'time': '19:00', 'party_size': 2}
+
+    def found(self):
+        response = self.client.get('/api/restaurants/search/', self.search)
+        return [item['id'] for item in response.data['results']]
+
+    def test_booking_invalidates(self):
+        with self.shared_cache():
+            self.assertEqual(len(self.found()), 2)
+            booking = Booking.objects.create(
+                user=self.customer, table=self.tables[0], date=SEARCH_DATE, time=time(19), party_size=2,
+                contact_name='Customer', contact_email='customer@example.com', contact_phone='555-0101'
+            )
+            self.assertEqual(self.found(), [self.restaurants[1].id])
+            booking.status = 'cancelled'
+            booking.save()
+            self.assertEqual(len(self.found()), 2)
+            self.assertEqual(search_cache.stats()['hits'], 0)
+
+    def test_hours_invalidate(self):
+        with self.shared_cache():
+            self.restaurants[0].hours.filter(day=SEARCH_DATE.weekday()).delete()
+            self.assertEqual(self.found(), [self.restaurants[1].id])
+            # The closed restaurant was never a candidate of the cached search
+            RestaurantHours.objects.create(
+                restaurant=self.restaurants[0], day=SEARCH_DATE.weekday(), opening_time=time(11), closing_time=time(22)
+            )
+            self.assertEqual(len(self.found()), 2)
+
+    def test_unrelated_change_keeps_entry(self):
+        other = self.create_restaurant(related=0)
+        Table.objects.create(restaurant=other, table_number='1', capacity=4)
+        self.search.update(city='oakland', state='ca')
+        Restaurant.objects.filter(pk__in=[restaurant.pk for restaurant in self.restaurants]).update(city='Oakland')
+        with self.shared_cache():
+            self.assertEqual(len(self.found()), 2)
+            # Leaves the largest table size alone
+            Table.objects.create(restaurant=other, table_number='2', capacity=2)
+            self.found()
+            self.assertEqual(search_cache.stats()['hits'], 1)
+
+
+class ConditionalGetTests(RestaurantFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_restaurants(2, related=1)
+        self.url = f'/api/restaurants/{self.restaurants[0].id}/'
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response['ETag']
+
+    def test_detail(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertNotModified(self.url, etag)
+        # Nested data changes too
+        Table.objects.create(restaurant=self.restaurants[0], table_number='9', capacity=8)
+        etag = self.assertModified(self.url, etag)
+        self.assertNotModified(self.url, etag)
+        # Other restaurants do not
+        Table.objects.create(restaurant=self.restaurants[1], table_number='9', capacity=8)
+        self.assertNotModified(self.url, etag)
+
+    def test_list(self):
+        url = '/api/restaurants/'
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, etag)
+        self.add_restaurants(1, related=0)
+        self.assertModified(url, etag)
+
+    def test_per_user(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_authenticate(self.customer)
+        self.assertModified(self.url, etag)
+
+    def test_not_found(self):
+        response = self.client.get('/api/restaurants/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
@@ -2,9 +2,10 @@ from django.urls import path
 from .views import (
     RestaurantSearchView,
     AvailableTimeSlotsView,
+    AvailabilityCalendarView,
     RestaurantListCreateView,
     RestaurantDetailView,
-    ReviewCreateView,
+    ReviewListCreateView,
     CuisineListView,
     ApproveRestaurantView,
     RestaurantsByManagerView,
@@ -18,9 +19,10 @@ urlpatterns = [
     path('search/', RestaurantSearchView.as_view(), name='restaurant-search'),
     path('flexible-search/', FlexibleRestaurantSearchView.as_view(), name='flexible-restaurant-search'),
     path('available-times/<int:restaurant_id>/', AvailableTimeSlotsView.as_view(), name='available-times'),
+    path('availability-calendar/<int:restaurant_id>/', AvailabilityCalendarView.as_view(), name='availability-calendar'),
     path('', RestaurantListCreateView.as_view(), name='restaurant-list-create'),
     path('<int:pk>/', RestaurantDetailView.as_view(), name='restaurant-detail'),
-    path('<int:restaurant_id>/reviews/', ReviewCreateView.as_view(), name='review-create'),
+    path('<int:restaurant_id>/reviews/', ReviewListCreateView.as_view(), name='review-list-create'),
     path('<int:restaurant_id>/photos/bulk/', BulkPhotoUploadView.as_view(), name='bulk-photo-upload'),
     path('cuisines/', CuisineListView.as_view(), name='cuisine-list'),
     path('approve/<int:pk>/', ApproveRestaurantView.as_view(), name='approve-restaurant'),
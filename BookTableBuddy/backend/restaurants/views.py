@@ -2,13 +2,13 @@ from rest_framework import generics, status, permissions
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, Exists, Max, OuterRef
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 
-from .models import Restaurant, Review, Cuisine, Table, RestaurantPhoto, RestaurantHours
+from .models import Restaurant, Review, Cuisine, Table, RestaurantPhoto
 from .serializers import (
     RestaurantListSerializer,
     RestaurantDetailSerializer,
@@ -17,7 +17,18 @@ from .serializers import (
     AvailableTimeSlotSerializer,
     RestaurantPhotoSerializer
 )
+from .availability import load_slot_matrix, to_minutes, from_minutes, SLOT_MINUTES
+from .inventory import slot_counts
+from .geo import parse_near, filter_within_radius
+from .search import filter_by_text
+from .facets import parse_facets, cached_facet_counts
+from . import search_cache
 from bookings.models import Booking
+from bookings.conflicts import BOOKING_WINDOW_MINUTES
+from booktable.pagination import RestaurantPagination, ReviewPagination, SearchResultPagination
+from booktable.fast_serializers import FastListMixin
+from booktable.conditional import ConditionalGetMixin
+from .fast_serializers import FastRestaurantListSerializer
 
 User = get_user_model()
 
@@ -47,22 +58,94 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
         return obj.manager == request.user
 
-class CuisineListView(generics.ListCreateAPIView):
+class CuisineListView(ConditionalGetMixin, generics.ListCreateAPIView):
     """
     API endpoint to list or create cuisine types
     """
     queryset = Cuisine.objects.all()
     serializer_class = CuisineSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    
+    def get_validators(self):
+        state = Cuisine.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+        return [state['count'], state['updated']], state['updated']
+
+class SearchResultCacheMixin:
+    """
+    Serve repeated searches from the search result cache.
+    
+    Views implement search() and call track_candidates() with the IDs of the
+    restaurants whose availability they check, before reading any bookings.
+    When the results are ordered by relevance or distance rather than by the
+    returned queryset, search() sets `self.ranking` to a dict of restaurant
+    ID -> sort key, smallest first. The view attributes named in
+    cached_context are stored with the result and restored on a hit.
+    
+    The ranked IDs are kept in `result_ids` and paged through with
+    SearchResultPagination, which loads and serializes one page of rows and
+    puts them in result order in Python: ordering in SQL by a CASE with one
+    branch per restaurant gets quadratically slower as results grow.
+    """
+    pagination_class = SearchResultPagination
+    cache_namespace = None
+    cached_context = ()
+    ranking = None
+    
+    def search_result_ids(self):
+        """IDs of the restaurants matching the search, in result order"""
+        self.ranking = None
+        queryset = self.search()
+        restaurant_ids = list(dict.fromkeys(queryset.values_list('id', flat=True)))
+        if self.ranking is not None:
+            ranking = self.ranking
+            restaurant_ids.sort(key=lambda restaurant_id: (ranking[restaurant_id], restaurant_id))
+        return restaurant_ids
+    
+    def get_queryset(self):
+        if not search_cache.is_enabled():
+            restaurant_ids = self.search_result_ids()
+        else:
+            key = search_cache.search_key(self.cache_namespace, self.request.query_params)
+            cached = search_cache.lookup(key)
+            if cached is not None:
+                for name in self.cached_context:
+                    if name in cached:
+                        setattr(self, name, cached[name])
+                restaurant_ids = cached['restaurant_ids']
+            else:
+                self._cache_versions = search_cache.generation()
+                restaurant_ids = self.search_result_ids()
+                search_cache.store(
+                    key,
+                    self._cache_versions,
+                    restaurant_ids,
+                    **{name: getattr(self, name) for name in self.cached_context if hasattr(self, name)}
+                )
+        
+        self.result_ids = restaurant_ids
+        self.result_positions = {restaurant_id: position for position, restaurant_id in enumerate(restaurant_ids)}
+        # Only load what ?fields=/?omit= selected
+        fields = self.get_serializer_class().requested_fields(self.request)
+        return Restaurant.objects.filter(id__in=restaurant_ids).with_list_data(fields)
+    
+    def track_candidates(self, restaurant_ids):
+        if hasattr(self, '_cache_versions'):
+            self._cache_versions.update(search_cache.snapshot(restaurant_ids))
 
-class RestaurantSearchView(generics.ListAPIView):
+class RestaurantSearchView(SearchResultCacheMixin, FastListMixin, generics.ListAPIView):
     """
     API endpoint to search restaurants by date, time, party size and location
+    
+    Responses are pages of {"next": <url or null>, "results": [...]}; see
+    FlexibleRestaurantSearchView for page_size and cursor.
     """
     serializer_class = RestaurantListSerializer
+    fast_serializer_class = FastRestaurantListSerializer
     permission_classes = [permissions.AllowAny]
+    cache_namespace = 'search'
+    cached_context = ('distances',)
     
-    def get_queryset(self):
+    def search(self):
         queryset = Restaurant.objects.filter(approval_status='approved')
         
         # Get query parameters
@@ -84,6 +167,26 @@ class RestaurantSearchView(generics.ListAPIView):
         if cuisine:
             queryset = queryset.filter(cuisine__name__iexact=cuisine)
         
+        # Filter by distance from a point if provided, nearest first
+        near = self.request.query_params.get('near')
+        if near:
+            try:
+                latitude, longitude, radius_km = parse_near(near, self.request.query_params.get('radius_km'))
+            except (ValueError, TypeError) as e:
+                print(f'Error processing search parameters: {e}')
+                return Restaurant.objects.none()
+            queryset, self.distances = filter_within_radius(queryset, latitude, longitude, radius_km)
+            self.ranking = self.distances
+        
+        # Full-text search over name, description, location and cuisine,
+        # ordered by relevance unless ordered by distance. Runs after the
+        # other filters so its best matches are picked among their results
+        text_query = self.request.query_params.get('q')
+        if text_query and text_query.strip():
+            queryset, scores = filter_by_text(queryset, text_query)
+            if self.ranking is None:
+                self.ranking = {restaurant_id: -score for restaurant_id, score in scores.items()}
+        
         # If date, time, and party size are provided, check table availability
         if date_str and time_str and party_size:
             try:
@@ -92,48 +195,36 @@ class RestaurantSearchView(generics.ListAPIView):
                 search_time = datetime.strptime(time_str, '%H:%M').time()
                 party_size = int(party_size)
                 
-                # Get day of week (0=Monday, 6=Sunday)
-                day_of_week = search_date.weekday()
+                # First, keep only restaurants that have a table big enough
+                # for the party and are open at the requested time
+                candidate_ids = list(
+                    queryset.filter(max_table_capacity__gte=party_size).open_at(
+                        search_date, search_time
+                    ).values_list('id', flat=True).distinct()
+                )
+                self.track_candidates(candidate_ids)
                 
-                # First, filter restaurants that are open at the requested time
-                available_restaurants = []
+                # Then keep those with a table that seats the party and has no
+                # confirmed booking within the booking window on that date
+                search_datetime = datetime.combine(search_date, search_time)
+                window = timedelta(minutes=BOOKING_WINDOW_MINUTES)
+                time_from = max(search_datetime - window, datetime.combine(search_date, datetime.min.time())).time()
+                time_to = min(search_datetime + window, datetime.combine(search_date, datetime.max.time())).time()
                 
-                for restaurant in queryset:
-                    # Check if restaurant is open on the requested day/time
-                    try:
-                        hours = restaurant.hours.get(day=day_of_week)
-                        if hours.opening_time <= search_time <= hours.closing_time:
-                            # Restaurant is open, now check table availability
-                            tables = Table.objects.filter(
-                                restaurant=restaurant,
-                                capacity__gte=party_size
-                            )
-                            
-                            # Get all bookings for this restaurant on the requested date
-                            # around the requested time (±30 minutes)
-                            search_datetime = datetime.combine(search_date, search_time)
-                            time_from = (search_datetime - timedelta(minutes=30)).time()
-                            time_to = (search_datetime + timedelta(minutes=30)).time()
-                            
-                            # Get all tables that are already booked
-                            booked_tables = Booking.objects.filter(
-                                table__restaurant=restaurant,
-                                date=search_date,
-                                time__gte=time_from,
-                                time__lte=time_to
-                            ).values_list('table__id', flat=True)
-                            
-                            # Check if any tables are available
-                            available_tables = tables.exclude(id__in=booked_tables)
-                            
-                            if available_tables.exists():
-                                available_restaurants.append(restaurant.id)
-                    except RestaurantHours.DoesNotExist:
-                        # Restaurant is not open on this day
-                        pass
+                clashing_bookings = Booking.objects.filter(
+                    table=OuterRef('pk'),
+                    date=search_date,
+                    status='confirmed',
+                    time__gte=time_from,
+                    time__lte=time_to
+                )
+                free_tables = Table.objects.filter(
+                    restaurant_id__in=candidate_ids,
+                    capacity__gte=party_size
+                ).exclude(Exists(clashing_bookings))
                 
                 # Filter queryset to include only restaurants with available tables
-                queryset = queryset.filter(id__in=available_restaurants)
+                queryset = queryset.filter(id__in=free_tables.values('restaurant_id'))
                 
             except (ValueError, TypeError) as e:
                 # Log the error for debugging
@@ -143,6 +234,15 @@ class RestaurantSearchView(generics.ListAPIView):
                 return Restaurant.objects.none()
         
         return queryset
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        
+        # Add distances from the search point for radius searches
+        if hasattr(self, 'distances'):
+            context['distances'] = self.distances
+        
+        return context
 
 class AvailableTimeSlotsView(APIView):
     """
@@ -173,66 +273,26 @@ class AvailableTimeSlotsView(APIView):
             search_date = datetime.strptime(date_str, '%Y-%m-%d').date()
             party_size = int(party_size)
             
-            # Get day of week (0=Monday, 6=Sunday)
-            day_of_week = search_date.weekday()
+            # Read the precomputed free table counts for the day
+            counts = slot_counts(restaurant.id, search_date, party_size)
             
-            try:
-                # Get restaurant hours for this day
-                hours = restaurant.hours.get(day=day_of_week)
-            except RestaurantHours.DoesNotExist:
+            if counts is None:
                 return Response(
                     {"error": "Restaurant is not open on this day"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Get all tables that can accommodate the party size
-            tables = Table.objects.filter(
-                restaurant=restaurant,
-                capacity__gte=party_size
-            )
-            
-            if not tables.exists():
+            if not counts:
                 return Response(
                     {"error": "No tables available for this party size"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Generate time slots at 30-minute intervals
-            time_slots = []
-            current_time = hours.opening_time
-            closing_time = hours.closing_time
-            
-            # Adjust for time slots that would end after closing
-            last_slot_time = datetime.combine(search_date, closing_time) - timedelta(minutes=90)
-            last_slot_time = last_slot_time.time()
-            
-            while current_time <= last_slot_time:
-                # For each time slot, check availability
-                slot_start = current_time
-                slot_end = (datetime.combine(search_date, slot_start) + timedelta(minutes=90)).time()
-                
-                # Get all bookings for this restaurant in this time slot
-                bookings = Booking.objects.filter(
-                    table__restaurant=restaurant,
-                    date=search_date,
-                    time__gte=slot_start,
-                    time__lt=slot_end
-                )
-                
-                # Get all tables that are already booked
-                booked_table_ids = bookings.values_list('table__id', flat=True)
-                
-                # Check how many tables are available
-                available_tables = tables.exclude(id__in=booked_table_ids).count()
-                
-                if available_tables > 0:
-                    time_slots.append({
-                        'time': current_time,
-                        'available_tables': available_tables
-                    })
-                
-                # Move to next 30-minute slot
-                current_time = (datetime.combine(search_date, current_time) + timedelta(minutes=30)).time()
+            time_slots = [
+                {'time': from_minutes(slot), 'available_tables': free_tables}
+                for slot, free_tables in counts
+                if free_tables > 0
+            ]
             
             serializer = AvailableTimeSlotSerializer(time_slots, many=True)
             return Response(serializer.data)
@@ -243,13 +303,98 @@ class AvailableTimeSlotsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class RestaurantListCreateView(generics.ListCreateAPIView):
+class AvailabilityCalendarView(APIView):
+    """
+    API endpoint to get a restaurant's availability over a range of days
+    
+    Query parameters:
+    - start: First date (YYYY-MM-DD), defaults to today
+    - days: Number of days (1-90), defaults to 30
+    - party_size: Number of people in the party
+    
+    Each day is returned as a bitstring with one character per 30-minute
+    slot starting at first_slot: '1' if a table is free, '0' if not.
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    MAX_DAYS = 90
+    
+    def get(self, request, restaurant_id):
+        try:
+            restaurant = Restaurant.objects.get(id=restaurant_id, approval_status='approved')
+        except Restaurant.DoesNotExist:
+            return Response(
+                {"error": "Restaurant not found or not approved"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        start_str = request.query_params.get('start')
+        days = request.query_params.get('days', 30)
+        party_size = request.query_params.get('party_size')
+        
+        if not party_size:
+            return Response(
+                {"error": "party_size parameter is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            start = datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else timezone.now().date()
+            days = int(days)
+            party_size = int(party_size)
+        except (ValueError, TypeError):
+            return Response(
+                {"error": "Invalid start, days or party size format"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not 1 <= days <= self.MAX_DAYS:
+            return Response(
+                {"error": f"days must be between 1 and {self.MAX_DAYS}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Load hours, tables and the whole range's bookings once
+        dates = [start + timedelta(days=offset) for offset in range(days)]
+        matrix = load_slot_matrix([restaurant.id], dates, party_size, last_seating=BOOKING_WINDOW_MINUTES)
+        
+        calendar = []
+        i = matrix.index.get(restaurant.id)
+        available_slots = matrix.available()
+        for day, date in enumerate(dates):
+            entry = {
+                'date': date.strftime('%Y-%m-%d'),
+                'open': False,
+                'first_slot': None,
+                'availability': '',
+                'available_slots': 0
+            }
+            if i is not None and matrix.valid[i, day].any():
+                valid = matrix.valid[i, day]
+                available = available_slots[i, day][valid]
+                entry.update({
+                    'open': True,
+                    'first_slot': from_minutes(int(matrix.slot_minutes[i, day, 0])).strftime('%H:%M'),
+                    'availability': ''.join('1' if slot else '0' for slot in available),
+                    'available_slots': int(available.sum())
+                })
+            calendar.append(entry)
+        
+        return Response({
+            'restaurant_id': restaurant.id,
+            'party_size': party_size,
+            'slot_minutes': SLOT_MINUTES,
+            'days': calendar
+        })
+
+class RestaurantListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """
     API endpoint to list all restaurants or create a new one
     """
     serializer_class = RestaurantDetailSerializer
+    pagination_class = RestaurantPagination
     
-    def get_queryset(self):
+    def visible_restaurants(self):
         user = self.request.user
         
         # Filter based on user role
@@ -266,6 +411,19 @@ class RestaurantListCreateView(generics.ListCreateAPIView):
             # Regular customers see only approved restaurants
             return Restaurant.objects.filter(approval_status='approved')
     
+    def get_queryset(self):
+        queryset = self.visible_restaurants()
+        
+        # Load the nested data of each page up front, limited to the fields
+        # selected by ?fields=/?omit=
+        if self.request.method == 'GET':
+            queryset = queryset.with_detail_data(self.get_serializer_class().requested_fields(self.request))
+        return queryset
+    
+    def get_validators(self):
+        # Any change to a visible restaurant invalidates every page
+        return self.visible_restaurants().catalog_state()
+    
     def get_permissions(self):
         if self.request.method == 'POST':
             self.permission_classes = [IsRestaurantManager]
@@ -273,20 +431,19 @@ class RestaurantListCreateView(generics.ListCreateAPIView):
             self.permission_classes = [permissions.AllowAny]
         return super().get_permissions()
 
-class RestaurantDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RestaurantDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint to retrieve, update or delete a restaurant
     """
     serializer_class = RestaurantDetailSerializer
     
-    def get_queryset(self):
+    def visible_restaurants(self):
         user = self.request.user
         
         # Filter based on user role
         if not user.is_authenticated:
             return Restaurant.objects.filter(approval_status='approved')
-        
-        if user.role == User.ADMIN:
+        elif user.role == User.ADMIN:
             # Admins can see all restaurants
             return Restaurant.objects.all()
         elif user.role == User.RESTAURANT_MANAGER:
@@ -296,6 +453,22 @@ class RestaurantDetailView(generics.RetrieveUpdateDestroyAPIView):
             # Regular customers see only approved restaurants
             return Restaurant.objects.filter(approval_status='approved')
     
+    def get_queryset(self):
+        queryset = self.visible_restaurants()
+        
+        # Load all nested data up front for reads, limited to the fields
+        # selected by ?fields=/?omit=
+        if self.request.method == 'GET':
+            queryset = queryset.with_detail_data(self.get_serializer_class().requested_fields(self.request))
+        return queryset
+    
+    def get_validators(self):
+        state, last_modified = self.visible_restaurants().filter(pk=self.kwargs['pk']).catalog_state()
+        if not state[1]:
+            # Not found (or not visible): let retrieve() send the 404
+            return None
+        return state, last_modified
+    
     def get_permissions(self):
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
             self.permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
@@ -303,12 +476,44 @@ class RestaurantDetailView(generics.RetrieveUpdateDestroyAPIView):
             self.permission_classes = [permissions.AllowAny]
         return super().get_permissions()
 
-class ReviewCreateView(generics.CreateAPIView):
+class ReviewListCreateView(generics.ListCreateAPIView):
     """
-    API endpoint to create a review for a restaurant
+    API endpoint to page through the reviews of a restaurant or create one
+    
+    Query parameters (GET):
+    - sort: "newest" (default) or "rating" for highest rated first
+    - page_size: Reviews per page (default 10, max 50)
+    - cursor: Opaque position from the "next" link of the previous page
     """
     serializer_class = ReviewSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ReviewPagination
+    
+    def get_queryset(self):
+        # Served from the (restaurant, created_at) and (restaurant, rating)
+        # indexes; only the columns the serializer reads are loaded
+        return Review.objects.filter(
+            restaurant_id=self.kwargs.get('restaurant_id'),
+            restaurant__approval_status='approved'
+        ).select_related('user').only(
+            'id', 'rating', 'comment', 'created_at', 'restaurant', 'user__username'
+        )
+    
+    def get_permissions(self):
+        if self.request.method == 'POST':
+            self.permission_classes = [permissions.IsAuthenticated]
+        else:
+            self.permission_classes = [permissions.AllowAny]
+        return super().get_permissions()
+    
+    def create(self, request, *args, **kwargs):
+        # The detail view only embeds the latest reviews, so clients cannot
+        # always tell that the user already reviewed this restaurant
+        if Review.objects.filter(restaurant_id=self.kwargs.get('restaurant_id'), user=request.user).exists():
+            return Response(
+                {"error": "You have already reviewed this restaurant"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().create(request, *args, **kwargs)
     
     def perform_create(self, serializer):
         restaurant_id = self.kwargs.get('restaurant_id')
@@ -345,27 +550,31 @@ class ApproveRestaurantView(APIView):
             status=status.HTTP_200_OK
         )
 
-class RestaurantsByManagerView(generics.ListAPIView):
+class RestaurantsByManagerView(FastListMixin, generics.ListAPIView):
     """
     API endpoint to list restaurants managed by the current user
     """
     serializer_class = RestaurantListSerializer
+    fast_serializer_class = FastRestaurantListSerializer
     permission_classes = [IsRestaurantManager]
     
     def get_queryset(self):
-        return Restaurant.objects.filter(manager=self.request.user)
+        fields = self.get_serializer_class().requested_fields(self.request)
+        return Restaurant.objects.filter(manager=self.request.user).with_list_data(fields)
 
-class PendingApprovalRestaurantsView(generics.ListAPIView):
+class PendingApprovalRestaurantsView(FastListMixin, generics.ListAPIView):
     """
     API endpoint to list restaurants pending approval (admin only)
     """
     serializer_class = RestaurantListSerializer
+    fast_serializer_class = FastRestaurantListSerializer
     permission_classes = [IsAdminUser]
     
     def get_queryset(self):
-        return Restaurant.objects.filter(approval_status='pending')
+        fields = self.get_serializer_class().requested_fields(self.request)
+        return Restaurant.objects.filter(approval_status='pending').with_list_data(fields)
 
-class FlexibleRestaurantSearchView(generics.ListAPIView):
+class FlexibleRestaurantSearchView(SearchResultCacheMixin, FastListMixin, generics.ListAPIView):
     """
     Enhanced API endpoint to search for available restaurants with time slots.
     
@@ -373,7 +582,8 @@ class FlexibleRestaurantSearchView(generics.ListAPIView):
     1. Match optional location and cuisine filters
     2. Are open at the requested time
     3. Have tables large enough for the party size
-    4. Have at least one table not already booked within ±60 minutes of requested time
+    4. Have at least one table with no confirmed booking within ±90 minutes
+       (BOOKING_WINDOW_MINUTES) of the requested time
     
     For each restaurant, it returns:
     - Basic restaurant information
@@ -386,11 +596,34 @@ class FlexibleRestaurantSearchView(generics.ListAPIView):
     - location: Text to search in city, state, or zip code
     - cuisine: Cuisine type name
     - price_range: Price range (1-4)
+    - q: Free text matched against name, description, city, state and cuisine;
+      results are ordered by relevance
+    - near: Search point as "latitude,longitude"; results are ordered by distance
+    - radius_km: Search radius around the point in km (default 10)
+    - alternatives: If true, restaurants that are full at the requested time
+      are kept and every restaurant gets its nearest available slots before
+      and after the requested time
+    - max_days: How many days after the requested date to look for the next
+      available slot in alternatives mode (default 7, max 14)
+    - sort: "rating" to order the results by average rating, highest first
+    - facets: Comma-separated facets to count over the matching restaurants
+      (cuisine, price, city), added to the response as
+      "facets": {"city": [{"value": ..., "count": ...}]}
+    - page_size: Restaurants per page (default 50, max 200)
+    - cursor: Opaque position from the "next" link of the previous page
+    
+    Responses are pages of {"next": <url or null>, "results": [...]}.
     """
     serializer_class = RestaurantListSerializer
+    fast_serializer_class = FastRestaurantListSerializer
     permission_classes = [permissions.AllowAny]
     
-    def get_queryset(self):
+    cache_namespace = 'flexible-search'
+    cached_context = ('available_time_slots', 'nearest_slots', 'distances')
+    
+    MAX_ALTERNATIVE_DAYS = 14
+    
+    def search(self):
         # Start with only approved restaurants
         queryset = Restaurant.objects.filter(approval_status='approved')
         
@@ -402,6 +635,8 @@ class FlexibleRestaurantSearchView(generics.ListAPIView):
         location = self.request.query_params.get('location')
         cuisine = self.request.query_params.get('cuisine')
         price_range = self.request.query_params.get('price_range')
+        alternatives = self.request.query_params.get('alternatives', '').lower() in ('1', 'true')
+        max_days_str = self.request.query_params.get('max_days', '7')
         
         # Apply basic filters first to narrow down results
         
@@ -422,6 +657,26 @@ class FlexibleRestaurantSearchView(generics.ListAPIView):
         if price_range and price_range.isdigit():
             queryset = queryset.filter(cost_rating=int(price_range))
         
+        # 4. Radius search around a point, nearest first
+        near = self.request.query_params.get('near')
+        if near:
+            try:
+                latitude, longitude, radius_km = parse_near(near, self.request.query_params.get('radius_km'))
+            except (ValueError, TypeError) as e:
+                print(f'Error processing search parameters: {e}')
+                return Restaurant.objects.none()
+            queryset, self.distances = filter_within_radius(queryset, latitude, longitude, radius_km)
+            self.ranking = self.distances
+        
+        # 5. Full-text search over name, description, location and cuisine,
+        # ordered by relevance unless ordered by distance. Runs after the
+        # other filters so its best matches are picked among their results
+        text_query = self.request.query_params.get('q')
+        if text_query and text_query.strip():
+            queryset, scores = filter_by_text(queryset, text_query)
+            if self.ranking is None:
+                self.ranking = {restaurant_id: -score for restaurant_id, score in scores.items()}
+        
         # Store time slot information in request context for serializer
         self.available_time_slots = {}
         
@@ -433,101 +688,57 @@ class FlexibleRestaurantSearchView(generics.ListAPIView):
                 requested_time = datetime.strptime(time_str, '%H:%M').time()
                 party_size = int(party_size_str)
                 
-                # Get day of week (0=Monday, 6=Sunday)
-                day_of_week = search_date.weekday()
+                # Compute slot availability for every candidate restaurant at
+                # once: one query each for hours, tables and bookings. In
+                # alternatives mode the following days are loaded as well.
+                # The day before is included because its service may run
+                # past midnight into the requested time.
+                queryset = queryset.filter(max_table_capacity__gte=party_size)
+                dates = [search_date - timedelta(days=1), search_date]
+                if alternatives:
+                    max_days = min(max(int(max_days_str), 0), self.MAX_ALTERNATIVE_DAYS)
+                    dates += [search_date + timedelta(days=offset) for offset in range(1, max_days + 1)]
+                    self.nearest_slots = {}
+                else:
+                    # Prune restaurants closed at the requested time in the
+                    # database before any availability work
+                    queryset = queryset.open_at(search_date, requested_time)
+                candidate_ids = list(queryset.values_list('id', flat=True).distinct())
+                self.track_candidates(candidate_ids)
+                matrix = load_slot_matrix(candidate_ids, dates, party_size)
                 
-                # Restaurants that have available tables
-                available_restaurant_ids = []
+                # Restaurant is viable only if the specifically requested time slot is available
+                requested_minutes = to_minutes(requested_time)
+                requested_available = matrix.available_on_date_at(requested_minutes, day=1)
+                if alternatives:
+                    before, after = matrix.nearest_available(requested_minutes, day=1)
                 
-                # Process each restaurant to check availability and generate time slots
-                for restaurant in queryset:
-                    # First check if restaurant is open on the requested day
-                    try:
-                        hours = restaurant.hours.get(day=day_of_week)
-                        
-                        # Skip if restaurant is closed that day
-                        if not hours or hours.opening_time >= hours.closing_time:
-                            continue
-                            
-                        # Get tables big enough for the party
-                        suitable_tables = Table.objects.filter(
-                            restaurant=restaurant,
-                            capacity__gte=party_size
-                        )
-                        
-                        # Skip if no tables are big enough
-                        if not suitable_tables.exists():
+                # Slot lists are only built when the response includes them
+                selected = self.get_serializer_class().requested_fields(self.request)
+                include_slots = selected is None or 'available_time_slots' in selected
+                
+                available_restaurant_ids = []
+                for i, restaurant_id in enumerate(matrix.restaurant_ids):
+                    if alternatives:
+                        nearest = {
+                            'before': self._describe_slot(matrix, i, before[i]),
+                            'after': self._describe_slot(matrix, i, after[i])
+                        }
+                        if not (requested_available[i] or nearest['before'] or nearest['after']):
                             continue
-                            
-                        # Calculate time slots at 30-minute intervals within opening hours
-                        opening_datetime = datetime.combine(search_date, hours.opening_time)
-                        closing_datetime = datetime.combine(search_date, hours.closing_time)
-                        
-                        # Generate 30-minute time slots during opening hours
-                        time_slots = []
-                        current_slot = opening_datetime
-                        
-                        while current_slot + timedelta(minutes=30) <= closing_datetime:
-                            time_slots.append(current_slot.time())
-                            current_slot += timedelta(minutes=30)
-                            
-                        # Get all bookings for this restaurant on the specified date
-                        day_bookings = Booking.objects.filter(
-                            table__restaurant=restaurant,
-                            date=search_date
-                        )
-                        
-                        # For each time slot, check if there are available tables
-                        available_slots = []
-                        requested_slot_available = False  # Flag for specifically requested time
-                        
-                        for slot_time in time_slots:
-                            # Define booking window for this slot (±60 min)
-                            slot_datetime = datetime.combine(search_date, slot_time)
-                            window_start = (slot_datetime - timedelta(minutes=60)).time()
-                            window_end = (slot_datetime + timedelta(minutes=60)).time()
-                            
-                            # Find bookings that overlap with this slot's window
-                            if window_start <= window_end:  # Normal case (no day boundary crossing)
-                                overlapping_bookings = day_bookings.filter(
-                                    time__gte=window_start,
-                                    time__lte=window_end
-                                )
-                            else:  # Window crosses midnight
-                                overlapping_bookings = day_bookings.filter(
-                                    Q(time__gte=window_start) | Q(time__lte=window_end)
-                                )
-                            
-                            # Get IDs of tables that are already booked in this window
-                            booked_table_ids = overlapping_bookings.values_list('table__id', flat=True)
-                            
-                            # Get tables that are free during this slot
-                            free_tables = suitable_tables.exclude(id__in=booked_table_ids)
-                            free_table_count = free_tables.count()
-                            
-                            # If we have available tables for this slot
-                            if free_table_count > 0:
-                                # Format time as string (HH:MM)
-                                slot_str = slot_time.strftime('%H:%M')
-                                available_slots.append({
-                                    'time': slot_str,
-                                    'available_tables': free_table_count
-                                })
-                                
-                                # Check if this slot contains the specifically requested time
-                                slot_end = (slot_datetime + timedelta(minutes=30)).time()
-                                if slot_time <= requested_time < slot_end:
-                                    requested_slot_available = True
-                        
-                        # Restaurant is viable if it has any available slots
-                        # AND the specifically requested time slot is available
-                        if available_slots and requested_slot_available:
-                            available_restaurant_ids.append(restaurant.id)
-                            self.available_time_slots[restaurant.id] = available_slots
-                            
-                    except RestaurantHours.DoesNotExist:
-                        # Restaurant doesn't have hours for this day - skip it
+                        self.nearest_slots[restaurant_id] = nearest
+                    elif not requested_available[i]:
                         continue
+                    available_restaurant_ids.append(restaurant_id)
+                    if not include_slots:
+                        continue
+                    self.available_time_slots[restaurant_id] = [
+                        {
+                            'time': from_minutes(minutes).strftime('%H:%M'),
+                            'available_tables': free_tables
+                        }
+                        for minutes, free_tables in matrix.slots_for(restaurant_id, day=1)
+                    ]
                 
                 # Filter to only show restaurants with available slots
                 queryset = queryset.filter(id__in=available_restaurant_ids)
@@ -536,18 +747,59 @@ class FlexibleRestaurantSearchView(generics.ListAPIView):
                 # Log error and return empty queryset
                 print(f'Error processing search parameters: {e}')
                 return Restaurant.objects.none()
+        
+        # 6. Highest rated first, read from the indexed rating_average column
+        if self.request.query_params.get('sort') == 'rating':
+            queryset = queryset.order_by('-rating_average', 'id')
+            self.ranking = None
                 
         # Return the final queryset
         return queryset.distinct()
     
+    def list(self, request, *args, **kwargs):
+        facets_param = request.query_params.get('facets')
+        if not facets_param:
+            return super().list(request, *args, **kwargs)
+        
+        try:
+            facet_names = parse_facets(facets_param)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        results = self.list_data(queryset)
+        return Response({
+            'next': self.paginator.get_next_link(),
+            'results': results,
+            'facets': cached_facet_counts(queryset, facet_names, request.query_params)
+        })
+    
     def get_serializer_context(self):
         context = super().get_serializer_context()
         
         # Add available time slots to context so serializer can access them
         if hasattr(self, 'available_time_slots'):
             context['available_time_slots'] = self.available_time_slots
+        
+        if hasattr(self, 'nearest_slots'):
+            context['nearest_slots'] = self.nearest_slots
+        
+        if hasattr(self, 'distances'):
+            context['distances'] = self.distances
             
         return context
+    
+    @staticmethod
+    def _describe_slot(matrix, i, position):
+        """Format a (day, slot) position of the slot matrix for the response"""
+        if position is None:
+            return None
+        day, slot = position
+        return {
+            'date': matrix.dates[day].strftime('%Y-%m-%d'),
+            'time': from_minutes(int(matrix.slot_minutes[i, day, slot])).strftime('%H:%M'),
+            'available_tables': int(matrix.counts[i, day, slot])
+        }
 
 
 class BulkPhotoUploadView(APIView):
@@ -0,0 +1,11 @@
+"""
+values()-based equivalent of UserProfileSerializer (see booktable.fast_serializers)
+"""
+from booktable.fast_serializers import FastListSerializer
+from .serializers import UserProfileSerializer
+
+
+class FastUserProfileSerializer(FastListSerializer):
+    """Same output as UserProfileSerializer"""
+    serializer_class = UserProfileSerializer
+    fields = tuple(UserProfileSerializer.Meta.fields)
@@ -0,0 +1,49 @@
+"""
+The user export streams every user as NDJSON or CSV, admins only.
+"""
+import csv
+import json
+from io import StringIO
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import User
+
+
+class UserExportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'pw', role=User.ADMIN)
+        self.customer = User.objects.create_user(
+            'customer', 'customer@example.com', 'pw', role=User.CUSTOMER,
+            first_name='@SUM(A1:A9)', phone_number='+15550101'
+        )
+        self.url = '/api/users/export/'
+
+    def download(self, **params):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        rows = [json.loads(line) for line in self.download().splitlines()]
+        self.assertEqual([row['username'] for row in rows], ['admin', 'customer'])
+        self.assertEqual(rows[1]['first_name'], '@SUM(A1:A9)')
+
+    def test_csv(self):
+        rows = list(csv.DictReader(StringIO(self.download(format='csv'))))
+        self.assertEqual([row['username'] for row in rows], ['admin', 'customer'])
+        self.assertEqual(rows[1]['first_name'], "'@SUM(A1:A9)")
+        self.assertEqual(rows[1]['phone_number'], "'+15550101")
+        self.assertEqual(rows[0]['phone_number'], '')
+
+    def test_unknown_format(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+
+    def test_admins_only(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
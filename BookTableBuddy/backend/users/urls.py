@@ -5,6 +5,7 @@ from .views import (
     RegisterView,
     UserProfileView,
     UsersListView,
+    UsersExportView,
     ChangeRoleView
 )
 
@@ -14,5 +15,6 @@ urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('profile/', UserProfileView.as_view(), name='user_profile'),
     path('list/', UsersListView.as_view(), name='users_list'),
+    path('export/', UsersExportView.as_view(), name='users_export'),
     path('change-role/<int:pk>/', ChangeRoleView.as_view(), name='change_role'),
 ]
@@ -3,11 +3,14 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
+from booktable.pagination import UserPagination
+from booktable.exports import StreamingExportMixin
 from .serializers import (
     CustomTokenObtainPairSerializer,
     UserSerializer, 
     UserProfileSerializer
 )
+from .fast_serializers import FastUserProfileSerializer
 
 User = get_user_model()
 
@@ -49,6 +52,16 @@ class UsersListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserProfileSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = UserPagination
+
+class UsersExportView(StreamingExportMixin, UsersListView):
+    """
+    API endpoint to download all users as a stream (admin only), as
+    ?format=ndjson (the default) or ?format=csv
+    """
+    queryset = User.objects.order_by('id')
+    export_serializer_class = FastUserProfileSerializer
+    export_filename = 'users'
 
 class ChangeRoleView(APIView):
     """
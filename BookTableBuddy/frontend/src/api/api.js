@@ -99,12 +99,14 @@ export const api = {
 
   // Restaurant endpoints
   restaurants: {
-    getList(params) {
-      return axios.get('/api/restaurants/search/', { params });
+    // Searches return one page of results ({ next, results }); pass the `next`
+    // URL to get the following page
+    getList(params, nextUrl = null) {
+      return nextUrl ? axios.get(nextUrl) : axios.get('/api/restaurants/search/', { params });
     },
     
-    flexibleSearch(params) {
-      return axios.get('/api/restaurants/flexible-search/', { params });
+    flexibleSearch(params, nextUrl = null) {
+      return nextUrl ? axios.get(nextUrl) : axios.get('/api/restaurants/flexible-search/', { params });
     },
     getById: (id) => {
       console.log('Debug: API getById called, ID:', id);
@@ -238,7 +240,9 @@ export const api = {
       setAuthHeader().put(`/api/restaurants/${restaurantId}/hours/`, hoursData),
 
     // Restaurant reviews
-    getReviews: (restaurantId) => axios.get(`/api/restaurants/${restaurantId}/reviews/`),
+    // One page of reviews ({ next, results }); pass the `next` URL to get the following page
+    getReviews: (restaurantId, sort = 'newest', nextUrl = null) =>
+      nextUrl ? axios.get(nextUrl) : axios.get(`/api/restaurants/${restaurantId}/reviews/`, { params: { sort } }),
     addReview: (restaurantId, reviewData) =>
       setAuthHeader().post(`/api/restaurants/${restaurantId}/reviews/`, reviewData),
 
@@ -250,17 +254,20 @@ export const api = {
   // Booking endpoints
   bookings: {
     create: (bookingData) => setAuthHeader().post('/api/bookings/create/', bookingData),
-    getUserBookings: () => setAuthHeader().get('/api/bookings/my-bookings/'),
+    // Booking lists are paginated as { next, results }; pass `next` to load the following page
+    getUserBookings: (nextUrl = null) =>
+      setAuthHeader().get(nextUrl || '/api/bookings/my-bookings/'),
     getById: (id) => setAuthHeader().get(`/api/bookings/${id}/`),
     update: (id, data) => setAuthHeader().put(`/api/bookings/${id}/`, data),
     cancelBooking: (id) => setAuthHeader().patch(`/api/bookings/cancel/${id}/`),
     completeBooking: (id) => setAuthHeader().patch(`/api/bookings/complete/${id}/`),
     noShowBooking: (id) => setAuthHeader().patch(`/api/bookings/no-show/${id}/`),
-    getRestaurantBookings: (restaurantId) =>
-      setAuthHeader().get(`/api/bookings/restaurant/${restaurantId}/`),
-    getTodayBookings: (restaurantId) => 
-      setAuthHeader().get(`/api/bookings/today/${restaurantId ? `?restaurant_id=${restaurantId}` : ''}`),
-    getDateRangeBookings: (startDate, endDate, restaurantId) => {
+    getRestaurantBookings: (restaurantId, nextUrl = null) =>
+      setAuthHeader().get(nextUrl || `/api/bookings/restaurant/${restaurantId}/`),
+    getTodayBookings: (restaurantId, nextUrl = null) => 
+      setAuthHeader().get(nextUrl || `/api/bookings/today/${restaurantId ? `?restaurant_id=${restaurantId}` : ''}`),
+    getDateRangeBookings: (startDate, endDate, restaurantId, nextUrl = null) => {
+      if (nextUrl) return setAuthHeader().get(nextUrl);
       let url = '/api/bookings/date-range/?';
       if (startDate) url += `start_date=${startDate}&`;
       if (endDate) url += `end_date=${endDate}&`;
@@ -292,7 +299,8 @@ export const api = {
       });
     },
     rejectRestaurant: (id) => setAuthHeader().delete(`/api/restaurants/${id}/`),
-    getUsers: () => setAuthHeader().get('/api/users/list/'),
+    // Paginated as { next, results }; pass `next` to load the following page
+    getUsers: (nextUrl = null) => setAuthHeader().get(nextUrl || '/api/users/list/'),
     updateUserRole: (id, role) => setAuthHeader().patch(`/api/users/change-role/${id}/`, { role }),
   },
 
@@ -214,7 +214,7 @@ const RestaurantDetail = () => {
               </span>
               {renderStars(Math.round(restaurant.average_rating))}
               <span className="ml-2 text-gray-500">
-                ({restaurant.reviews.length} reviews)
+                ({restaurant.review_count} reviews)
               </span>
               
               <span className="mx-2 text-gray-400">•</span>
@@ -449,7 +449,7 @@ const RestaurantDetail = () => {
           {/* Reviews */}
           <div>
             <h2 className="text-xl font-semibold mb-4">
-              Reviews ({restaurant.reviews.length})
+              Reviews ({restaurant.review_count})
             </h2>
             
             {reviewSuccess && (
@@ -11,14 +11,18 @@ const RestaurantManagement = () => {
     searchTerm: ''
   });
   const [filteredRestaurants, setFilteredRestaurants] = useState([]);
+  // Restaurants come in pages; the `next` URL loads the following one
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   
-  // Fetch all restaurants
+  // Fetch the first page of restaurants
   useEffect(() => {
     const fetchRestaurants = async () => {
       try {
         setLoading(true);
         const response = await api.restaurants.getList();
-        setRestaurants(response.data);
+        setRestaurants(response.data.results);
+        setNextPage(response.data.next);
       } catch (err) {
         console.error('Error fetching restaurants:', err);
         setError('Failed to load restaurants. Please try again later.');
@@ -30,6 +34,21 @@ const RestaurantManagement = () => {
     fetchRestaurants();
   }, []);
   
+  // Load the next page of restaurants
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await api.restaurants.getList(null, nextPage);
+      setRestaurants(prev => [...prev, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      console.error('Error fetching restaurants:', err);
+      setError('Failed to load restaurants. Please try again later.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   // Apply filters to restaurants
   useEffect(() => {
     if (!restaurants.length) return;
@@ -277,6 +296,19 @@ const RestaurantManagement = () => {
             </div>
           )}
         </div>
+        
+        {nextPage && (
+          <div className="px-6 py-4 border-t border-gray-200 flex justify-center">
+            <button
+              type="button"
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="btn-secondary py-2 px-4 text-sm"
+            >
+              {loadingMore ? 'Loading...' : 'Load more restaurants'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -17,14 +17,18 @@ const UserManagement = () => {
     success: null,
     error: null
   });
+  // Users come in pages; the `next` URL loads the following one
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   
-  // Fetch all users
+  // Fetch the first page of users
   useEffect(() => {
     const fetchUsers = async () => {
       try {
         setLoading(true);
         const response = await api.admin.getUsers();
-        setUsers(response.data);
+        setUsers(response.data.results);
+        setNextPage(response.data.next);
       } catch (err) {
         console.error('Error fetching users:', err);
         setError('Failed to load users. Please try again later.');
@@ -36,6 +40,21 @@ const UserManagement = () => {
     fetchUsers();
   }, []);
   
+  // Load the next page of users
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await api.admin.getUsers(nextPage);
+      setUsers(prev => [...prev, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      console.error('Error fetching users:', err);
+      setError('Failed to load users. Please try again later.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   // Apply filters to users
   useEffect(() => {
     if (!users.length) return;
@@ -355,6 +374,19 @@ const UserManagement = () => {
             </div>
           )}
         </div>
+        
+        {nextPage && (
+          <div className="px-6 py-4 border-t border-gray-200 flex justify-center">
+            <button
+              type="button"
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="btn-secondary py-2 px-4 text-sm"
+            >
+              {loadingMore ? 'Loading...' : 'Load more users'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -7,14 +7,18 @@ const MyBookings = () => {
   const [bookings, setBookings] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  // Bookings come in pages, newest first; the `next` URL loads the following one
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   
-  // Fetch user bookings on component mount
+  // Fetch the first page of user bookings on component mount
   useEffect(() => {
     const fetchUserBookings = async () => {
       try {
         setLoading(true);
         const response = await api.bookings.getUserBookings();
-        setBookings(response.data);
+        setBookings(response.data.results);
+        setNextPage(response.data.next);
       } catch (err) {
         console.error('Error fetching bookings:', err);
         setError('Failed to load your bookings. Please try again later.');
@@ -26,6 +30,21 @@ const MyBookings = () => {
     fetchUserBookings();
   }, []);
   
+  // Load the next page of bookings
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await api.bookings.getUserBookings(nextPage);
+      setBookings(prev => [...prev, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      console.error('Error fetching bookings:', err);
+      setError('Failed to load your bookings. Please try again later.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   // Group bookings by status
   const upcomingBookings = bookings.filter(booking => booking.status === 'confirmed');
   const pastBookings = bookings.filter(booking => ['completed', 'cancelled', 'no_show'].includes(booking.status));
@@ -247,6 +266,19 @@ const MyBookings = () => {
               </div>
             </div>
           )}
+          
+          {nextPage && (
+            <div className="flex justify-center">
+              <button
+                type="button"
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+                className="btn-secondary py-2 px-4 text-sm"
+              >
+                {loadingMore ? 'Loading...' : 'Load more bookings'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
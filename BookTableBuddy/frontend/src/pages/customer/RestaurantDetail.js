@@ -21,6 +21,11 @@ const RestaurantDetail = () => {
   const [partySize, setPartySize] = useState(
     parseInt(new URLSearchParams(location.search).get('party_size')) || 2
   );
+  // The detail payload only carries the latest reviews; older ones are paged in
+  const [reviews, setReviews] = useState([]);
+  const [reviewsNext, setReviewsNext] = useState(null);
+  const [reviewsPaged, setReviewsPaged] = useState(false);
+  const [loadingReviews, setLoadingReviews] = useState(false);
   
   // Fetch restaurant details
   useEffect(() => {
@@ -29,6 +34,9 @@ const RestaurantDetail = () => {
         setLoading(true);
         const response = await api.restaurants.getById(id);
         setRestaurant(response.data);
+        setReviews(response.data.reviews || []);
+        setReviewsNext(null);
+        setReviewsPaged(false);
       } catch (err) {
         console.error('Error fetching restaurant details:', err);
         setError('Failed to load restaurant details. Please try again.');
@@ -57,6 +65,24 @@ const RestaurantDetail = () => {
     }
   }, [id, selectedDate, partySize, restaurant]);
   
+  // Load the next page of reviews
+  const handleLoadMoreReviews = async () => {
+    try {
+      setLoadingReviews(true);
+      const response = await api.restaurants.getReviews(id, 'newest', reviewsNext);
+      // The first page repeats the reviews embedded in the detail payload
+      setReviews(reviewsPaged ? [...reviews, ...response.data.results] : response.data.results);
+      setReviewsNext(response.data.next);
+      setReviewsPaged(true);
+    } catch (err) {
+      console.error('Error fetching reviews:', err);
+    } finally {
+      setLoadingReviews(false);
+    }
+  };
+  
+  const hasMoreReviews = reviewsPaged ? Boolean(reviewsNext) : reviews.length < (restaurant?.review_count || 0);
+  
   // Handle booking time selection
   const handleSelectTime = (time) => {
     if (!isAuthenticated) {
@@ -238,16 +264,16 @@ const RestaurantDetail = () => {
                 </div>
                 <span className="text-gray-600">
                   {restaurant.average_rating ? restaurant.average_rating.toFixed(1) : 'No ratings yet'}
-                  {restaurant.reviews && restaurant.reviews.length > 0 && 
-                    ` (${restaurant.reviews.length} ${restaurant.reviews.length === 1 ? 'review' : 'reviews'})`
+                  {restaurant.review_count > 0 && 
+                    ` (${restaurant.review_count} ${restaurant.review_count === 1 ? 'review' : 'reviews'})`
                   }
                 </span>
               </div>
             </div>
             
-            {restaurant.reviews && restaurant.reviews.length > 0 ? (
+            {reviews.length > 0 ? (
               <div className="space-y-4">
-                {restaurant.reviews.map(review => (
+                {reviews.map(review => (
                   <div key={review.id} className="border-b border-gray-200 pb-4">
                     <div className="flex justify-between items-center mb-2">
                       <div className="font-medium">{review.user_name}</div>
@@ -262,6 +288,16 @@ const RestaurantDetail = () => {
                     <p className="text-gray-700">{review.comment}</p>
                   </div>
                 ))}
+                {hasMoreReviews && (
+                  <button
+                    type="button"
+                    onClick={handleLoadMoreReviews}
+                    disabled={loadingReviews}
+                    className="btn-secondary py-2 px-4 text-sm"
+                  >
+                    {loadingReviews ? 'Loading...' : 'Show more reviews'}
+                  </button>
+                )}
               </div>
             ) : (
               <p className="text-gray-500">No reviews yet.</p>
@@ -16,6 +16,9 @@ const RestaurantSearch = () => {
   });
   
   const [restaurants, setRestaurants] = useState([]);
+  // Results come in pages; the `next` URL loads the following one
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [restaurantTimeSlots, setRestaurantTimeSlots] = useState({});
   const [cuisines, setCuisines] = useState([]);
   const [loading, setLoading] = useState(false);
@@ -45,12 +48,49 @@ const RestaurantSearch = () => {
     }));
   };
   
+  // Fetch available time slots for each restaurant of a page in parallel
+  const fetchTimeSlots = async (page) => {
+    const newLoadingStates = {};
+    page.forEach(restaurant => {
+      newLoadingStates[restaurant.id] = true;
+    });
+    setLoadingTimeSlots(prev => ({ ...prev, ...newLoadingStates }));
+    
+    try {
+      await Promise.all(page.map(async (restaurant) => {
+        try {
+          console.log(`Fetching time slots for restaurant ${restaurant.id}`);
+          const timeSlotsResponse = await api.restaurants.getAvailability(
+            restaurant.id, 
+            searchParams.date, 
+            searchParams.party_size
+          );
+          
+          setRestaurantTimeSlots(prev => ({
+            ...prev,
+            [restaurant.id]: timeSlotsResponse.data
+          }));
+        } catch (err) {
+          console.error(`Error fetching time slots for restaurant ${restaurant.id}:`, err);
+        } finally {
+          setLoadingTimeSlots(prev => ({
+            ...prev,
+            [restaurant.id]: false
+          }));
+        }
+      }));
+    } catch (timeSlotError) {
+      console.error('Error fetching time slots:', timeSlotError);
+    }
+  };
+  
   // Handle search form submission
   const handleSearch = async (e) => {
     e.preventDefault();
     setLoading(true);
     setError(null);
     setRestaurants([]); // Clear previous results
+    setNextPage(null);
     setRestaurantTimeSlots({}); // Clear previous time slots
     
     // Create a new object with transformed parameters for flexible search API
@@ -68,22 +108,17 @@ const RestaurantSearch = () => {
       // Use the flexible search endpoint instead of the old one
       const response = await api.restaurants.flexibleSearch(searchQueryParams);
       console.log('Search results:', response.data);
-      setRestaurants(response.data);
+      const page = response.data.results;
+      setRestaurants(page);
+      setNextPage(response.data.next);
       
       // If no restaurants found, set loading to false and exit early
-      if (response.data.length === 0) {
+      if (page.length === 0) {
         console.log('No restaurants found');
         setLoading(false);
         return;
       }
       
-      // Now fetch available time slots for each restaurant
-      const newLoadingStates = {};
-      response.data.forEach(restaurant => {
-        newLoadingStates[restaurant.id] = true;
-      });
-      setLoadingTimeSlots(newLoadingStates);
-      
       // Set a safety timeout to ensure loading state is reset even if something goes wrong
       const safetyTimeout = setTimeout(() => {
         if (loading) {
@@ -92,33 +127,8 @@ const RestaurantSearch = () => {
         }
       }, 10000); // 10 seconds safety timeout
       
-      try {
-        // Fetch time slots for each restaurant in parallel
-        await Promise.all(response.data.map(async (restaurant) => {
-          try {
-            console.log(`Fetching time slots for restaurant ${restaurant.id}`);
-            const timeSlotsResponse = await api.restaurants.getAvailability(
-              restaurant.id, 
-              searchParams.date, 
-              searchParams.party_size
-            );
-            
-            setRestaurantTimeSlots(prev => ({
-              ...prev,
-              [restaurant.id]: timeSlotsResponse.data
-            }));
-          } catch (err) {
-            console.error(`Error fetching time slots for restaurant ${restaurant.id}:`, err);
-          } finally {
-            setLoadingTimeSlots(prev => ({
-              ...prev,
-              [restaurant.id]: false
-            }));
-          }
-        }));
-      } catch (timeSlotError) {
-        console.error('Error fetching time slots:', timeSlotError);
-      }
+      // Now fetch available time slots for each restaurant
+      await fetchTimeSlots(page);
       
       // Clear the safety timeout since we've completed normally
       clearTimeout(safetyTimeout);
@@ -132,6 +142,23 @@ const RestaurantSearch = () => {
     }
   };
   
+  // Load the next page of results
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await api.restaurants.flexibleSearch(null, nextPage);
+      const page = response.data.results;
+      setRestaurants(prev => [...prev, ...page]);
+      setNextPage(response.data.next);
+      await fetchTimeSlots(page);
+    } catch (err) {
+      console.error('Error loading more restaurants:', err);
+      setError('Failed to fetch restaurants. Please try again.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   // Safety effect to ensure loading state is eventually reset
   useEffect(() => {
     let safetyTimer;
@@ -323,7 +350,7 @@ const RestaurantSearch = () => {
       <div className="space-y-8">
         <h2 className="text-2xl font-display font-semibold text-gray-900">
           {restaurants.length > 0 
-            ? `Available Restaurants (${restaurants.length})` 
+            ? `Available Restaurants (${restaurants.length}${nextPage ? '+' : ''})` 
             : 'Search for available restaurants'}
         </h2>
         
@@ -400,6 +427,18 @@ const RestaurantSearch = () => {
                 </div>
               );
             })}
+            {nextPage && (
+              <div className="md:col-span-2 lg:col-span-3 flex justify-center">
+                <button
+                  type="button"
+                  onClick={handleLoadMore}
+                  disabled={loadingMore}
+                  className="btn-secondary py-2 px-4 text-sm"
+                >
+                  {loadingMore ? 'Loading...' : 'Show more restaurants'}
+                </button>
+              </div>
+            )}
           </div>
         ) : (
           !loading && (
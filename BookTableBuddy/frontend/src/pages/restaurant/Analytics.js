@@ -22,8 +22,8 @@ const Analytics = () => {
         // Get user's restaurants
         const restaurantsResponse = await api.restaurants.getList({ manager: user.id });
         
-        if (restaurantsResponse.data.length > 0) {
-          const userRestaurants = restaurantsResponse.data;
+        if (restaurantsResponse.data.results.length > 0) {
+          const userRestaurants = restaurantsResponse.data.results;
           setRestaurants(userRestaurants);
           
           // Get primary restaurant for manager
@@ -12,6 +12,9 @@ const Bookings = () => {
   const [filteredBookings, setFilteredBookings] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  // Bookings come in pages, newest first; the `next` URL loads the following one
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   
   // Filter state
   const [filters, setFilters] = useState({
@@ -29,18 +32,19 @@ const Bookings = () => {
         // Get user's restaurants
         const restaurantsResponse = await api.restaurants.getList({ manager: user.id });
         
-        if (restaurantsResponse.data.length > 0) {
-          const userRestaurants = restaurantsResponse.data;
+        if (restaurantsResponse.data.results.length > 0) {
+          const userRestaurants = restaurantsResponse.data.results;
           setRestaurants(userRestaurants);
           
           // Get primary restaurant for manager
           const primaryRestaurant = userRestaurants[0];
           setSelectedRestaurant(primaryRestaurant);
           
-          // Get restaurant bookings
+          // Get the first page of restaurant bookings
           const bookingsResponse = await api.bookings.getRestaurantBookings(primaryRestaurant.id);
-          setBookings(bookingsResponse.data);
-          setFilteredBookings(bookingsResponse.data);
+          setBookings(bookingsResponse.data.results);
+          setFilteredBookings(bookingsResponse.data.results);
+          setNextPage(bookingsResponse.data.next);
         } else {
           setError('You need to create a restaurant before managing bookings.');
         }
@@ -55,6 +59,21 @@ const Bookings = () => {
     fetchRestaurantData();
   }, [user]);
   
+  // Load the next page of bookings
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await api.bookings.getRestaurantBookings(selectedRestaurant.id, nextPage);
+      setBookings(prev => [...prev, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      console.error('Error fetching bookings:', err);
+      setError('Failed to load bookings. Please try again later.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   // Apply filters to bookings
   useEffect(() => {
     if (!bookings.length) return;
@@ -365,6 +384,19 @@ const Bookings = () => {
             </div>
           )}
         </div>
+        
+        {nextPage && (
+          <div className="px-6 py-4 border-t border-gray-200 flex justify-center">
+            <button
+              type="button"
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="btn-secondary py-2 px-4 text-sm"
+            >
+              {loadingMore ? 'Loading...' : 'Load more bookings'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
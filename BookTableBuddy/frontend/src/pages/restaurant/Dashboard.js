@@ -9,6 +9,9 @@ const Dashboard = () => {
   const [restaurants, setRestaurants] = useState([]);
   const [selectedRestaurantId, setSelectedRestaurantId] = useState(null);
   const [todayBookings, setTodayBookings] = useState([]);
+  // Today's bookings come in pages; the `next` URL loads the following one
+  const [todayNextPage, setTodayNextPage] = useState(null);
+  const [loadingMoreToday, setLoadingMoreToday] = useState(false);
   const [stats, setStats] = useState({
     totalBookings: 0,
     pendingBookings: 0,
@@ -72,6 +75,7 @@ const Dashboard = () => {
         if (!isApproved) {
           console.log('Restaurant not approved:', selectedRestaurant);
           setTodayBookings([]);
+          setTodayNextPage(null);
           setStats({
             totalBookings: 0,
             pendingBookings: 0,
@@ -91,7 +95,8 @@ const Dashboard = () => {
         
         // Fetch today's bookings - only for approved restaurants
         const bookingsResponse = await api.bookings.getTodayBookings(selectedRestaurantId);
-        setTodayBookings(bookingsResponse.data || []);
+        setTodayBookings(bookingsResponse.data.results || []);
+        setTodayNextPage(bookingsResponse.data.next);
         
         // Fetch analytics data
         try {
@@ -248,7 +253,8 @@ const Dashboard = () => {
       // Re-fetch today's bookings to ensure they're current
       try {
         const bookingsResponse = await api.bookings.getTodayBookings(selectedRestaurantId);
-        setTodayBookings(bookingsResponse.data || []);
+        setTodayBookings(bookingsResponse.data.results || []);
+        setTodayNextPage(bookingsResponse.data.next);
       } catch (bookingErr) {
         console.error('Error refreshing today\'s bookings:', bookingErr);
       }
@@ -258,6 +264,21 @@ const Dashboard = () => {
     }
   };
   
+  // Load the next page of today's bookings
+  const handleLoadMoreToday = async () => {
+    try {
+      setLoadingMoreToday(true);
+      const response = await api.bookings.getTodayBookings(selectedRestaurantId, todayNextPage);
+      setTodayBookings(prev => [...prev, ...response.data.results]);
+      setTodayNextPage(response.data.next);
+    } catch (err) {
+      console.error('Error fetching today\'s bookings:', err);
+      alert('Failed to load more bookings. Please try again.');
+    } finally {
+      setLoadingMoreToday(false);
+    }
+  };
+  
   if (loading) {
     return (
       <div className="container mx-auto px-4 py-8 flex justify-center">
@@ -323,7 +344,8 @@ const Dashboard = () => {
       
       // Also fetch today's bookings for the selected restaurant
       const bookingsResponse = await api.bookings.getTodayBookings(newRestaurantId);
-      setTodayBookings(bookingsResponse.data || []);
+      setTodayBookings(bookingsResponse.data.results || []);
+      setTodayNextPage(bookingsResponse.data.next);
     } catch (error) {
       console.error('Error fetching data for selected restaurant:', error);
       // Set default values if data fetch fails
@@ -339,6 +361,7 @@ const Dashboard = () => {
         dailyBookings: []
       });
       setTodayBookings([]);
+      setTodayNextPage(null);
     } finally {
       setLoading(false);
     }
@@ -422,7 +445,7 @@ const Dashboard = () => {
         <div className="bg-white rounded-lg shadow-md p-6">
           <h3 className="text-gray-500 text-sm font-medium mb-2">TODAY'S BOOKINGS</h3>
           <div className="flex items-center">
-            <div className="text-3xl font-bold">{todayBookings.length}</div>
+            <div className="text-3xl font-bold">{todayBookings.length}{todayNextPage ? '+' : ''}</div>
             <div className="ml-auto bg-green-100 p-2 rounded-full">
               <Users className="w-6 h-6 text-green-600" />
             </div>
@@ -561,6 +584,19 @@ const Dashboard = () => {
             </table>
           </div>
         )}
+        
+        {todayNextPage && (
+          <div className="mt-4 flex justify-center">
+            <button
+              type="button"
+              onClick={handleLoadMoreToday}
+              disabled={loadingMoreToday}
+              className="btn-secondary py-2 px-4 text-sm"
+            >
+              {loadingMoreToday ? 'Loading...' : 'Load more bookings'}
+            </button>
+          </div>
+        )}
       </div>
 
       <div className="grid grid-cols-1 gap-6 mt-6">